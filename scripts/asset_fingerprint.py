@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Content-Hashed Filenames for the Poke-Survivor Asset Pipeline
+
+With `download_assets.py --hash-names` every output is renamed after its
+content (25-walk.png -> 25-walk.3f9a1c2b.png) and the manifest points at
+the new names, so the files can be served with immutable, year-long cache
+headers: a rebuild that changes a sheet also changes its URL.
+
+- Files that belong together keep one fingerprint: the WebP copy of a sheet
+  is named like its PNG (the Preloader swaps the extension), so the hash
+  covers both.
+- A fingerprinted file replaces every other fingerprinted copy of the same
+  logical name, and fingerprinted files the manifest no longer references
+  are removed.
+- Files the game also loads by their plain name, outside the manifest,
+  keep a plain-named copy next to the fingerprinted one (keep_plain).
+- The precache list (assets/precache.json) holds every file the game loads
+  from the manifest, as [{"url", "revision"}] entries in the format
+  Workbox-style service workers take. Fingerprinted URLs need no revision.
+  Stable names like manifest.json get their content hash as revision.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+from sprite_cache import write_atomic
+
+# Hex digits of the SHA-256 kept in a filename
+FINGERPRINT_LENGTH = 8
+
+_FINGERPRINTED = re.compile(rf"^(?P<stem>.+)\.[0-9a-f]{{{FINGERPRINT_LENGTH}}}(?P<suffix>\.[^.]+)$")
+
+# =============================================================================
+# Filenames
+# =============================================================================
+
+def is_fingerprinted(name: str) -> bool:
+    return _FINGERPRINTED.match(name) is not None
+
+
+def strip_fingerprint(name: str) -> str:
+    """Logical name of a file: 25-walk.3f9a1c2b.png -> 25-walk.png (others unchanged)."""
+    match = _FINGERPRINTED.match(name)
+    return f"{match['stem']}{match['suffix']}" if match else name
+
+
+def fingerprinted_name(name: str, digest: str) -> str:
+    """25-walk.png -> 25-walk.{digest}.png; 25-walk.hitbox.json -> 25-walk.hitbox.{digest}.json."""
+    path = Path(name)
+    return f"{path.stem}.{digest}{path.suffix}"
+
+
+def content_fingerprint(paths: list[Path]) -> str:
+    """Shared fingerprint of a group of files (their bytes, in order)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:FINGERPRINT_LENGTH]
+
+
+# =============================================================================
+# Renaming
+# =============================================================================
+
+def remove_superseded(path: Path) -> None:
+    """Delete the other fingerprinted copies of `path`'s logical name."""
+    logical = Path(strip_fingerprint(path.name))
+    for sibling in path.parent.glob(f"{logical.stem}.*{logical.suffix}"):
+        if sibling != path and is_fingerprinted(sibling.name) and strip_fingerprint(sibling.name) == logical.name:
+            sibling.unlink(missing_ok=True)
+
+
+def publish_files(paths: list[Path], hashed: bool, keep_plain: bool = False) -> list[Path]:
+    """
+    Rename a group of files to fingerprinted names (hashed=True) or back to
+    their logical names, removing superseded copies. Returns the new paths.
+    A group that already has the requested kind of names is left as it is.
+    With keep_plain, fingerprinted files are copied rather than renamed, so
+    the plain-named file stays too.
+    """
+    if all(is_fingerprinted(path.name) == hashed for path in paths):
+        targets = paths
+    else:
+        targets = [path.with_name(strip_fingerprint(path.name)) for path in paths]
+        if hashed:
+            digest = content_fingerprint(paths)
+            targets = [target.with_name(fingerprinted_name(target.name, digest)) for target in targets]
+
+        for path, target in zip(paths, targets):
+            if path != target:
+                if hashed and keep_plain:
+                    shutil.copyfile(path, target)
+                else:
+                    os.replace(path, target)
+            remove_superseded(target)
+
+    if hashed and keep_plain:
+        # Restore plain copies a previous run without keep_plain renamed away
+        for target in targets:
+            plain = target.with_name(strip_fingerprint(target.name))
+            if not plain.exists():
+                shutil.copyfile(target, plain)
+    return targets
+
+
+def remove_unreferenced(directory: Path, referenced: set[Path]) -> list[Path]:
+    """Delete fingerprinted files in `directory` that are not in `referenced`."""
+    removed = []
+    if not directory.is_dir():
+        return removed
+    for path in sorted(directory.iterdir()):
+        if path.is_file() and is_fingerprinted(path.name) and path not in referenced:
+            path.unlink()
+            removed.append(path)
+    return removed
+
+
+# =============================================================================
+# Manifest Files
+# =============================================================================
+
+def _with_formats(path: str, formats: list[str]) -> list[str]:
+    return [Path(path).with_suffix(f".{fmt}").as_posix() for fmt in formats]
+
+
+def manifest_files(manifest: list[dict], public_dir: Path, runtime_only: bool = False) -> list[str]:
+    """
+    Every file a manifest references, relative to the public dir: sheets in
+    each format, variants, hitbox sidecars, palette tables and indexed
+    sheets, atlas JSONs and their pages. With runtime_only, files the game
+    never loads (the indexed sheets) are left out.
+    """
+    files: list[str] = []
+    atlases: list[str] = []
+    for entry in manifest:
+        for anim in entry["animations"]:
+            files += _with_formats(anim["path"], anim.get("formats", ["png"]))
+            for variant in anim.get("variants", {}).values():
+                files += _with_formats(variant["path"], variant.get("formats", ["png"]))
+            if "hitbox" in anim:
+                files.append(anim["hitbox"])
+            if "palette" in anim:
+                files += [anim["palette"]["table"]] if runtime_only else [anim["palette"]["index"], anim["palette"]["table"]]
+            if "atlas" in anim and anim["atlas"] not in atlases:
+                atlases.append(anim["atlas"])
+
+    for atlas_path in atlases:
+        files.append(atlas_path)
+        try:
+            atlas = json.loads((public_dir / atlas_path).read_text())
+        except (OSError, json.JSONDecodeError):
+            continue
+        atlas_dir = Path(atlas_path).parent
+        files += [(atlas_dir / page["image"]).as_posix() for page in atlas.get("textures", [])]
+
+    return list(dict.fromkeys(files))
+
+
+def precache_entries(files: list[str], public_dir: Path) -> list[dict]:
+    """Precache list entries for files relative to the public dir (missing files are skipped)."""
+    entries = []
+    for path in files:
+        file_path = public_dir / path
+        if not file_path.is_file():
+            continue
+        revision = None if is_fingerprinted(file_path.name) else content_fingerprint([file_path])
+        entries.append({"url": path, "revision": revision})
+    return entries
+
+
+def write_precache(path: Path, entries: list[dict]) -> bool:
+    """Write the precache list atomically; returns False if it was already up to date."""
+    content = json.dumps(entries, indent=2) + "\n"
+    if path.exists() and path.read_text() == content:
+        return False
+    write_atomic(path, content.encode())
+    # Temp files are created owner-only; the web server must be able to read it
+    os.chmod(path, 0o644)
+    return True
@@ -0,0 +1,393 @@
+"""
+Texture Atlas Packer for the Poke-Survivor Asset Pipeline
+
+Packs individual animation frames into a small number of atlas pages using a
+MaxRects bin packer (best-short-side-fit), and writes them out in Phaser's
+multi-atlas JSON format (`this.load.multiatlas`).
+
+Each frame is placed with optional edge extrusion (its border pixels repeated
+outward, so linear filtering never samples a neighbour) and padding between
+frames. Frames can be trimmed to their alpha bounding box first; the trimmed
+rect and its offset inside the original cell are recorded as
+`spriteSourceSize`/`sourceSize`, which Phaser uses to draw trimmed frames in
+the right place. Frames with identical pixels can be packed once, with every
+duplicate name pointing at the shared rect.
+
+Used by download_assets.py (`--atlas`).
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from PIL import Image
+
+import sprite_arrays
+
+# Supported page sizes; larger pages mean fewer textures but not every
+# low-end GPU supports 4096
+DEFAULT_MAX_SIZE = 2048
+DEFAULT_PADDING = 2
+DEFAULT_EXTRUDE = 1
+
+
+# =============================================================================
+# Data Structures
+# =============================================================================
+
+class Rect(NamedTuple):
+    """Axis-aligned rectangle in page pixels"""
+    x: int
+    y: int
+    w: int
+    h: int
+
+
+class AtlasFrame(NamedTuple):
+    """One image to pack, with the name it will have in the atlas JSON"""
+    name: str
+    image: Image.Image
+    # Set by trim_frame(): untrimmed cell size and where `image` sits inside it
+    source_size: tuple[int, int] | None = None
+    offset: tuple[int, int] = (0, 0)
+
+    @property
+    def trimmed(self) -> bool:
+        return self.source_size is not None
+
+
+class AtlasPage(NamedTuple):
+    """A packed page: final size and where each frame's pixels were placed"""
+    width: int
+    height: int
+    placements: list[tuple[AtlasFrame, Rect]]
+
+
+# =============================================================================
+# MaxRects Bin
+# =============================================================================
+
+class MaxRectsBin:
+    """
+    MaxRects bin packer (Jylänki, "A Thousand Ways to Pack the Bin").
+
+    Keeps the list of maximal free rectangles; each insert picks the free
+    rectangle that leaves the shortest leftover side, then splits every free
+    rectangle the placement overlaps and drops free rectangles contained in
+    another.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.free_rects: list[Rect] = [Rect(0, 0, width, height)]
+
+    def insert(self, w: int, h: int) -> Rect | None:
+        """Place a w×h rectangle, returning its position or None if it does not fit."""
+        best: Rect | None = None
+        best_score = (float("inf"), float("inf"))
+
+        for free in self.free_rects:
+            if w <= free.w and h <= free.h:
+                leftover_x = free.w - w
+                leftover_y = free.h - h
+                score = (min(leftover_x, leftover_y), max(leftover_x, leftover_y))
+                if score < best_score:
+                    best, best_score = Rect(free.x, free.y, w, h), score
+
+        if best is not None:
+            self._place(best)
+        return best
+
+    def _place(self, used: Rect) -> None:
+        kept: list[Rect] = []
+        pieces: list[Rect] = []
+        for free in self.free_rects:
+            if (used.x >= free.x + free.w or used.x + used.w <= free.x
+                    or used.y >= free.y + free.h or used.y + used.h <= free.y):
+                kept.append(free)
+                continue
+            # Split the overlapped free rect into up to four maximal pieces
+            if used.x > free.x:
+                pieces.append(Rect(free.x, free.y, used.x - free.x, free.h))
+            if used.x + used.w < free.x + free.w:
+                right = used.x + used.w
+                pieces.append(Rect(right, free.y, free.x + free.w - right, free.h))
+            if used.y > free.y:
+                pieces.append(Rect(free.x, free.y, free.w, used.y - free.y))
+            if used.y + used.h < free.y + free.h:
+                bottom = used.y + used.h
+                pieces.append(Rect(free.x, bottom, free.w, free.y + free.h - bottom))
+        self.free_rects = kept + _prune_contained(pieces, kept)
+
+
+def _contains(outer: Rect, inner: Rect) -> bool:
+    return (outer.x <= inner.x and outer.y <= inner.y
+            and outer.x + outer.w >= inner.x + inner.w
+            and outer.y + outer.h >= inner.y + inner.h)
+
+
+def _prune_contained(pieces: list[Rect], kept: list[Rect]) -> list[Rect]:
+    """
+    Drop new pieces contained in another free rectangle.
+
+    Rects that were not split were already maximal, and a piece is a subset
+    of the rect it was split from, so only the pieces need checking.
+    """
+    pieces = sorted(set(pieces), key=lambda r: r.w * r.h, reverse=True)
+    survivors: list[Rect] = []
+    for piece in pieces:
+        if any(_contains(other, piece) for other in survivors) or \
+                any(_contains(other, piece) for other in kept):
+            continue
+        survivors.append(piece)
+    return survivors
+
+
+# =============================================================================
+# Trimming
+# =============================================================================
+
+def trim_frame(frame: AtlasFrame, bbox: tuple[int, int, int, int] | None = None) -> AtlasFrame:
+    """
+    Crop a frame to the bounding box of its non-transparent pixels.
+
+    A fully transparent frame becomes a single transparent pixel (Phaser
+    cannot create zero-sized frames); its sourceSize still restores the cell.
+    `bbox` may be passed in when it was already computed (see trim_frames).
+    """
+    image = frame.image.convert("RGBA")
+    if bbox is None:
+        bbox = image.getchannel("A").getbbox()
+    bbox = bbox or (0, 0, 1, 1)
+    if bbox == (0, 0, image.width, image.height):
+        return frame
+    return frame._replace(
+        image=image.crop(bbox),
+        source_size=image.size,
+        offset=(bbox[0], bbox[1]),
+    )
+
+
+def trim_frames(frames: list[AtlasFrame], engine: str = "pil") -> list[AtlasFrame]:
+    """
+    trim_frame() every frame. With engine="numpy", frames of the same size
+    are stacked and their alpha bounds computed in one pass.
+    """
+    if engine != "numpy":
+        return [trim_frame(frame) for frame in frames]
+
+    by_size: dict[tuple[int, int], list[int]] = {}
+    for index, frame in enumerate(frames):
+        by_size.setdefault(frame.image.size, []).append(index)
+
+    trimmed = list(frames)
+    for size, indices in by_size.items():
+        stack = sprite_arrays.stack_frames([frames[i].image for i in indices], size)
+        for index, bounds in zip(indices, sprite_arrays.alpha_bounds(stack).tolist()):
+            # Empty frames come back as (0, 0, 0, 0) and become one transparent pixel
+            trimmed[index] = trim_frame(frames[index], tuple(bounds) if bounds[2] else (0, 0, 1, 1))
+    return trimmed
+
+
+# =============================================================================
+# Deduplication
+# =============================================================================
+
+def pixel_hash(image: Image.Image) -> str:
+    """Hash of an image's size and RGBA pixels (identical frames hash equal)."""
+    rgba = image.convert("RGBA")
+    digest = hashlib.sha1(f"{rgba.width}x{rgba.height}".encode())
+    digest.update(rgba.tobytes())
+    return digest.hexdigest()
+
+
+def dedupe_frames(frames: list[AtlasFrame]) -> tuple[list[AtlasFrame], dict[str, list[AtlasFrame]]]:
+    """
+    Keep one copy of each distinct image.
+
+    Duplicates keep their own name, source size and offset, so trimmed frames
+    with the same pixels at different offsets can still share storage.
+    Returns: (unique frames, {unique frame name: its duplicates})
+    """
+    first_by_hash: dict[str, AtlasFrame] = {}
+    aliases: dict[str, list[AtlasFrame]] = {}
+    unique: list[AtlasFrame] = []
+
+    for frame in frames:
+        key = pixel_hash(frame.image)
+        original = first_by_hash.get(key)
+        if original is None:
+            first_by_hash[key] = frame
+            unique.append(frame)
+        else:
+            aliases.setdefault(original.name, []).append(frame)
+
+    return unique, aliases
+
+
+# =============================================================================
+# Packing
+# =============================================================================
+
+def pack_frames(
+    frames: list[AtlasFrame],
+    max_size: int = DEFAULT_MAX_SIZE,
+    padding: int = DEFAULT_PADDING,
+    extrude: int = DEFAULT_EXTRUDE,
+) -> list[AtlasPage]:
+    """
+    Pack frames into as few max_size×max_size pages as possible.
+
+    Frames are placed largest first (a standard MaxRects heuristic); each
+    occupies its size plus `extrude` on every side plus `padding` to the
+    right/bottom. Pages are then cropped to the area actually used.
+    """
+    slot_margin = 2 * extrude + padding
+    # Bins get one extra `padding` so a slot may end flush with the page edge
+    bin_size = max_size + padding
+
+    order = sorted(
+        frames,
+        key=lambda f: (max(f.image.size), f.image.width * f.image.height, f.name),
+        reverse=True,
+    )
+
+    bins: list[MaxRectsBin] = []
+    placed: list[list[tuple[AtlasFrame, Rect]]] = []
+
+    for frame in order:
+        w, h = frame.image.size
+        if w + 2 * extrude > max_size or h + 2 * extrude > max_size:
+            raise ValueError(f"Frame {frame.name} ({w}x{h}) does not fit a {max_size}px atlas page")
+
+        for bin_, contents in zip(bins, placed):
+            slot = bin_.insert(w + slot_margin, h + slot_margin)
+            if slot is not None:
+                break
+        else:
+            bin_ = MaxRectsBin(bin_size, bin_size)
+            contents = []
+            bins.append(bin_)
+            placed.append(contents)
+            slot = bin_.insert(w + slot_margin, h + slot_margin)
+
+        contents.append((frame, Rect(slot.x + extrude, slot.y + extrude, w, h)))
+
+    pages: list[AtlasPage] = []
+    for contents in placed:
+        # Sort back into a stable, name-ordered listing for the JSON
+        contents.sort(key=lambda item: item[0].name)
+        width = max(rect.x + rect.w + extrude for _, rect in contents)
+        height = max(rect.y + rect.h + extrude for _, rect in contents)
+        pages.append(AtlasPage(width=width, height=height, placements=contents))
+    return pages
+
+
+def _extruded(image: Image.Image, extrude: int) -> Image.Image:
+    """Return the image with its edge pixels repeated `extrude` pixels outward."""
+    if extrude <= 0:
+        return image
+    w, h = image.size
+    out = Image.new("RGBA", (w + 2 * extrude, h + 2 * extrude), (0, 0, 0, 0))
+    out.paste(image, (extrude, extrude))
+    nearest = Image.Resampling.NEAREST
+    # Edges
+    out.paste(image.crop((0, 0, w, 1)).resize((w, extrude), nearest), (extrude, 0))
+    out.paste(image.crop((0, h - 1, w, h)).resize((w, extrude), nearest), (extrude, h + extrude))
+    out.paste(image.crop((0, 0, 1, h)).resize((extrude, h), nearest), (0, extrude))
+    out.paste(image.crop((w - 1, 0, w, h)).resize((extrude, h), nearest), (w + extrude, extrude))
+    # Corners
+    for (sx, sy), (dx, dy) in (
+        ((0, 0), (0, 0)),
+        ((w - 1, 0), (w + extrude, 0)),
+        ((0, h - 1), (0, h + extrude)),
+        ((w - 1, h - 1), (w + extrude, h + extrude)),
+    ):
+        out.paste(image.crop((sx, sy, sx + 1, sy + 1)).resize((extrude, extrude), nearest), (dx, dy))
+    return out
+
+
+def render_page(page: AtlasPage, extrude: int = DEFAULT_EXTRUDE) -> Image.Image:
+    """Composite a packed page into an RGBA image."""
+    canvas = Image.new("RGBA", (page.width, page.height), (0, 0, 0, 0))
+    for frame, rect in page.placements:
+        canvas.paste(_extruded(frame.image.convert("RGBA"), extrude), (rect.x - extrude, rect.y - extrude))
+    return canvas
+
+
+# =============================================================================
+# Phaser Multi-Atlas Output
+# =============================================================================
+
+def frame_json(frame: AtlasFrame, rect: Rect) -> dict:
+    """Phaser/TexturePacker JSON record for one placed frame."""
+    source_w, source_h = frame.source_size or (rect.w, rect.h)
+    offset_x, offset_y = frame.offset
+    return {
+        "filename": frame.name,
+        "rotated": False,
+        "trimmed": frame.trimmed,
+        "sourceSize": {"w": source_w, "h": source_h},
+        "spriteSourceSize": {"x": offset_x, "y": offset_y, "w": rect.w, "h": rect.h},
+        "frame": {"x": rect.x, "y": rect.y, "w": rect.w, "h": rect.h},
+    }
+
+
+def write_multiatlas(
+    pages: list[AtlasPage],
+    output_dir: Path,
+    basename: str,
+    extrude: int = DEFAULT_EXTRUDE,
+    meta: dict | None = None,
+    aliases: dict[str, list[AtlasFrame]] | None = None,
+    save_page: Callable[[Image.Image, Path], object] | None = None,
+) -> Path:
+    """
+    Render pages to `{basename}-{n}.png` and write `{basename}.json`.
+
+    Image names in the JSON are relative to the JSON file, matching what
+    Phaser's multiatlas loader expects for its `path` argument. Frames in
+    `aliases` (from dedupe_frames) get their own entries on the same page,
+    pointing at the rect of the frame they duplicate. `save_page(image, path)`
+    replaces the plain PNG save, e.g. to optimize the encoding.
+    Returns: path of the JSON file.
+    """
+    aliases = aliases or {}
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Remove pages left over from a previous, larger atlas
+    for stale in output_dir.glob(f"{basename}-*.png"):
+        stale.unlink()
+
+    textures = []
+    for i, page in enumerate(pages):
+        image_name = f"{basename}-{i}.png"
+        image = render_page(page, extrude)
+        if save_page is not None:
+            save_page(image, output_dir / image_name)
+        else:
+            image.save(output_dir / image_name, "PNG")
+        textures.append({
+            "image": image_name,
+            "format": "RGBA8888",
+            "size": {"w": page.width, "h": page.height},
+            "scale": 1,
+            "frames": sorted(
+                (
+                    frame_json(alias, rect)
+                    for frame, rect in page.placements
+                    for alias in [frame, *aliases.get(frame.name, [])]
+                ),
+                key=lambda record: record["filename"],
+            ),
+        })
+
+    json_path = output_dir / f"{basename}.json"
+    payload = {
+        "textures": textures,
+        "meta": {"app": "poke-survivor asset pipeline", **(meta or {})},
+    }
+    json_path.write_text(json.dumps(payload, indent=2))
+    return json_path
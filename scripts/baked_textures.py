@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Baked Procedural Textures for the Poke-Survivor Asset Pipeline
+
+The Preloader used to draw a few textures with Phaser Graphics on every
+boot, before it could start loading sprites. This module renders the same
+images at build time (download_assets.py --bake-textures), so the game
+only has to load them:
+
+- projectile, electric-field: white circles (32px, 256px)
+- jagged-rock: a brown hexagon with a darker lower half (32px)
+- electric-spark: SPARK_VARIANTS jittered star bursts side by side (64px
+  frames); the jitter comes from a seeded RNG, so every build writes the
+  same pixels
+- cave_auto: the 47-tile blob autotile set built from the dirt autotile
+  (Dirt.png), 8x6 tiles of 32px, in the order AutoTileTable.ts defines
+
+Shapes are drawn at SUPERSAMPLE times their size and box-filtered down,
+which gives them the soft edges the canvas renderer draws. The Preloader
+still draws any of these that were not baked.
+"""
+
+import math
+import random
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from PIL import Image, ImageDraw
+
+RGBA = tuple[int, int, int, int]
+Point = tuple[float, float]
+
+# Shapes are rasterized at this multiple of their size, then box-filtered down
+SUPERSAMPLE = 4
+
+# Frames in the electric-spark sheet and the seed of their jitter
+SPARK_VARIANTS = 8
+SPARK_SEED = 25
+
+# Autotile source mini-tiles and the generated tileset
+MINI_TILE = 16
+AUTOTILE_SIZE = 32
+AUTOTILE_COLUMNS = 8
+AUTOTILE_ROWS = 6
+AUTOTILE_COUNT = 47
+
+# =============================================================================
+# Data Structures
+# =============================================================================
+
+class BakedTexture(NamedTuple):
+    """One baked image and how the game slices it"""
+    key: str  # Phaser texture key the game looks the image up by
+    image: Image.Image
+    frame_width: int
+    frame_height: int
+    columns: int  # frames per row
+    rows: int
+
+
+# =============================================================================
+# Shapes
+# =============================================================================
+
+def render_shapes(
+    size: tuple[int, int],
+    layers: list[tuple[RGBA, Callable[[ImageDraw.ImageDraw, RGBA], None]]],
+) -> Image.Image:
+    """
+    Draw filled shapes onto a transparent image, one layer per color,
+    alpha-blended in order like successive Graphics fills.
+    """
+    width, height = size
+    canvas = Image.new("RGBA", (width * SUPERSAMPLE, height * SUPERSAMPLE), (0, 0, 0, 0))
+    for color, draw_shape in layers:
+        layer = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
+        draw_shape(ImageDraw.Draw(layer), color)
+        canvas = Image.alpha_composite(canvas, layer)
+    # Averaging premultiplied pixels keeps transparent ones from darkening the edges
+    return canvas.convert("RGBa").resize(size, Image.BOX).convert("RGBA")
+
+
+def _scaled(points: list[Point]) -> list[Point]:
+    return [(x * SUPERSAMPLE, y * SUPERSAMPLE) for x, y in points]
+
+
+def circle(size: int, color: RGBA = (255, 255, 255, 255)) -> Image.Image:
+    """A circle filling a size x size image (Graphics.fillCircle)."""
+    bounds = (0, 0, size * SUPERSAMPLE - 1, size * SUPERSAMPLE - 1)
+    return render_shapes((size, size), [(color, lambda draw, fill: draw.ellipse(bounds, fill=fill))])
+
+
+def polygons(size: tuple[int, int], fills: list[tuple[RGBA, list[Point]]]) -> Image.Image:
+    """Filled polygons, later ones drawn over earlier ones (Graphics.fillPoints)."""
+    return render_shapes(size, [
+        (color, lambda draw, fill, points=points: draw.polygon(_scaled(points), fill=fill))
+        for color, points in fills
+    ])
+
+
+def jagged_rock() -> Image.Image:
+    """The Stealth Rock projectile: a brown hexagon shaded on its lower half."""
+    return polygons((32, 32), [
+        ((0x79, 0x55, 0x48, 255), [(16, 0), (32, 8), (28, 24), (16, 32), (4, 24), (0, 8)]),
+        ((0x4E, 0x34, 0x2E, 255), [(16, 16), (28, 24), (16, 32), (4, 24)]),
+    ])
+
+
+def star_points(center: Point, spikes: int, outer: float, inner: float, jitter: float, rng: random.Random) -> list[Point]:
+    """Alternating outer/inner radius points around `center`, each radius jittered by ±jitter."""
+    cx, cy = center
+    points = []
+    for i in range(spikes * 2):
+        radius = (outer if i % 2 == 0 else inner) + rng.uniform(-jitter, jitter)
+        angle = math.pi / spikes * i
+        points.append((cx + math.cos(angle) * radius, cy + math.sin(angle) * radius))
+    return points
+
+
+def electric_spark(rng: random.Random) -> Image.Image:
+    """One 64x64 spark: a jagged cyan glow (80% alpha) with a white core."""
+    center = (32, 32)
+    return polygons((64, 64), [
+        ((0x00, 0xFF, 0xFF, round(0.8 * 255)), star_points(center, 12, 28, 10, 5, rng)),
+        ((0xFF, 0xFF, 0xFF, 255), star_points(center, 12, 14, 5, 2, rng)),
+    ])
+
+
+def electric_sparks(count: int = SPARK_VARIANTS, seed: int = SPARK_SEED) -> Image.Image:
+    """`count` spark variants in one row; the same seed always gives the same sheet."""
+    rng = random.Random(seed)
+    sheet = Image.new("RGBA", (64 * count, 64), (0, 0, 0, 0))
+    for index in range(count):
+        sheet.paste(electric_spark(rng), (index * 64, 0))
+    return sheet
+
+
+# =============================================================================
+# Autotiles
+# =============================================================================
+
+class TileShape(NamedTuple):
+    """Which neighbors a blob tile connects to (see AutoTileTable.ts)"""
+    n: bool
+    e: bool
+    s: bool
+    w: bool
+    ne: bool = True
+    se: bool = True
+    sw: bool = True
+    nw: bool = True
+
+
+def tile_shapes() -> list[TileShape]:
+    """The 47 tile shapes in AutoTileTable.ts order."""
+    shapes = [TileShape(bool(i & 1), bool(i & 2), bool(i & 4), bool(i & 8)) for i in range(16)]
+    # Surrounded on all four sides, with each combination of missing corners
+    shapes += [TileShape(True, True, True, True, bool(i & 1), bool(i & 2), bool(i & 4), bool(i & 8)) for i in range(16)]
+    # (n, e, s, w, ne, se, sw, nw): L-shapes, then T-shapes, missing inner corners
+    shapes += [TileShape(*map(bool, flags)) for flags in (
+        (1, 1, 0, 0, 0, 1, 1, 1), (0, 1, 1, 0, 1, 0, 1, 1), (0, 0, 1, 1, 1, 1, 0, 1), (1, 0, 0, 1, 1, 1, 1, 0),
+        (1, 1, 1, 0, 0, 1, 1, 1), (1, 1, 1, 0, 1, 0, 1, 1), (1, 1, 1, 0, 0, 0, 1, 1),
+        (0, 1, 1, 1, 1, 0, 1, 1), (0, 1, 1, 1, 1, 1, 0, 1), (0, 1, 1, 1, 1, 0, 0, 1),
+        (1, 0, 1, 1, 1, 1, 0, 1), (1, 0, 1, 1, 1, 1, 1, 0), (1, 0, 1, 1, 1, 1, 0, 0),
+        (1, 1, 0, 1, 1, 1, 1, 0), (1, 1, 0, 1, 0, 1, 1, 1), (1, 1, 0, 1, 0, 1, 1, 0),
+    )]
+    return shapes
+
+
+# Mini-tile (16px) coordinates of the pieces in an RPG Maker style autotile like Dirt.png
+AUTOTILE_SOURCE = {
+    "TL_CORNER": (0, 2), "TR_CORNER": (4, 2),
+    "BL_CORNER": (0, 6), "BR_CORNER": (4, 6),
+    "TOP_EDGE": (2, 2), "BOT_EDGE": (2, 6),
+    "LEFT_EDGE": (0, 4), "RIGHT_EDGE": (4, 4),
+    "CENTER": (2, 4),
+    "INNER_CORNER": (4, 0),
+}
+
+
+def quadrant_source(quadrant: str, vertical: bool, horizontal: bool, diagonal: bool) -> tuple[int, int]:
+    """
+    Mini-tile to draw in one quadrant (TL/TR/BL/BR) of a tile, from whether
+    it connects to its vertical, horizontal and diagonal neighbors.
+    """
+    top = quadrant[0] == "T"
+    left = quadrant[1] == "L"
+    if not vertical and not horizontal:
+        piece = f"{'T' if top else 'B'}{'L' if left else 'R'}_CORNER"
+    elif not vertical:
+        piece = "TOP_EDGE" if top else "BOT_EDGE"
+    elif not horizontal:
+        piece = "LEFT_EDGE" if left else "RIGHT_EDGE"
+    else:
+        piece = "CENTER" if diagonal else "INNER_CORNER"
+    # Each piece is 2x2 mini-tiles; a quadrant takes its own corner of it
+    x, y = AUTOTILE_SOURCE[piece]
+    return x + (0 if left else 1), y + (0 if top else 1)
+
+
+def autotiles(source: Image.Image) -> Image.Image:
+    """The blob tileset for an autotile source image (AutoTileGenerator.generate)."""
+    source = source.convert("RGBA")
+    tileset = Image.new("RGBA", (AUTOTILE_COLUMNS * AUTOTILE_SIZE, AUTOTILE_ROWS * AUTOTILE_SIZE), (0, 0, 0, 0))
+
+    def mini_tile(x: int, y: int) -> Image.Image:
+        return source.crop((x * MINI_TILE, y * MINI_TILE, (x + 1) * MINI_TILE, (y + 1) * MINI_TILE))
+
+    for index, shape in enumerate(tile_shapes()[:AUTOTILE_COUNT]):
+        dx = index % AUTOTILE_COLUMNS * AUTOTILE_SIZE
+        dy = index // AUTOTILE_COLUMNS * AUTOTILE_SIZE
+        quadrants = {
+            "TL": (shape.n, shape.w, shape.nw),
+            "TR": (shape.n, shape.e, shape.ne),
+            "BL": (shape.s, shape.w, shape.sw),
+            "BR": (shape.s, shape.e, shape.se),
+        }
+        for quadrant, (vertical, horizontal, diagonal) in quadrants.items():
+            offset = (0 if quadrant[1] == "L" else MINI_TILE, 0 if quadrant[0] == "T" else MINI_TILE)
+            tile = mini_tile(*quadrant_source(quadrant, vertical, horizontal, diagonal))
+            tileset.paste(tile, (dx + offset[0], dy + offset[1]))
+    return tileset
+
+
+# =============================================================================
+# Baking
+# =============================================================================
+
+def bake_textures(autotile_source: Path) -> list[BakedTexture]:
+    """Every texture the Preloader would otherwise draw at startup."""
+    textures = [
+        BakedTexture("projectile", circle(32), 32, 32, 1, 1),
+        BakedTexture("electric-field", circle(256), 256, 256, 1, 1),
+        BakedTexture("jagged-rock", jagged_rock(), 32, 32, 1, 1),
+        BakedTexture("electric-spark", electric_sparks(), 64, 64, SPARK_VARIANTS, 1),
+    ]
+    with Image.open(autotile_source) as source:
+        textures.append(BakedTexture(
+            "cave_auto", autotiles(source), AUTOTILE_SIZE, AUTOTILE_SIZE, AUTOTILE_COLUMNS, AUTOTILE_ROWS,
+        ))
+    return textures
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Peak-Memory Benchmark for the Poke-Survivor Asset Pipeline
+
+Processes each cached sprites.zip in a fresh interpreter and reports its peak
+RSS, comparing the streaming path (zip opened in place from the cache) with
+the legacy approach of reading the whole archive into memory first.
+
+Only cached zips are used, so the benchmark needs no network access; run
+download_assets.py first to fill the cache.
+
+Usage:
+    python bench_memory.py                 # Every zip in the download cache
+    python bench_memory.py 1 4 7 143       # Specific (cached) IDs
+    python bench_memory.py --json out.json # Also save the results
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import download_assets
+from sprite_cache import format_size
+
+# How a worker hands the zip to process_sprite_zip
+MODES = ("path", "bytes")
+
+
+# =============================================================================
+# Worker
+# =============================================================================
+
+def peak_rss_bytes(who: int = resource.RUSAGE_SELF) -> int:
+    """Peak resident set size of this process (or, with RUSAGE_CHILDREN, its largest waited-for child)."""
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_worker(pokemon_id: int, mode: str, output_dir: Path) -> dict:
+    """Process one cached zip and measure it (runs in its own interpreter)."""
+    download_assets.SPRITES_OUTPUT_DIR = output_dir
+    zip_path = download_assets.get_cache().get_path(str(pokemon_id).zfill(4))
+    if zip_path is None:
+        return {"id": pokemon_id, "error": "not cached"}
+
+    baseline = peak_rss_bytes()
+    start = time.perf_counter()
+    source = zip_path.read_bytes() if mode == "bytes" else zip_path
+    sprite = download_assets.process_sprite_zip(pokemon_id, source)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "id": pokemon_id,
+        "mode": mode,
+        "zip_bytes": zip_path.stat().st_size,
+        "baseline_rss": baseline,
+        "peak_rss": peak_rss_bytes(),
+        "seconds": elapsed,
+        "ok": sprite is not None,
+    }
+
+
+def measure(pokemon_id: int, mode: str) -> dict:
+    """Run one worker in a fresh interpreter so peak RSS is per Pokémon."""
+    with tempfile.TemporaryDirectory() as output_dir:
+        completed = subprocess.run(
+            [sys.executable, __file__, "--worker", str(pokemon_id), "--mode", mode,
+             "--output", output_dir, "--cache-dir", str(download_assets.CACHE_DIR)],
+            capture_output=True,
+            text=True,
+        )
+    if completed.returncode != 0:
+        return {"id": pokemon_id, "mode": mode, "error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Measure peak RSS per Pokémon for the sprite pipeline."
+    )
+    parser.add_argument("pokemon_ids", nargs="*", type=int, help="Cached Pokémon IDs (default: all cached)")
+    parser.add_argument("--json", type=Path, help="Write results to this JSON file")
+    parser.add_argument("--cache-dir", type=Path, help="Download cache to read zips from (default: the pipeline's)")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--mode", choices=MODES, default="path", help=argparse.SUPPRESS)
+    parser.add_argument("--output", type=Path, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main() -> int:
+    """Main entry point."""
+    args = parse_args()
+    if args.cache_dir:
+        download_assets.CACHE_DIR = args.cache_dir
+
+    if args.worker is not None:
+        # Keep the pipeline's progress lines out of the JSON result line
+        with open(os.devnull, "w") as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                result = run_worker(args.worker, args.mode, args.output)
+            finally:
+                sys.stdout = stdout
+        print(json.dumps(result))
+        return 0
+
+    cached_ids = sorted(int(entry.key) for entry in download_assets.get_cache().entries())
+    pokemon_ids = args.pokemon_ids or cached_ids
+    if not pokemon_ids:
+        print("No cached zips to benchmark; run download_assets.py first.")
+        return 1
+
+    print("=" * 72)
+    print("🧪 Peak RSS per Pokémon (fresh interpreter each)")
+    print("=" * 72)
+    print(f"{'ID':>5}  {'name':<14} {'zip':>9}  {'path mode':>10}  {'bytes mode':>10}  {'saved':>9}")
+
+    results = []
+    for pokemon_id in pokemon_ids:
+        by_mode = {mode: measure(pokemon_id, mode) for mode in MODES}
+        results.extend(by_mode.values())
+        if any("error" in r for r in by_mode.values()):
+            errors = [r["error"] for r in by_mode.values() if "error" in r]
+            print(f"{pokemon_id:>5}  ⚠️  {errors[0]}")
+            continue
+        path_peak = by_mode["path"]["peak_rss"]
+        bytes_peak = by_mode["bytes"]["peak_rss"]
+        name = download_assets.POKEMON_NAMES.get(pokemon_id, f"pokemon_{pokemon_id}")
+        print(f"{pokemon_id:>5}  {name:<14} {format_size(by_mode['path']['zip_bytes']):>9}  "
+              f"{format_size(path_peak):>10}  {format_size(bytes_peak):>10}  "
+              f"{format_size(max(0, bytes_peak - path_peak)):>9}")
+
+    measured = [r for r in results if r.get("mode") == "path" and "peak_rss" in r]
+    if measured:
+        worst = max(measured, key=lambda r: r["peak_rss"])
+        print("-" * 72)
+        print(f"Max peak RSS (path mode): {format_size(worst['peak_rss'])} for #{worst['id']} "
+              f"(interpreter baseline {format_size(worst['baseline_rss'])})")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+        print(f"📄 Results written to {args.json}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for the Poke-Survivor Asset Pipeline
+
+Generates synthetic PMD-style sprites.zip fixtures, serves them from a local
+stand-in for SpriteServer and runs the whole download_assets.py pipeline
+against it, measuring throughput, latency per Pokémon and peak memory. The
+hot functions (parse_anim_data, extract_all_directions, generate_manifest,
+create_spritesheet) get micro-benchmarks of their own.
+
+Every run is saved as JSON and compared against a stored baseline, so a
+performance change can be judged by running this before and after it.
+
+Usage:
+    python bench_pipeline.py                       # small (6 IDs) and gen1 (151 IDs)
+    python bench_pipeline.py --scenarios large     # 1025 IDs
+    python bench_pipeline.py --jobs 8              # Run the pipeline with --jobs 8
+    python bench_pipeline.py --save-baseline       # Store this run as the baseline
+    python bench_pipeline.py --frame-size 64x64 --frames 12 --extra-anims 40
+    python bench_pipeline.py --latency 50          # Simulate 50 ms of network latency
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import NamedTuple
+
+from PIL import Image, ImageDraw
+
+import download_assets
+import generate_sprite
+from bench_memory import peak_rss_bytes
+from sprite_arrays import numpy_available
+from sprite_cache import format_size, sha256_bytes
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+SCRIPT_DIR = Path(__file__).parent
+BENCH_DIR = SCRIPT_DIR / ".bench"
+RESULTS_DIR = BENCH_DIR / "results"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+# Scenario name -> Pokémon IDs to run the pipeline on
+SCENARIOS = {
+    "small": download_assets.DEFAULT_POKEMON_IDS,
+    "gen1": list(range(1, 152)),
+    "large": list(range(1, 1026)),
+}
+DEFAULT_SCENARIOS = ["small", "gen1"]
+
+# A metric more than this much slower/larger than the baseline is a regression
+REGRESSION_THRESHOLD = 0.10
+
+# Metrics compared against the baseline (all lower-is-better)
+COMPARED_METRICS = ("seconds", "latency_p50", "latency_p95", "peak_rss")
+
+
+# =============================================================================
+# Data Structures
+# =============================================================================
+
+class FixtureSpec(NamedTuple):
+    """Shape of the synthetic sprites.zip files."""
+    frame_width: int
+    frame_height: int
+    frame_count: int
+    extra_anims: int  # animations besides Walk/Idle, listed in AnimData.xml and zipped
+    variants: int  # distinct sprite sets; IDs reuse them round-robin
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+def anim_data_xml(anims: list[tuple[str, int, int, list[int]]]) -> bytes:
+    """Build an AnimData.xml for (name, frame width, frame height, durations) tuples."""
+    parts = ["<?xml version='1.0' encoding='utf-8'?>\n<AnimData><ShadowSize>1</ShadowSize><Anims>"]
+    for index, (name, fw, fh, durations) in enumerate(anims):
+        parts.append(
+            f"<Anim><Name>{name}</Name><Index>{index}</Index>"
+            f"<FrameWidth>{fw}</FrameWidth><FrameHeight>{fh}</FrameHeight><Durations>"
+            + "".join(f"<Duration>{d}</Duration>" for d in durations)
+            + "</Durations></Anim>"
+        )
+    parts.append("</Anims></AnimData>")
+    return "".join(parts).encode()
+
+
+def fixture_sheet(frame_width: int, frame_height: int, frame_count: int, seed: int) -> Image.Image:
+    """An 8-direction animation sheet with a few opaque shapes per cell."""
+    rnd = random.Random(seed)
+    sheet = Image.new("RGBA", (frame_width * frame_count, frame_height * 8), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sheet)
+    colors = [(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256), 255) for _ in range(6)]
+    for row in range(8):
+        for col in range(frame_count):
+            x, y = col * frame_width, row * frame_height
+            for _ in range(3):
+                w = rnd.randrange(max(1, frame_width // 4), max(2, frame_width // 2))
+                h = rnd.randrange(max(1, frame_height // 4), max(2, frame_height // 2))
+                ox = rnd.randrange(0, frame_width - w)
+                oy = rnd.randrange(0, frame_height - h)
+                draw.ellipse([x + ox, y + oy, x + ox + w, y + oy + h], fill=rnd.choice(colors))
+    return sheet
+
+
+def encode_png(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class FixtureSet:
+    """
+    Synthetic sprites.zip contents for any Pokémon ID.
+
+    The sheets are rendered and PNG-encoded once per variant; each ID's zip
+    is assembled on request and carries a small per-ID member, so every
+    download is distinct while fixture setup stays cheap at 1000+ IDs.
+    """
+
+    def __init__(self, spec: FixtureSpec):
+        self.spec = spec
+        self._variants = [self._render_variant(v) for v in range(max(1, spec.variants))]
+
+    def _render_variant(self, variant: int) -> dict[str, bytes]:
+        spec = self.spec
+        rnd = random.Random(variant)
+        names = ["Walk", "Idle"] + [f"Extra{i:02d}" for i in range(spec.extra_anims)]
+        anims = [
+            (name, spec.frame_width, spec.frame_height,
+             [rnd.choice([2, 4, 8, 10, 40]) for _ in range(spec.frame_count)])
+            for name in names
+        ]
+        members = {"AnimData.xml": anim_data_xml(anims)}
+        for index, (name, fw, fh, durations) in enumerate(anims):
+            members[f"{name}-Anim.png"] = encode_png(fixture_sheet(fw, fh, len(durations), variant * 1000 + index))
+        return members
+
+    def anim_xml(self, variant: int = 0) -> bytes:
+        return self._variants[variant]["AnimData.xml"]
+
+    def sheet(self, name: str = "Walk", variant: int = 0) -> Image.Image:
+        return Image.open(io.BytesIO(self._variants[variant][f"{name}-Anim.png"])).convert("RGBA")
+
+    def zip_for(self, pokemon_id: int) -> bytes:
+        members = self._variants[pokemon_id % len(self._variants)]
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+            for member, data in members.items():
+                # PNGs are already compressed, like the real archives
+                compression = zipfile.ZIP_STORED if member.endswith(".png") else zipfile.ZIP_DEFLATED
+                zf.writestr(member, data, compress_type=compression)
+            zf.writestr("credits.txt", f"Synthetic fixture for #{pokemon_id}\n")
+        return buffer.getvalue()
+
+
+# =============================================================================
+# Stand-in SpriteServer
+# =============================================================================
+
+class FixtureServer:
+    """
+    Local HTTP server answering GET /{id:04d}/sprites.zip from a FixtureSet.
+
+    Responses carry an ETag and honour If-None-Match, like SpriteServer.
+    `latency` seconds are slept before every response.
+    """
+
+    def __init__(self, fixtures: FixtureSet, latency: float = 0.0):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = self.path.strip("/").split("/")
+                if len(parts) != 2 or parts[1] != "sprites.zip" or not parts[0].isdigit():
+                    self.send_error(404)
+                    return
+                body = server.fixtures.zip_for(int(parts[0]))
+                etag = f'"{sha256_bytes(body)[:16]}"'
+                if server.latency:
+                    time.sleep(server.latency)
+                with server._lock:
+                    server.requests += 1
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/zip")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+# =============================================================================
+# Pipeline Runs
+# =============================================================================
+
+def run_pipeline_worker(workdir: Path, pipeline_args: list[str]) -> dict:
+    """Run download_assets.main() with every output redirected into `workdir`."""
+    download_assets.PUBLIC_DIR = workdir / "public"
+    download_assets.SPRITES_OUTPUT_DIR = workdir / "public" / "assets" / "sprites"
+    download_assets.MANIFEST_OUTPUT_PATH = workdir / "public" / "assets" / "manifest.json"
+    download_assets.MANIFEST_SHARDS_DIR = workdir / "public" / "assets" / "manifest"
+    download_assets.ANIMATIONS_OUTPUT_PATH = workdir / "public" / "assets" / "animations.json"
+    download_assets.PRECACHE_OUTPUT_PATH = workdir / "public" / "assets" / "precache.json"
+    download_assets.ATLAS_OUTPUT_DIR = workdir / "public" / "assets" / "atlas"
+    download_assets.TEXTURES_OUTPUT_DIR = workdir / "public" / "assets" / "textures"
+    download_assets.CACHE_DIR = workdir / "cache"
+    download_assets.BUILD_LOCK_PATH = workdir / "sprites.lock.json"
+
+    sys.argv = ["download_assets.py", *pipeline_args]
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        status = download_assets.main()
+    seconds = time.perf_counter() - start
+
+    return {
+        "status": status,
+        "seconds": seconds,
+        "peak_rss": max(peak_rss_bytes(), peak_rss_bytes(resource.RUSAGE_CHILDREN)),
+    }
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def run_phase(workdir: Path, server: FixtureServer, pokemon_ids: list[int], jobs: int) -> dict:
+    """Run the pipeline once in a fresh interpreter and collect its metrics."""
+    trace_path = workdir / "trace.json"
+    pipeline_args = ["--ids", ",".join(map(str, pokemon_ids)), "--jobs", str(jobs), "--profile", "--profile-output", str(trace_path)]
+    requests_before = server.requests
+
+    completed = subprocess.run(
+        [sys.executable, __file__, "--pipeline-worker", str(workdir), "--", *pipeline_args],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "SPRITESERVER_URL": server.url},
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"pipeline run failed:\n{completed.stderr.strip()}")
+    run = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    trace = json.loads(trace_path.read_text())
+    latencies = [item["total"] for item in trace["items"].values()]
+    return {
+        "status": run["status"],
+        "seconds": run["seconds"],
+        "throughput": len(pokemon_ids) / run["seconds"] if run["seconds"] else 0.0,
+        "latency_p50": percentile(latencies, 0.50),
+        "latency_p95": percentile(latencies, 0.95),
+        "latency_max": max(latencies, default=0.0),
+        "peak_rss": run["peak_rss"],
+        "requests": server.requests - requests_before,
+        "stages": {stage: total["total"] for stage, total in trace["stages"].items()},
+    }
+
+
+def run_scenario(server: FixtureServer, pokemon_ids: list[int], jobs: int) -> dict:
+    """
+    Cold run (empty cache, nothing built) followed by a warm run (cached zips,
+    every output up to date) in the same working directory.
+    """
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        cold = run_phase(Path(workdir), server, pokemon_ids, jobs)
+        warm = run_phase(Path(workdir), server, pokemon_ids, jobs)
+    return {"cold": cold, "warm": warm}
+
+
+# =============================================================================
+# Micro-benchmarks
+# =============================================================================
+
+def time_call(func, repeat: int = 5) -> float:
+    """Best-of-`repeat` seconds per call of func()."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run_micro_benchmarks(fixtures: FixtureSet) -> dict[str, float]:
+    """Seconds per call of the pipeline's hot functions on the fixture data."""
+    spec = fixtures.spec
+    anim_xml = fixtures.anim_xml()
+    sheet = fixtures.sheet()
+    walk = download_assets.parse_anim_data(anim_xml)["Walk"]
+    frames = [
+        sheet.crop((col * spec.frame_width, row * spec.frame_height,
+                    (col + 1) * spec.frame_width, (row + 1) * spec.frame_height))
+        for row in range(8)
+        for col in range(spec.frame_count)
+    ]
+    sprites = [
+        download_assets.SpriteInfo(
+            id=str(pokemon_id),
+            name=f"pokemon_{pokemon_id}",
+            animations=[
+                download_assets.SpriteAnimation(
+                    key=key,
+                    path=f"assets/sprites/{pokemon_id}-{key}.png",
+                    frame_width=spec.frame_width,
+                    frame_height=spec.frame_height,
+                    frame_count=spec.frame_count,
+                    directions=8,
+                )
+                for key in ("walk", "idle")
+            ],
+        )
+        for pokemon_id in range(1, 152)
+    ]
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench-micro-") as tmp, \
+            open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        manifest_path = download_assets.MANIFEST_OUTPUT_PATH
+        animations_path = download_assets.ANIMATIONS_OUTPUT_PATH
+        download_assets.MANIFEST_OUTPUT_PATH = Path(tmp) / "manifest.json"
+        download_assets.ANIMATIONS_OUTPUT_PATH = Path(tmp) / "animations.json"
+        try:
+            results["parse_anim_data"] = time_call(lambda: download_assets.parse_anim_data(anim_xml))
+            results["extract_all_directions"] = time_call(
+                lambda: download_assets.extract_all_directions(sheet, walk)
+            )
+            results["generate_manifest[151]"] = time_call(lambda: download_assets.generate_manifest(sprites))
+            results["create_spritesheet"] = time_call(
+                lambda: generate_sprite.create_spritesheet(frames, str(Path(tmp) / "sheet.png"), 8)
+            )
+            if numpy_available():
+                results["extract_all_directions[numpy]"] = time_call(
+                    lambda: download_assets.extract_all_directions(sheet, walk, "numpy")
+                )
+                results["create_spritesheet[numpy]"] = time_call(
+                    lambda: generate_sprite.create_spritesheet(frames, str(Path(tmp) / "sheet.png"), 8, engine="numpy")
+                )
+        finally:
+            download_assets.MANIFEST_OUTPUT_PATH = manifest_path
+            download_assets.ANIMATIONS_OUTPUT_PATH = animations_path
+    return results
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def scenario_size(name: str) -> int:
+    return len(SCENARIOS[name])
+
+
+def print_results(results: dict) -> None:
+    """Print the scenario and micro-benchmark tables."""
+    print(f"\n{'scenario':<14} {'IDs':>5} {'time':>8} {'IDs/s':>8} {'p50':>8} {'p95':>8} {'peak RSS':>10} {'reqs':>5}")
+    for name, scenario in results["scenarios"].items():
+        for phase, m in scenario.items():
+            print(f"{name + '/' + phase:<14} {scenario_size(name):>5} {m['seconds']:>7.2f}s "
+                  f"{m['throughput']:>8.1f} {m['latency_p50'] * 1000:>6.1f}ms {m['latency_p95'] * 1000:>6.1f}ms "
+                  f"{format_size(m['peak_rss']):>10} {m['requests']:>5}")
+
+    print(f"\n{'function':<28} {'per call':>12}")
+    for name, seconds in results["micro"].items():
+        print(f"{name:<28} {seconds * 1e6:>10.1f}µs")
+
+
+def flatten_metrics(results: dict) -> dict[str, float]:
+    """{"gen1/cold.seconds": ..., "micro.parse_anim_data": ...} for baseline comparison."""
+    metrics = {}
+    for name, scenario in results.get("scenarios", {}).items():
+        for phase, m in scenario.items():
+            for metric in COMPARED_METRICS:
+                metrics[f"{name}/{phase}.{metric}"] = m[metric]
+    for name, seconds in results.get("micro", {}).items():
+        metrics[f"micro.{name}"] = seconds
+    return metrics
+
+
+def compare_to_baseline(results: dict, baseline: dict) -> list[str]:
+    """Print current vs baseline for every shared metric; return the regressed ones."""
+    if baseline.get("config") != results["config"]:
+        print("⚠️  Baseline was recorded with a different configuration; deltas may not be meaningful")
+        print(f"   baseline: {baseline.get('config')}")
+        print(f"   current:  {results['config']}")
+
+    current = flatten_metrics(results)
+    previous = flatten_metrics(baseline)
+    regressions = []
+    print(f"\n📊 Compared to baseline from {baseline.get('created', '?')}:")
+    print(f"    {'metric':<36} {'baseline':>12} {'current':>12} {'change':>8}")
+    for key in (k for k in current if k in previous):
+        before, after = previous[key], current[key]
+        change = (after - before) / before if before else 0.0
+        regressed = change > REGRESSION_THRESHOLD
+        if regressed:
+            regressions.append(key)
+        mark = "⚠️ " if regressed else ("🚀" if change < -REGRESSION_THRESHOLD else "  ")
+        print(f"  {mark}{key:<36} {format_metric(key, before):>12} {format_metric(key, after):>12} {change:>+7.1%}")
+    return regressions
+
+
+def format_metric(key: str, value: float) -> str:
+    if key.endswith(".peak_rss"):
+        return format_size(value)
+    if key.startswith("micro."):
+        return f"{value * 1e6:.1f}µs"
+    return f"{value * 1000:.1f}ms"
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def parse_frame_size(text: str) -> tuple[int, int]:
+    """Parse WIDTHxHEIGHT, e.g. "32x40"."""
+    try:
+        width, height = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    if width < 4 or height < 4:
+        raise argparse.ArgumentTypeError("frames must be at least 4x4")
+    return width, height
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the sprite pipeline against synthetic SpriteServer fixtures."
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(DEFAULT_SCENARIOS),
+        help=f"Comma-separated scenarios ({', '.join(f'{k}={len(v)} IDs' for k, v in SCENARIOS.items())}), "
+             "'all', or 'none' for micro-benchmarks only"
+    )
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="--jobs passed to the pipeline (default: 1)")
+    parser.add_argument("--frame-size", type=parse_frame_size, default=(32, 40), help="Fixture frame size (default: 32x40)")
+    parser.add_argument("--frames", type=int, default=6, help="Frames per animation (default: 6)")
+    parser.add_argument("--extra-anims", type=int, default=12, help="Animations besides Walk/Idle per zip (default: 12)")
+    parser.add_argument("--variants", type=int, default=8, help="Distinct fixture sprite sets (default: 8)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated server latency in ms (default: 0)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help=f"Exit with 1 if a metric is more than {REGRESSION_THRESHOLD * 100:.0f}%% worse than the baseline")
+    parser.add_argument("--pipeline-worker", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("pipeline_args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    """Main entry point."""
+    args = parse_args(sys.argv[1:])
+
+    if args.pipeline_worker is not None:
+        pipeline_args = args.pipeline_args[1:] if args.pipeline_args[:1] == ["--"] else args.pipeline_args
+        print(json.dumps(run_pipeline_worker(args.pipeline_worker, pipeline_args)))
+        return 0
+
+    if args.scenarios == "all":
+        scenarios = list(SCENARIOS)
+    elif args.scenarios == "none":
+        scenarios = []
+    else:
+        scenarios = [name.strip() for name in args.scenarios.split(",")]
+        unknown = [name for name in scenarios if name not in SCENARIOS]
+        if unknown:
+            print(f"❌ Unknown scenario(s): {', '.join(unknown)}")
+            return 2
+
+    spec = FixtureSpec(*args.frame_size, args.frames, args.extra_anims, args.variants)
+
+    print("=" * 72)
+    print("🏁 Sprite Pipeline Benchmark")
+    print("=" * 72)
+    print(f"Fixtures: {spec.frame_width}x{spec.frame_height} × {spec.frame_count} frames, "
+          f"{2 + spec.extra_anims} animations, {spec.variants} variants")
+
+    fixtures = FixtureSet(spec)
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {**spec._asdict(), "jobs": args.jobs, "latency_ms": args.latency},
+        "scenarios": {},
+        "micro": {},
+    }
+
+    with FixtureServer(fixtures, latency=args.latency / 1000) as server:
+        print(f"Stand-in SpriteServer: {server.url} (zip size {format_size(len(fixtures.zip_for(1)))})")
+        for name in scenarios:
+            print(f"  ▶ {name}: {len(SCENARIOS[name])} IDs, --jobs {args.jobs}...")
+            results["scenarios"][name] = run_scenario(server, SCENARIOS[name], args.jobs)
+
+    print("  ▶ micro-benchmarks...")
+    results["micro"] = run_micro_benchmarks(fixtures)
+    print_results(results)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    result_path = RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    result_path.write_text(json.dumps(results, indent=2))
+    print(f"\n📄 Results written to {result_path}")
+
+    regressions = []
+    if args.baseline.exists() and not args.save_baseline:
+        regressions = compare_to_baseline(results, json.loads(args.baseline.read_text()))
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} metric(s) regressed by more than {REGRESSION_THRESHOLD:.0%}")
+    elif not args.save_baseline:
+        print("ℹ️  No baseline yet; run with --save-baseline to store one")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"📌 Saved as baseline: {args.baseline}")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,21 +9,102 @@ Usage:
     python download_assets.py              # Download default Pokémon
     python download_assets.py 1 4 7        # Download specific IDs
     python download_assets.py --all-ids 1,4,7,25,133,150  # Comma-separated
+    python download_assets.py --jobs 8     # Fetch/process concurrently
+    python download_assets.py --refresh    # Revalidate cached zips (ETag/Last-Modified)
+    python download_assets.py cache stats  # Inspect the download cache (also: prune, verify)
+    python download_assets.py mirror 1-151 --jobs 8  # Prefetch zips into a packed offline mirror (resumable)
+    python download_assets.py --mirror    # Build offline from the mirror instead of SpriteServer
+    python download_assets.py --mirror --mirror-dir DIR  # Read the mirror from another directory
+    python download_assets.py budget --max-total 256M  # Decoded texture memory of the manifest (CI gate)
+    python download_assets.py --force      # Rebuild outputs even if their inputs are unchanged
+    python download_assets.py --atlas      # Also pack all frames into Phaser multi-atlas pages
+    python download_assets.py --atlas --trim  # ...trimming transparent borders from each frame
+    python download_assets.py --atlas --dedupe  # ...storing identical frames only once
+    python download_assets.py --optimize-png --webp  # Smallest lossless PNG (+ WebP), with a size report
+    python download_assets.py --scales 0.5  # Also write nearest-neighbor 0.5x sheets for low-end devices
+    python download_assets.py --hitboxes --hitbox-mask 4  # Per-frame bounds (+ 4px collision masks) sidecars
+    python download_assets.py --palettes   # Indexed sheets + palette tables with shiny/elite/shadow recolors
+    python download_assets.py --flip-directions  # Drop left-facing rows that mirror the right-facing ones (flipX)
+    python download_assets.py --hash-names  # Content-hashed filenames (immutable caching) + precache list
+    python download_assets.py --shards     # Manifest index + per-group shards (the game boots on the core ones)
+    python download_assets.py --bake-textures  # Render the effect textures + cave autotiles the game drew at boot
+    python download_assets.py --engine numpy  # Array-backed frame processing (drops empty cells)
+    python download_assets.py --profile    # Time each stage, write a Chrome trace + summary
+    python download_assets.py --profile --profile-output trace.json  # Write the trace somewhere else
+    python download_assets.py --cprofile out.prof  # Dump cProfile stats (python -m pstats out.prof)
 """
 
 import argparse
+import contextlib
+import cProfile
+import hashlib
+import io
 import json
 import os
+import random
 import sys
 import tempfile
+import threading
+import time
 import xml.etree.ElementTree as ET
 import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from io import BytesIO
 from pathlib import Path
 from typing import NamedTuple
 
 import requests
-from PIL import Image
+from PIL import Image, ImageOps
+
+from asset_fingerprint import (
+    is_fingerprinted,
+    manifest_files,
+    precache_entries,
+    publish_files,
+    remove_unreferenced,
+    strip_fingerprint,
+    write_precache,
+)
+from atlas_packer import (
+    DEFAULT_EXTRUDE,
+    DEFAULT_MAX_SIZE,
+    DEFAULT_PADDING,
+    AtlasFrame,
+    dedupe_frames,
+    pack_frames,
+    trim_frames,
+    write_multiatlas,
+)
+from baked_textures import bake_textures
+from manifest_shards import (
+    build_index,
+    index_files,
+    is_index,
+    manifest_lock,
+    remove_stale_shards,
+    shard_paths,
+    split_manifest,
+    write_if_changed,
+)
+import pipeline_profiler
+from pipeline_profiler import add_spans, drain_spans, print_summary, profile_stage, write_trace
+from sprite_arrays import (
+    ENGINES,
+    array_to_image,
+    cell_grid,
+    crop_array,
+    empty_cells,
+    image_to_array,
+    numpy_available,
+    rows_mirrored,
+    used_grid,
+)
+from sprite_encoder import EncodeOptions, EncodeResult, print_size_report, webp_available, write_sheet
+from sprite_hitboxes import HitboxOptions, compute_hitboxes, hitbox_path, write_hitboxes
+from sprite_palettes import MAX_PALETTE_COLORS, PALETTE_VARIANTS, palette_paths, write_palette
+from sprite_cache import SpriteCache, format_size, parse_size, sha256_bytes, temp_path
+from sprite_mirror import MirrorMember, SpriteMirror, open_member
+from texture_budget import measure_manifest, print_budget_report, report_json
 
 # =============================================================================
 # Configuration
@@ -32,18 +113,84 @@ from PIL import Image
 # Default Pokémon IDs to download
 DEFAULT_POKEMON_IDS = [1, 4, 7, 25, 133, 150]
 
-# PMDCollab SpriteServer URL (provides sprites.zip files)
-SPRITESERVER_URL = "https://spriteserver.pmdcollab.org/assets"
+# PMDCollab SpriteServer URL (provides sprites.zip files).
+# Override with the SPRITESERVER_URL environment variable to point the pipeline
+# at a local stand-in server.
+SPRITESERVER_URL = os.environ.get("SPRITESERVER_URL", "https://spriteserver.pmdcollab.org/assets")
+
+# HTTP retry policy: jittered exponential backoff on transient failures
+FETCH_RETRIES = 4
+FETCH_BACKOFF_BASE = 0.5  # seconds
+FETCH_BACKOFF_MAX = 8.0  # seconds
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Downloads are streamed to disk in chunks of this size
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
 # Output directories (relative to project root)
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
-SPRITES_OUTPUT_DIR = PROJECT_ROOT / "public" / "assets" / "sprites"
-MANIFEST_OUTPUT_PATH = PROJECT_ROOT / "public" / "assets" / "manifest.json"
+PUBLIC_DIR = PROJECT_ROOT / "public"  # manifest paths are relative to this
+SPRITES_OUTPUT_DIR = PUBLIC_DIR / "assets" / "sprites"
+MANIFEST_OUTPUT_PATH = PUBLIC_DIR / "assets" / "manifest.json"
+
+# Per-group manifest shards (--shards); manifest.json is then their index
+MANIFEST_SHARDS_DIR = PUBLIC_DIR / "assets" / "manifest"
+
+# Phaser animation definitions for every manifest animation (AnimationManager.fromJSON)
+ANIMATIONS_OUTPUT_PATH = PUBLIC_DIR / "assets" / "animations.json"
+
+# Files for a service worker to fetch ahead of time (--hash-names)
+PRECACHE_OUTPUT_PATH = PUBLIC_DIR / "assets" / "precache.json"
+
+# Animations whose full-size sheet the game also loads by its plain name, outside
+# the manifest (character select portraits use assets/sprites/{id}-idle.png), so
+# --hash-names keeps a plain copy of them
+PLAIN_NAME_ANIMATIONS = {"idle"}
+
+# AnimData.xml durations are in game ticks; frame rates for animations without them
+# (enemies animate faster, as in the Preloader's fallback)
+ANIM_TICKS_PER_SECOND = 60
+DEFAULT_ANIM_FRAME_RATE = 8
+ENEMY_ANIM_FRAME_RATE = 12
+ENEMY_SPRITE_NAMES = {"rattata", "geodude", "zubat"}
+
+# Sheet row order (PMD): animation keys are {sprite}-{anim}-{direction}
+DIRECTION_NAMES = ["down", "down-right", "right", "up-right", "up", "up-left", "left", "down-left"]
+
+# Left-facing direction rows -> the right-facing rows they usually mirror (--flip-directions)
+MIRRORED_DIRECTIONS = {5: 3, 6: 2, 7: 1}  # up-left, left, down-left
+
+# Texture atlas output (--atlas): {ATLAS_BASENAME}.json + {ATLAS_BASENAME}-{n}.png
+ATLAS_OUTPUT_DIR = PUBLIC_DIR / "assets" / "atlas"
+ATLAS_BASENAME = "sprites"
+
+# Baked procedural textures (--bake-textures) and the autotile cave_auto is built from
+TEXTURES_OUTPUT_DIR = PUBLIC_DIR / "assets" / "textures"
+AUTOTILE_SOURCE_PATH = PROJECT_ROOT / "src" / "assets" / "Autotiles" / "Dirt.png"
+BAKED_TEXTURES_ID = "textures"  # id and name of their manifest entry
 
 # Cache directory for downloaded zips (not in public, excluded from git)
 CACHE_DIR = SCRIPT_DIR / ".cache"
 
+# Packed offline copy of the sprites.zip files (`mirror` command)
+DEFAULT_MIRROR_DIR = SCRIPT_DIR / "mirror"
+MIRROR_DIR: Path | None = None  # set by --mirror: read zips from here instead of SpriteServer
+
+# Build lockfile: input hashes of every output, so unchanged outputs are skipped
+# (local build state, excluded from git)
+BUILD_LOCK_PATH = SCRIPT_DIR / "sprites.lock.json"
+
+# Bump whenever a change to the processing code alters the output images, so
+# every output is rebuilt on the next run
+PIPELINE_VERSION = 1
+
+# Default --profile output (Chrome trace format, also holds the stage/item totals)
+PROFILE_OUTPUT_PATH = SCRIPT_DIR / ".profile" / "trace.json"
+
+# Byte budget for CACHE_DIR; least-recently-used zips are evicted beyond it
+CACHE_MAX_BYTES = parse_size(os.environ.get("SPRITE_CACHE_MAX_BYTES", "512M"))
+
 # Pokémon name mapping (to avoid extra API calls)
 POKEMON_NAMES = {
     1: "bulbasaur", 2: "ivysaur", 3: "venusaur",
@@ -135,6 +282,60 @@ class AnimationData(NamedTuple):
     frame_width: int
     frame_height: int
     frame_count: int
+    durations: tuple[int, ...] = ()  # per-frame <Duration>s, in ticks
+
+
+class BuildRecord(NamedTuple):
+    """Inputs and output hash of one generated file, as stored in the build lockfile"""
+    source_sha256: str  # hash of the {Anim}-Anim.png zip member
+    anim_data: AnimationData
+    pipeline_version: int
+    output_sha256: str
+    engine: str = "pil"  # frame engine that produced the output (--engine)
+    encoding: str = "png"  # EncodeOptions.name the output was written with
+    scales: tuple[float, ...] = ()  # downscaled variants written alongside (--scales)
+    hitboxes: str = ""  # HitboxOptions.name of the collision sidecar ("" = none)
+    palettes: tuple[str, ...] = ()  # recolors in the palette table (--palettes)
+    flip_directions: bool = False  # mirrored direction rows dropped (--flip-directions)
+
+
+class BuildOptions(NamedTuple):
+    """How sprite sheets are processed and written (built from the command line in main())"""
+    engine: str = "pil"  # frame engine (--engine)
+    encode_options: EncodeOptions = EncodeOptions()  # --optimize-png / --webp
+    scales: tuple[float, ...] = ()  # downscaled variants (--scales)
+    hitbox_options: HitboxOptions = HitboxOptions()  # collision sidecar (--hitboxes / --hitbox-mask)
+    palettes: tuple[str, ...] = ()  # recolors in the palette table (--palettes)
+    flip_directions: bool = False  # drop mirrored direction rows (--flip-directions)
+
+    @classmethod
+    def from_record(cls, build: BuildRecord) -> "BuildOptions":
+        """The options a lockfile record was built with."""
+        return cls(
+            engine=build.engine,
+            encode_options=EncodeOptions.from_name(build.encoding),
+            scales=build.scales,
+            hitbox_options=HitboxOptions.from_name(build.hitboxes),
+            palettes=build.palettes,
+            flip_directions=build.flip_directions,
+        )
+
+
+class SpriteVariant(NamedTuple):
+    """A downscaled copy of a processed sheet (one texture tier)"""
+    scale: float  # e.g. 0.5
+    path: str
+    frame_width: int
+    frame_height: int
+    formats: tuple[str, ...] = ("png",)
+
+
+class SpritePalette(NamedTuple):
+    """Indexed copy of a sheet and its palette table (--palettes)"""
+    index: str  # 8-bit palette index per pixel
+    table: str  # row 0: the sheet's palette, row N: variants[N - 1]
+    variants: tuple[str, ...]
+    colors: int  # palette size, including transparent index 0
 
 
 class SpriteAnimation(NamedTuple):
@@ -145,6 +346,26 @@ class SpriteAnimation(NamedTuple):
     frame_height: int
     frame_count: int
     directions: int
+    build: BuildRecord | None = None
+    up_to_date: bool = False  # True when the output was reused, not rebuilt
+    formats: tuple[str, ...] = ("png",)  # file formats written for this sheet
+    encoded: tuple[tuple[str, EncodeResult], ...] = ()  # (filename, sizes) written this run, not stored in the lockfile
+    variants: tuple[SpriteVariant, ...] = ()  # downscaled tiers, largest first
+    durations: tuple[int, ...] = ()  # per-frame display time in ms (from AnimData.xml)
+    hitbox: str | None = None  # collision sidecar path (--hitboxes)
+    palette: SpritePalette | None = None
+    rows: tuple[int, ...] = ()  # sheet row of each direction, when mirrored rows were dropped
+    flip_x: tuple[int, ...] = ()  # directions drawn from another direction's row with flipX
+    texture: str | None = None  # texture key of a baked texture (--bake-textures), used instead of {sprite}-{anim}
+
+
+class FetchResult(NamedTuple):
+    """Outcome of a (possibly conditional) HTTP GET"""
+    content: bytes | None  # None when not_modified or streamed to `path`
+    not_modified: bool
+    etag: str | None
+    last_modified: str | None
+    path: Path | None = None  # set when the body was streamed to disk
 
 
 class SpriteInfo(NamedTuple):
@@ -158,15 +379,110 @@ class SpriteInfo(NamedTuple):
 # PMDCollab Integration
 # =============================================================================
 
+_thread_local = threading.local()
+
+
+def get_session() -> requests.Session:
+    """
+    Return this thread's pooled HTTP session.
+    
+    Reusing a session keeps the TCP/TLS connection to SpriteServer alive across
+    downloads. Sessions are not guaranteed thread-safe, so each fetch thread
+    gets its own.
+    """
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _thread_local.session = session
+    return session
+
+
+def _backoff_delay(attempt: int, retry_after: str | None = None) -> float:
+    """Full-jitter exponential backoff, honouring a numeric Retry-After header."""
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), FETCH_BACKOFF_MAX)
+    return random.uniform(0, min(FETCH_BACKOFF_MAX, FETCH_BACKOFF_BASE * 2 ** attempt))
+
+
+def fetch_conditional(
+    url: str,
+    etag: str | None = None,
+    last_modified: str | None = None,
+    timeout: int = 30,
+    dest: Path | None = None,
+) -> FetchResult | None:
+    """
+    GET a URL through the pooled session, retrying transient failures.
+    
+    When validators from a previous response are given, the request is sent
+    with If-None-Match / If-Modified-Since and a 304 comes back as a
+    FetchResult with not_modified=True and no content. When `dest` is given
+    the body is streamed to that file in chunks instead of being returned.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    
+    for attempt in range(FETCH_RETRIES + 1):
+        try:
+            with get_session().get(url, headers=headers, timeout=timeout, stream=dest is not None) as response:
+                if response.status_code in RETRYABLE_STATUS_CODES and attempt < FETCH_RETRIES:
+                    delay = _backoff_delay(attempt, response.headers.get("Retry-After"))
+                    print(f"  ↻ HTTP {response.status_code} from {url}, retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                
+                if response.status_code == 304:
+                    return FetchResult(
+                        content=None,
+                        not_modified=True,
+                        etag=response.headers.get("ETag", etag),
+                        last_modified=response.headers.get("Last-Modified", last_modified),
+                    )
+                
+                response.raise_for_status()
+                
+                if dest is not None:
+                    with open(dest, "wb") as f:
+                        for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+                
+                return FetchResult(
+                    content=None if dest is not None else response.content,
+                    not_modified=False,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    path=dest,
+                )
+        
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+        ) as e:
+            if attempt >= FETCH_RETRIES:
+                print(f"  ⚠️  Failed to fetch {url}: {e}")
+                return None
+            delay = _backoff_delay(attempt)
+            print(f"  ↻ {type(e).__name__} fetching {url}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+        
+        except requests.exceptions.RequestException as e:
+            print(f"  ⚠️  Failed to fetch {url}: {e}")
+            return None
+    
+    return None
+
+
 def fetch_url(url: str, timeout: int = 30) -> bytes | None:
     """Fetch URL content with error handling."""
-    try:
-        response = requests.get(url, timeout=timeout)
-        response.raise_for_status()
-        return response.content
-    except requests.exceptions.RequestException as e:
-        print(f"  ⚠️  Failed to fetch {url}: {e}")
-        return None
+    result = fetch_conditional(url, timeout=timeout)
+    return result.content if result else None
 
 
 def parse_anim_data(xml_content: bytes) -> dict[str, AnimationData]:
@@ -195,15 +511,25 @@ def parse_anim_data(xml_content: bytes) -> dict[str, AnimationData]:
             frame_width = int(frame_width_elem.text) if frame_width_elem is not None and frame_width_elem.text else 48
             frame_height = int(frame_height_elem.text) if frame_height_elem is not None and frame_height_elem.text else 48
             
-            # Count frames from Duration elements
-            frame_count = len(durations_elem.findall("Duration")) if durations_elem is not None else 1
+            # One Duration element per frame; the timings are only kept when every
+            # one is a number, so each stays with its own frame
+            duration_texts = [
+                (duration.text or "").strip() for duration in durations_elem.findall("Duration")
+            ] if durations_elem is not None else []
+            frame_count = len(duration_texts) if durations_elem is not None else 1
+            if all(text.isdigit() for text in duration_texts):
+                durations = tuple(int(text) for text in duration_texts)
+            else:
+                print(f"  ⚠️  {name}: non-numeric <Duration> in AnimData.xml, using the default frame rate")
+                durations = ()
             
             animations[name] = AnimationData(
                 name=name,
                 index=index,
                 frame_width=frame_width,
                 frame_height=frame_height,
-                frame_count=frame_count
+                frame_count=frame_count,
+                durations=durations,
             )
     
     except ET.ParseError as e:
@@ -222,7 +548,8 @@ def parse_anim_data(xml_content: bytes) -> dict[str, AnimationData]:
 def extract_all_directions(
     sprite_sheet: Image.Image,
     anim_data: AnimationData,
-) -> tuple[Image.Image, int]:
+    engine: str = "pil",
+) -> tuple[Image.Image, int, int]:
     """
     Extract animation frames for ALL directions (full sprite sheet).
     
@@ -232,7 +559,10 @@ def extract_all_directions(
     - Rows: 8 directions total
     
     We keep the full grid structure for Phaser's spritesheet loader.
-    Returns: (cropped_sprite_sheet, num_directions)
+    With engine="numpy", trailing rows/columns whose cells are fully
+    transparent are cropped away too, correcting the direction and frame
+    counts AnimData.xml claims.
+    Returns: (cropped_sprite_sheet, num_directions, frame_count)
     """
     fw = anim_data.frame_width
     fh = anim_data.frame_height
@@ -241,7 +571,7 @@ def extract_all_directions(
     # Validate frame dimensions
     if fw <= 0 or fh <= 0:
         print(f"  ⚠️  Invalid frame dimensions ({fw}x{fh}), using full image")
-        return sprite_sheet, 1
+        return sprite_sheet, 1, frame_count
     
     # Calculate expected dimensions
     expected_width = fw * frame_count
@@ -258,49 +588,475 @@ def extract_all_directions(
     crop_width = min(expected_width, sprite_sheet.width)
     crop_height = fh * actual_directions
     
+    if engine == "numpy":
+        return extract_all_directions_numpy(sprite_sheet, anim_data, crop_width, crop_height, actual_directions)
+    
     # Check if we need to crop at all
     if sprite_sheet.width == crop_width and sprite_sheet.height == crop_height:
         print(f"  ✓ Keeping full sheet: {actual_directions} directions × {frame_count} frames")
-        return sprite_sheet, actual_directions
+        return sprite_sheet, actual_directions, frame_count
     
     # Crop to remove any padding/extra space
     cropped = sprite_sheet.crop((0, 0, crop_width, crop_height))
     print(f"  ✓ Cropped to {crop_width}×{crop_height}: {actual_directions} directions × {frame_count} frames")
     
-    return cropped, actual_directions
+    return cropped, actual_directions, frame_count
+
+
+def extract_all_directions_numpy(
+    sprite_sheet: Image.Image,
+    anim_data: AnimationData,
+    crop_width: int,
+    crop_height: int,
+    directions: int,
+) -> tuple[Image.Image, int, int]:
+    """NumPy engine for extract_all_directions: crop, then drop trailing empty rows/columns."""
+    fw, fh = anim_data.frame_width, anim_data.frame_height
+    frame_count = anim_data.frame_count
+    sheet = crop_array(image_to_array(sprite_sheet), crop_width, crop_height)
+    
+    used_rows, used_cols = used_grid(empty_cells(cell_grid(sheet, fw, fh)))
+    if used_rows and (used_rows < directions or used_cols < frame_count):
+        print(f"  ✓ Dropped empty cells: {directions}→{used_rows} directions, {frame_count}→{used_cols} frames")
+        directions, frame_count = used_rows, used_cols
+        sheet = sheet[: used_rows * fh, : used_cols * fw]
+    
+    print(f"  ✓ Cropped to {sheet.shape[1]}×{sheet.shape[0]}: {directions} directions × {frame_count} frames")
+    return array_to_image(sheet), directions, frame_count
+
+
+def drop_mirrored_directions(
+    sheet: Image.Image,
+    frame_width: int,
+    frame_height: int,
+    frame_count: int,
+    directions: int,
+    engine: str = "pil",
+) -> tuple[Image.Image, tuple[int, ...], tuple[int, ...]]:
+    """
+    Remove left-facing rows that are horizontal mirrors of their right-facing
+    rows (see MIRRORED_DIRECTIONS), so the game can draw them with flipX.
+    
+    Every frame of a row pair is compared pixel by pixel; a pair that differs
+    anywhere (an asymmetric species, a one-sided accessory) keeps both rows.
+    Returns: (sheet, rows, flip_x) where rows[d] is the sheet row direction d
+    is drawn from and flip_x lists the directions drawn flipped. rows and
+    flip_x are empty when no row was dropped.
+    """
+    if directions != len(DIRECTION_NAMES) or frame_width <= 0 or frame_height <= 0:
+        return sheet, (), ()
+    
+    columns = min(frame_count, sheet.width // frame_width)
+    if engine == "numpy":
+        cells = cell_grid(image_to_array(sheet), frame_width, frame_height)[:, :columns]
+        flip_x = tuple(left for left, right in MIRRORED_DIRECTIONS.items() if rows_mirrored(cells, left, right))
+    else:
+        def cell(row: int, col: int) -> Image.Image:
+            return sheet.crop((col * frame_width, row * frame_height,
+                               (col + 1) * frame_width, (row + 1) * frame_height))
+        
+        flip_x = tuple(
+            left for left, right in MIRRORED_DIRECTIONS.items()
+            if all(cell(left, col).tobytes() == ImageOps.mirror(cell(right, col)).tobytes() for col in range(columns))
+        )
+    
+    if not flip_x:
+        print("  ✓ No mirrored direction rows, keeping all 8")
+        return sheet, (), ()
+    
+    kept = [row for row in range(directions) if row not in flip_x]
+    reduced = Image.new("RGBA", (sheet.width, len(kept) * frame_height))
+    for index, row in enumerate(kept):
+        reduced.paste(sheet.crop((0, row * frame_height, sheet.width, (row + 1) * frame_height)),
+                      (0, index * frame_height))
+    rows = tuple(kept.index(MIRRORED_DIRECTIONS[row] if row in flip_x else row) for row in range(directions))
+    print(f"  ✓ Dropped {len(flip_x)} mirrored direction row(s) "
+          f"({', '.join(DIRECTION_NAMES[row] for row in flip_x)} drawn flipped): {directions}→{len(kept)} rows")
+    return reduced, rows, flip_x
+
+
+def scale_label(scale: float) -> str:
+    """Manifest key / filename part for a scale: 0.5 -> "0.5"."""
+    return f"{scale:g}"
+
+
+def downscale_sheet(
+    sheet: Image.Image,
+    frame_width: int,
+    frame_height: int,
+    scale: float,
+) -> tuple[Image.Image, int, int]:
+    """
+    Nearest-neighbor copy of a sheet at `scale`, keeping the frame grid intact.
+    
+    Frame dimensions are rounded to whole pixels first and the sheet is resized
+    by exactly that ratio, so every cell maps onto one scaled cell and pixel
+    art stays crisp (no filtering). Returns (image, frame_width, frame_height).
+    """
+    scaled_width = max(1, round(frame_width * scale))
+    scaled_height = max(1, round(frame_height * scale))
+    size = (
+        max(1, round(sheet.width * scaled_width / frame_width)),
+        max(1, round(sheet.height * scaled_height / frame_height)),
+    )
+    return sheet.resize(size, Image.Resampling.NEAREST), scaled_width, scaled_height
+
+
+def variant_filename(filename: str, scale: float) -> str:
+    """Output name of a scaled variant: 25-walk.png -> 25-walk@0.5x.png."""
+    path = Path(filename)
+    return f"{path.stem}@{scale_label(scale)}x{path.suffix}"
+
+
+# =============================================================================
+# Incremental Builds
+# =============================================================================
+
+def load_build_lock() -> dict[str, SpriteAnimation]:
+    """
+    Load the build lockfile as {output filename: SpriteAnimation}.
+    
+    Each entry carries the manifest fields of the output plus the BuildRecord
+    (source member hash, AnimationData, pipeline version, output hash) it was
+    built from. A missing or unreadable lockfile simply means "rebuild all".
+    """
+    if not BUILD_LOCK_PATH.exists():
+        return {}
+    try:
+        data = json.loads(BUILD_LOCK_PATH.read_text())
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"  ⚠️  Could not load build lockfile, rebuilding everything: {e}")
+        return {}
+    
+    lock: dict[str, SpriteAnimation] = {}
+    for filename, record in data.get("outputs", {}).items():
+        try:
+            build = record.pop("build")
+            record["formats"] = tuple(record.get("formats", ("png",)))
+            record["durations"] = tuple(record.get("durations", ()))
+            record["rows"] = tuple(record.get("rows", ()))
+            record["flip_x"] = tuple(record.get("flip_x", ()))
+            if record.get("palette"):
+                record["palette"] = SpritePalette(
+                    **{**record["palette"], "variants": tuple(record["palette"]["variants"])}
+                )
+            record["variants"] = tuple(
+                SpriteVariant(**{**variant, "formats": tuple(variant.get("formats", ("png",)))})
+                for variant in record.get("variants", ())
+            )
+            lock[filename] = SpriteAnimation(
+                **record,
+                build=BuildRecord(
+                    source_sha256=build["source_sha256"],
+                    anim_data=AnimationData(**{
+                        **build["anim_data"], "durations": tuple(build["anim_data"].get("durations", ())),
+                    }),
+                    pipeline_version=build["pipeline_version"],
+                    output_sha256=build["output_sha256"],
+                    engine=build.get("engine", "pil"),
+                    encoding=build.get("encoding", "png"),
+                    scales=tuple(build.get("scales", ())),
+                    hitboxes=build.get("hitboxes", ""),
+                    palettes=tuple(build.get("palettes", ())),
+                    flip_directions=build.get("flip_directions", False),
+                ),
+            )
+        except (KeyError, TypeError):
+            continue
+    return lock
+
+
+def save_build_lock(lock: dict[str, SpriteAnimation], sprites: list[SpriteInfo]) -> None:
+    """Merge freshly built animations into the lockfile and write it if it changed."""
+    for sprite in sprites:
+        for anim in sprite.animations:
+            if anim.build is not None:
+                lock[strip_fingerprint(Path(anim.path).name)] = anim._replace(up_to_date=False, encoded=())
+    
+    outputs = {}
+    for filename, anim in sorted(lock.items()):
+        record = anim._asdict()
+        record.pop("up_to_date")
+        record.pop("encoded")
+        record["variants"] = [variant._asdict() for variant in anim.variants]
+        record["palette"] = anim.palette._asdict() if anim.palette else None
+        record["build"] = {**anim.build._asdict(), "anim_data": anim.build.anim_data._asdict()}
+        outputs[filename] = record
+    
+    content = json.dumps({"outputs": outputs}, indent=2) + "\n"
+    if BUILD_LOCK_PATH.exists() and BUILD_LOCK_PATH.read_text() == content:
+        return
+    BUILD_LOCK_PATH.write_text(content)
+
+
+def is_up_to_date(
+    previous: SpriteAnimation | None,
+    source_sha256: str,
+    anim_data: AnimationData,
+    output_path: Path,
+    options: BuildOptions = BuildOptions(),
+) -> bool:
+    """
+    True if `previous` was built from these exact inputs and its outputs are intact.
+    
+    The files are looked up next to `output_path` under the names `previous`
+    records, which are content-hashed after a --hash-names run.
+    """
+    if previous is None or previous.build is None:
+        return False
+    build = previous.build
+    if (build.source_sha256 != source_sha256
+            or build.anim_data != anim_data
+            or build.pipeline_version != PIPELINE_VERSION
+            or build.engine != options.engine
+            or build.encoding != options.encode_options.name
+            or build.scales != options.scales
+            or build.hitboxes != options.hitbox_options.name
+            or build.palettes != options.palettes
+            or build.flip_directions != options.flip_directions):
+        return False
+    def recorded(path: str) -> Path:
+        return output_path.with_name(Path(path).name)
+    
+    sheet_path = recorded(previous.path)
+    if previous.palette and not all(
+        recorded(path).exists() for path in (previous.palette.index, previous.palette.table)
+    ):
+        return False
+    if previous.hitbox and not recorded(previous.hitbox).exists():
+        return False
+    if any(not sheet_path.with_suffix(f".{fmt}").exists() for fmt in previous.formats):
+        return False
+    for variant in previous.variants:
+        variant_path = recorded(variant.path)
+        if any(not variant_path.with_suffix(f".{fmt}").exists() for fmt in variant.formats):
+            return False
+    try:
+        return sha256_bytes(sheet_path.read_bytes()) == build.output_sha256
+    except OSError:
+        return False
 
 
 # =============================================================================
 # Main Processing
 # =============================================================================
 
-def download_and_process_pokemon(pokemon_id: int) -> SpriteInfo | None:
-    """Download and process a single Pokémon's sprite from SpriteServer."""
-    name = POKEMON_NAMES.get(pokemon_id, f"pokemon_{pokemon_id}")
-    print(f"📥 Processing #{pokemon_id} ({name})...")
+_cache: SpriteCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> SpriteCache:
+    """Return the shared download cache for CACHE_DIR (created on first use)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None or _cache.root != CACHE_DIR or _cache.max_bytes != CACHE_MAX_BYTES:
+            _cache = SpriteCache(CACHE_DIR, CACHE_MAX_BYTES)
+        return _cache
+
+
+_mirror: SpriteMirror | None = None
+
+
+def get_mirror(root: Path | None = None) -> SpriteMirror:
+    """Return the shared sprite mirror for `root` (default MIRROR_DIR), opened on first use."""
+    global _mirror
+    root = root or MIRROR_DIR
+    with _cache_lock:
+        if _mirror is None or _mirror.root != root:
+            _mirror = SpriteMirror(root)
+        return _mirror
+
+
+def flush_cache() -> None:
+    """Persist the cache's access times and validators, if the cache was used."""
+    if _cache is not None:
+        _cache.flush()
+
+
+def profile_label(pokemon_id: int) -> str:
+    """Name a Pokémon's stages in --profile output."""
+    return f"#{pokemon_id} {POKEMON_NAMES.get(pokemon_id, f'pokemon_{pokemon_id}')}"
+
+
+def fetch_sprite_zip(pokemon_id: int, refresh: bool = False) -> Path | MirrorMember | None:
+    """
+    Return the path of a Pokémon's sprites.zip in the local cache, downloading
+    it from SpriteServer if needed. With MIRROR_DIR set (--mirror) the zip
+    comes from the packed mirror instead and nothing is downloaded.
+    
+    Downloads are streamed to disk, so the archive is never held in memory.
+    Cached zips are verified against their SHA-256 on read; a corrupt entry is
+    discarded and downloaded again. With refresh=True a cached zip is
+    revalidated against the server using the stored ETag/Last-Modified, so an
+    unchanged zip costs a 304.
     
+    The returned cache entry is pinned so it cannot be evicted while it is
+    being processed; call release_sprite_zip() when done.
+    """
     # Pad ID with leading zeros for PMDCollab format
     padded_id = str(pokemon_id).zfill(4)
     
-    # Check if we have a cached zip
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    cache_path = CACHE_DIR / f"{padded_id}_sprites.zip"
+    if MIRROR_DIR is not None:
+        member = get_mirror().member(padded_id)
+        if member is None:
+            print(f"  ❌ #{pokemon_id} is not in the sprite mirror (download_assets.py mirror {pokemon_id})")
+            return None
+        print(f"  ✓ Using mirrored zip: {padded_id} ({format_size(member.size)})")
+        return member
+    
+    cache = get_cache()
+    with profile_stage("cache"):
+        cached = cache.get_path(padded_id, pin=True)
     
-    if cache_path.exists():
-        print(f"  ✓ Using cached zip: {cache_path.name}")
-        zip_data = cache_path.read_bytes()
-    else:
-        # Download sprites.zip from SpriteServer
-        zip_url = f"{SPRITESERVER_URL}/{padded_id}/sprites.zip"
-        zip_data = fetch_url(zip_url)
+    if cached is not None and not refresh:
+        print(f"  ✓ Using cached zip: {padded_id} ({format_size(cached.stat().st_size)})")
+        return cached
+    
+    # Only send validators when we still hold a verified copy to fall back on
+    entry = cache.get_entry(padded_id) if cached is not None else None
+    
+    # Download sprites.zip from SpriteServer
+    zip_url = f"{SPRITESERVER_URL}/{padded_id}/sprites.zip"
+    download_path = temp_path(CACHE_DIR, f"download-{padded_id}")
+    try:
+        with profile_stage("network"):
+            result = fetch_conditional(
+                zip_url,
+                etag=entry.etag if entry else None,
+                last_modified=entry.last_modified if entry else None,
+                dest=download_path,
+            )
         
-        if zip_data is None:
+        if result is None:
+            if cached is not None:
+                print(f"  ⚠️  Revalidation failed, using cached zip: {padded_id}")
+                return cached
             print(f"  ❌ Could not fetch sprites.zip for #{pokemon_id}")
             return None
         
-        # Save to cache
-        cache_path.write_bytes(zip_data)
-        print(f"  ✓ Cached zip to {cache_path.name}")
+        if result.not_modified and cached is not None:
+            cache.touch(padded_id, result.etag, result.last_modified)
+            print(f"  ✓ Cached zip is up to date (304): {padded_id}")
+            return cached
+        
+        if result.path is None or not zipfile.is_zipfile(result.path):
+            if cached is not None:
+                print(f"  ⚠️  Downloaded sprites.zip for #{pokemon_id} is not a valid zip, using cached zip: {padded_id}")
+                return cached
+            print(f"  ❌ Downloaded sprites.zip for #{pokemon_id} is not a valid zip, not caching it")
+            return None
+        
+        # Move the download into the cache (replacing any stale copy)
+        size = result.path.stat().st_size
+        if cached is not None:
+            cache.unpin(padded_id)
+        with profile_stage("cache"):
+            cache.put_file(
+                padded_id,
+                result.path,
+                etag=result.etag,
+                last_modified=result.last_modified,
+                url=zip_url,
+                pin=True,
+            )
+        print(f"  ✓ Cached zip: {padded_id} ({format_size(size)})")
+        return cache.get_path(padded_id)
+    finally:
+        download_path.unlink(missing_ok=True)
+
+
+def release_sprite_zip(pokemon_id: int) -> None:
+    """Unpin a zip returned by fetch_sprite_zip once it has been processed."""
+    if MIRROR_DIR is not None:
+        return
+    get_cache().unpin(str(pokemon_id).zfill(4))
+
+
+def download_and_process_pokemon(
+    pokemon_id: int,
+    refresh: bool = False,
+    build_lock: dict[str, SpriteAnimation] | None = None,
+    options: BuildOptions = BuildOptions(),
+) -> SpriteInfo | None:
+    """Download and process a single Pokémon's sprite from SpriteServer."""
+    name = POKEMON_NAMES.get(pokemon_id, f"pokemon_{pokemon_id}")
+    print(f"📥 Processing #{pokemon_id} ({name})...")
+    
+    with profile_stage("fetch", profile_label(pokemon_id)):
+        zip_path = fetch_sprite_zip(pokemon_id, refresh)
+    if zip_path is None:
+        return None
+    
+    try:
+        with profile_stage("process", profile_label(pokemon_id)):
+            return process_sprite_zip(pokemon_id, zip_path, build_lock, options)
+    finally:
+        release_sprite_zip(pokemon_id)
+
+
+def rebuild_cached(pokemon_ids: list[int]) -> list[SpriteInfo]:
+    """
+    Reprocess Pokémon from their cached zips with the options their outputs
+    were last built with (per the lockfile), then update the manifest and
+    lockfile. Used by generate_sprite.py --watch when the download cache
+    changes; Pokémon without lockfile outputs or cached zips are skipped.
+    """
+    build_lock = load_build_lock()
+    # A fresh instance: another process may have rewritten the cache index
+    cache = SpriteCache(CACHE_DIR, CACHE_MAX_BYTES)
+    sprites: list[SpriteInfo] = []
+    hash_names = False
+    for pokemon_id in pokemon_ids:
+        previous = next(
+            (build_lock[f"{pokemon_id}-{key}.png"] for key in ("walk", "idle") if f"{pokemon_id}-{key}.png" in build_lock),
+            None,
+        )
+        zip_path = cache.get_path(str(pokemon_id).zfill(4))
+        if previous is None or zip_path is None:
+            continue
+        hash_names = hash_names or is_fingerprinted(Path(previous.path).name)
+        print(f"📥 Processing #{pokemon_id} ({POKEMON_NAMES.get(pokemon_id, f'pokemon_{pokemon_id}')})...")
+        sprite_info = process_sprite_zip(pokemon_id, zip_path, build_lock, BuildOptions.from_record(previous.build))
+        if sprite_info:
+            sprites.append(sprite_info)
+    
+    if sprites:
+        sprites = generate_manifest(sprites, hash_names)
+        save_build_lock(build_lock, sprites)
+        publish_outputs(hash_names)
+    return sprites
+
+
+def process_sprite_zip(
+    pokemon_id: int,
+    zip_source: Path | bytes | MirrorMember,
+    build_lock: dict[str, SpriteAnimation] | None = None,
+    options: BuildOptions = BuildOptions(),
+) -> SpriteInfo | None:
+    """
+    Extract, crop and save the walk/idle sheets from a sprites.zip.
+    
+    `zip_source` is normally the path of the cached zip, or its location in
+    the sprite mirror: the archive is opened in place (memory-mapped for the
+    mirror) and only AnimData.xml and the needed *-Anim.png members are read.
+    Raw bytes are still accepted for callers that already hold the archive.
+    
+    Outputs whose lockfile entry in `build_lock` matches the current inputs
+    (and whose file on disk is intact) are reused instead of re-encoded.
+    `options` (see BuildOptions):
+    
+    - engine selects the frame engine ("pil" or "numpy", see sprite_arrays)
+      and encode_options how the sheets are written (see sprite_encoder).
+    - For each of scales a nearest-neighbor downscaled copy of every sheet
+      is written as well (e.g. 25-walk@0.5x.png), and hitbox_options adds a
+      per-frame collision sidecar (see sprite_hitboxes).
+    - With palettes, each sheet is also written as indexed pixels plus a
+      palette table holding those recolors (see sprite_palettes).
+    - With flip_directions, left-facing rows that mirror their right-facing
+      rows are dropped from every sheet (see drop_mirrored_directions);
+      hitboxes still cover all 8 directions.
+    """
+    name = POKEMON_NAMES.get(pokemon_id, f"pokemon_{pokemon_id}")
     
     # Extract files from zip
     # Process animations
@@ -313,14 +1069,22 @@ def download_and_process_pokemon(pokemon_id: int) -> SpriteInfo | None:
     }
     
     try:
-        with zipfile.ZipFile(BytesIO(zip_data)) as zf:
+        if isinstance(zip_source, MirrorMember):
+            zip_file = open_member(zip_source)
+        else:
+            zip_file = BytesIO(zip_source) if isinstance(zip_source, bytes) else zip_source
+        with zip_file if isinstance(zip_file, io.IOBase) else contextlib.nullcontext(), \
+                zipfile.ZipFile(zip_file) as zf:
+            members = set(zf.namelist())
+            
             # Read AnimData.xml
-            if "AnimData.xml" not in zf.namelist():
+            if "AnimData.xml" not in members:
                 print(f"  ❌ AnimData.xml not found in zip for #{pokemon_id}")
                 return None
             
-            anim_xml = zf.read("AnimData.xml")
-            animations = parse_anim_data(anim_xml)
+            with profile_stage("zip", member="AnimData.xml"):
+                anim_xml = zf.read("AnimData.xml")
+                animations = parse_anim_data(anim_xml)
             
             # Loop through desired animation types
             for anim_key, xml_names in target_anims.items():
@@ -345,35 +1109,136 @@ def download_and_process_pokemon(pokemon_id: int) -> SpriteInfo | None:
                 
                 # Read sprite sheet
                 anim_filename = f"{found_anim.name}-Anim.png"
-                if anim_filename not in zf.namelist():
+                if anim_filename not in members:
                     print(f"  ❌ {anim_filename} not found in zip")
                     continue
                 
-                sprite_data = zf.read(anim_filename)
+                with profile_stage("zip", member=anim_filename):
+                    sprite_data = zf.read(anim_filename)
+                    source_sha256 = sha256_bytes(sprite_data)
+                filename = f"{pokemon_id}-{anim_key}.png"
+                output_path = SPRITES_OUTPUT_DIR / filename
+                
+                # Skip if the lockfile says this exact input was already built
+                previous = (build_lock or {}).get(filename)
+                if is_up_to_date(previous, source_sha256, found_anim, output_path, options):
+                    processed_anims.append(previous._replace(key=anim_key, up_to_date=True))
+                    print(f"    = {filename} is up to date")
+                    continue
                 
                 # Process image
                 try:
-                    sprite_sheet = Image.open(BytesIO(sprite_data))
-                    sprite_sheet = sprite_sheet.convert("RGBA")
+                    with profile_stage("decode", anim=anim_key):
+                        sprite_sheet = Image.open(BytesIO(sprite_data))
+                        sprite_sheet = sprite_sheet.convert("RGBA")
                     
                     # Extract directions
-                    processed_sheet, directions = extract_all_directions(sprite_sheet, found_anim)
+                    with profile_stage("crop", anim=anim_key):
+                        processed_sheet, directions, frame_count = extract_all_directions(
+                            sprite_sheet, found_anim, options.engine
+                        )
+                    
+                    # Mirrored left-facing rows (hitboxes are computed on the full sheet below)
+                    full_sheet = processed_sheet
+                    rows, flip_x = (), ()
+                    if options.flip_directions:
+                        with profile_stage("mirror", anim=anim_key):
+                            processed_sheet, rows, flip_x = drop_mirrored_directions(
+                                full_sheet, found_anim.frame_width, found_anim.frame_height,
+                                frame_count, directions, options.engine,
+                            )
                     
                     # Save output
-                    filename = f"{pokemon_id}-{anim_key}.png"
-                    output_path = SPRITES_OUTPUT_DIR / filename
                     SPRITES_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-                    processed_sheet.save(output_path, "PNG")
+                    with profile_stage("encode", anim=anim_key):
+                        encoded = write_sheet(processed_sheet, output_path, options.encode_options)
+                    print(f"    -> Saved to {output_path.name}")
+                    
+                    # Collision sidecar (removed again when --hitboxes is off)
+                    sidecar_path = hitbox_path(output_path)
+                    hitbox = None
+                    if options.hitbox_options.enabled and found_anim.frame_width > 0 and found_anim.frame_height > 0:
+                        with profile_stage("hitbox", anim=anim_key):
+                            write_hitboxes(sidecar_path, compute_hitboxes(
+                                full_sheet, found_anim.frame_width, found_anim.frame_height,
+                                frame_count, directions, options.hitbox_options, options.engine,
+                            ))
+                        hitbox = f"assets/sprites/{sidecar_path.name}"
+                        print(f"    -> Hitboxes in {sidecar_path.name}")
+                    else:
+                        sidecar_path.unlink(missing_ok=True)
+                    
+                    # Indexed pixels + palette table (removed again when --palettes is off)
+                    palette = None
+                    if options.palettes:
+                        with profile_stage("palette", anim=anim_key):
+                            colors = write_palette(processed_sheet, output_path, list(options.palettes))
+                        if colors is None:
+                            print(f"  ⚠️  {filename} has over {MAX_PALETTE_COLORS} colors, no palette written")
+                        else:
+                            index_path, table_path = palette_paths(output_path)
+                            palette = SpritePalette(
+                                index=f"assets/sprites/{index_path.name}",
+                                table=f"assets/sprites/{table_path.name}",
+                                variants=options.palettes,
+                                colors=colors,
+                            )
+                            print(f"    -> {colors}-color palette in {table_path.name} ({', '.join(options.palettes)})")
+                    else:
+                        for path in palette_paths(output_path):
+                            path.unlink(missing_ok=True)
+                    
+                    # Downscaled tiers (skipped when the frame grid is unknown)
+                    variants = []
+                    encoded_files = [(filename, encoded)]
+                    for scale in options.scales if found_anim.frame_width > 0 and found_anim.frame_height > 0 else ():
+                        variant_name = variant_filename(filename, scale)
+                        with profile_stage("scale", anim=anim_key, scale=scale):
+                            scaled_sheet, scaled_width, scaled_height = downscale_sheet(
+                                processed_sheet, found_anim.frame_width, found_anim.frame_height, scale
+                            )
+                        with profile_stage("encode", anim=anim_key, scale=scale):
+                            variant_encoded = write_sheet(
+                                scaled_sheet, SPRITES_OUTPUT_DIR / variant_name, options.encode_options
+                            )
+                        variants.append(SpriteVariant(
+                            scale=scale,
+                            path=f"assets/sprites/{variant_name}",
+                            frame_width=scaled_width,
+                            frame_height=scaled_height,
+                            formats=variant_encoded.formats,
+                        ))
+                        encoded_files.append((variant_name, variant_encoded))
+                        print(f"    -> {scale_label(scale)}x: {scaled_width}x{scaled_height} frames in {variant_name}")
                     
                     processed_anims.append(SpriteAnimation(
                         key=anim_key,
                         path=f"assets/sprites/{filename}",
                         frame_width=found_anim.frame_width,
                         frame_height=found_anim.frame_height,
-                        frame_count=found_anim.frame_count,
-                        directions=directions
+                        frame_count=frame_count,
+                        directions=directions,
+                        formats=encoded.formats,
+                        encoded=tuple(encoded_files),
+                        variants=tuple(variants),
+                        durations=ticks_to_ms(found_anim.durations[:frame_count]),
+                        hitbox=hitbox,
+                        palette=palette,
+                        rows=rows,
+                        flip_x=flip_x,
+                        build=BuildRecord(
+                            source_sha256=source_sha256,
+                            anim_data=found_anim,
+                            pipeline_version=PIPELINE_VERSION,
+                            output_sha256=sha256_bytes(output_path.read_bytes()),
+                            engine=options.engine,
+                            encoding=options.encode_options.name,
+                            scales=options.scales,
+                            hitboxes=options.hitbox_options.name,
+                            palettes=options.palettes,
+                            flip_directions=options.flip_directions,
+                        ),
                     ))
-                    print(f"    -> Saved to {output_path.name}")
                     
                 except Exception as e:
                      print(f"  ❌ Failed to process {anim_key}: {e}")
@@ -396,104 +1261,1229 @@ def download_and_process_pokemon(pokemon_id: int) -> SpriteInfo | None:
     )
 
 
-def generate_manifest(sprites: list[SpriteInfo]) -> None:
-    """Generate manifest.json file."""
-    existing_manifest = []
+def publish_animation(anim: SpriteAnimation, hashed: bool) -> SpriteAnimation:
+    """
+    Rename an animation's files to content-hashed names (hashed=True, see
+    asset_fingerprint) or back to their plain names, and return it with the
+    new paths. The PNG and WebP of a sheet share one fingerprint. Sheets of
+    PLAIN_NAME_ANIMATIONS keep a plain-named copy as well.
+    """
+    def publish(path: str, formats: tuple[str, ...] = (), keep_plain: bool = False) -> str:
+        files = [(PUBLIC_DIR / path).with_suffix(f".{fmt}") for fmt in formats] or [PUBLIC_DIR / path]
+        return Path(path).with_name(publish_files(files, hashed, keep_plain)[0].name).as_posix()
     
-    # Load existing manifest if it exists
-    if MANIFEST_OUTPUT_PATH.exists():
-        try:
-            with open(MANIFEST_OUTPUT_PATH, "r") as f:
-                existing_manifest = json.load(f)
+    return anim._replace(
+        path=publish(anim.path, anim.formats, anim.key in PLAIN_NAME_ANIMATIONS),
+        variants=tuple(
+            variant._replace(path=publish(variant.path, variant.formats)) for variant in anim.variants
+        ),
+        hitbox=publish(anim.hitbox) if anim.hitbox else None,
+        palette=anim.palette._replace(
+            index=publish(anim.palette.index),
+            table=publish(anim.palette.table),
+        ) if anim.palette else None,
+    )
+
+
+def generate_manifest(
+    sprites: list[SpriteInfo],
+    hash_names: bool = False,
+    shards: bool | None = None,
+) -> list[SpriteInfo]:
+    """
+    Generate manifest.json file.
+
+    With hash_names the sprites' files are first renamed to content-hashed
+    names (and back to plain names without it). With shards the manifest is
+    written as an index plus per-group shards (and as one flat file without
+    it); None keeps the layout it already has. Returns the sprites with the
+    paths written to the manifest.
+    """
+    # Another run may be merging into the manifest (or sweeping files it no
+    # longer references): hold its lock from renaming the files to the write
+    with manifest_lock(MANIFEST_OUTPUT_PATH):
+        sprites = [
+            sprite._replace(animations=[publish_animation(anim, hash_names) for anim in sprite.animations])
+            for sprite in sprites
+        ]
+        existing_manifest = []
+
+        # Load existing manifest if it exists
+        if MANIFEST_OUTPUT_PATH.exists():
+            try:
+                existing_manifest = read_manifest()
                 print(f"  ✓ Loaded existing manifest with {len(existing_manifest)} entries")
-        except (json.JSONDecodeError, OSError) as e:
-            print(f"  ⚠️  Could not load existing manifest: {e}")
-            existing_manifest = []
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"  ⚠️  Could not load existing manifest: {e}")
+                existing_manifest = []
+
+        # Create a map for easier updates (ID -> Index)
+        id_map = {entry["id"]: i for i, entry in enumerate(existing_manifest)}
+
+        for sprite in sprites:
+            entry = {
+                "id": sprite.id,
+                "name": sprite.name,
+                "animations": [
+                    {
+                        "key": anim.key,
+                        "path": anim.path,
+                        "frameWidth": anim.frame_width,
+                        "frameHeight": anim.frame_height,
+                        "frameCount": anim.frame_count,
+                        "directions": anim.directions,
+                        # Alternative encodings next to the PNG (e.g. WebP), when any
+                        **({"formats": list(anim.formats)} if anim.formats != ("png",) else {}),
+                        # Downscaled texture tiers keyed by scale (--scales)
+                        **({"variants": {
+                            scale_label(variant.scale): {
+                                "path": variant.path,
+                                "frameWidth": variant.frame_width,
+                                "frameHeight": variant.frame_height,
+                                **({"formats": list(variant.formats)} if variant.formats != ("png",) else {}),
+                            }
+                            for variant in anim.variants
+                        }} if anim.variants else {}),
+                        # Per-frame display time in ms, when known (see write_animations)
+                        **({"durations": list(anim.durations)} if anim.durations else {}),
+                        # Per-frame bounds / collision masks (--hitboxes)
+                        **({"hitbox": anim.hitbox} if anim.hitbox else {}),
+                        # Indexed sheet + palette table; row N of the table is variants[N - 1] (--palettes)
+                        **({"palette": {
+                            "index": anim.palette.index,
+                            "table": anim.palette.table,
+                            "variants": list(anim.palette.variants),
+                        }} if anim.palette else {}),
+                        # Sheet row per direction; flipX directions draw a mirrored row flipped (--flip-directions)
+                        **({"rows": list(anim.rows), "flipX": list(anim.flip_x)} if anim.flip_x else {}),
+                        # Loaded under this texture key and not animated (--bake-textures)
+                        **({"texture": anim.texture} if anim.texture else {}),
+                    }
+                    for anim in sprite.animations
+                ]
+            }
+
+            # Update or Append
+            if sprite.id in id_map:
+                print(f"  ↻ Updating entry for #{sprite.id} ({sprite.name})")
+                existing_manifest[id_map[sprite.id]] = entry
+            else:
+                print(f"  + Appending entry for #{sprite.id} ({sprite.name})")
+                existing_manifest.append(entry)
+                # Update map just in case (though not strictly needed if IDs are unique in input)
+                id_map[sprite.id] = len(existing_manifest) - 1
+
+        write_manifest(existing_manifest, shards)
+    return sprites
 
-    # Create a map for easier updates (ID -> Index)
-    id_map = {entry["id"]: i for i, entry in enumerate(existing_manifest)}
+
+def read_manifest() -> list[dict]:
+    """
+    Entries of manifest.json, joined from its shards when it is a shard
+    index. Raises OSError / JSONDecodeError if a file is unreadable.
+    """
+    with open(MANIFEST_OUTPUT_PATH, "r") as f:
+        data = json.load(f)
+    if not is_index(data):
+        return data
     
-    for sprite in sprites:
-        entry = {
-            "id": sprite.id,
-            "name": sprite.name,
-            "animations": [
-                {
-                    "key": anim.key,
-                    "path": anim.path,
-                    "frameWidth": anim.frame_width,
-                    "frameHeight": anim.frame_height,
-                    "frameCount": anim.frame_count,
-                    "directions": anim.directions
-                }
-                for anim in sprite.animations
-            ]
-        }
-        
-        # Update or Append
-        if sprite.id in id_map:
-            print(f"  ↻ Updating entry for #{sprite.id} ({sprite.name})")
-            existing_manifest[id_map[sprite.id]] = entry
-        else:
-            print(f"  + Appending entry for #{sprite.id} ({sprite.name})")
-            existing_manifest.append(entry)
-            # Update map just in case (though not strictly needed if IDs are unique in input)
-            id_map[sprite.id] = len(existing_manifest) - 1
+    manifest = []
+    for shard in data["shards"]:
+        with open(PUBLIC_DIR / shard["path"], "r") as f:
+            manifest += json.load(f)
+    return manifest
+
+
+def load_manifest() -> list[dict]:
+    """Read manifest.json (and its shards), or an empty list if it is missing or unreadable."""
+    try:
+        return read_manifest()
+    except (json.JSONDecodeError, OSError):
+        return []
+
+
+def load_manifest_index() -> dict | None:
+    """manifest.json when it is a shard index (written with --shards), else None."""
+    try:
+        with open(MANIFEST_OUTPUT_PATH, "r") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return None
+    return data if is_index(data) else None
+
+
+def write_manifest(manifest: list[dict], shards: bool | None = None) -> None:
+    """
+    Write manifest.json, flat or (with shards) as an index of per-group
+    shards with their own animations files; shards=None keeps the current
+    layout. Files are replaced atomically and left untouched if nothing
+    changed. Callers that read the manifest first must hold manifest_lock().
+    """
+    if shards is None:
+        shards = load_manifest_index() is not None
     
-    MANIFEST_OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    written: set[Path] = set()
+    changed = False
+    if shards:
+        groups = split_manifest(manifest)
+        # Shards before the index, so the index never points at a missing shard
+        for group, entries in groups:
+            path, animations_path = shard_paths(MANIFEST_SHARDS_DIR, group.name)
+            changed |= write_if_changed(path, json.dumps(entries, indent=2))
+            changed |= write_if_changed(animations_path, animations_content(entries))
+            written |= {path, animations_path}
+        content = json.dumps(build_index(groups, MANIFEST_SHARDS_DIR, PUBLIC_DIR), indent=2)
+    else:
+        content = json.dumps(manifest, indent=2)
+    changed |= write_if_changed(MANIFEST_OUTPUT_PATH, content)
+    changed |= bool(remove_stale_shards(MANIFEST_SHARDS_DIR, written))
     
-    with open(MANIFEST_OUTPUT_PATH, "w") as f:
-        json.dump(existing_manifest, f, indent=2)
+    if not changed:
+        print(f"\n📄 Manifest unchanged at {MANIFEST_OUTPUT_PATH}")
+    elif shards:
+        summary = ", ".join(f"{group.name} ({len(entries)})" for group, entries in groups)
+        print(f"\n📄 Updated manifest index at {MANIFEST_OUTPUT_PATH}: {summary}")
+    else:
+        print(f"\n📄 Updated manifest at {MANIFEST_OUTPUT_PATH}")
     
-    print(f"\n📄 Updated manifest at {MANIFEST_OUTPUT_PATH}")
+    write_animations(manifest)
+
+
+def publish_outputs(hash_names: bool) -> None:
+    """
+    Remove fingerprinted files the manifest no longer references, then
+    write the precache list (with hash_names) or remove a stale one. Both
+    happen under the manifest lock, so the list matches the manifest.
+    """
+    with manifest_lock(MANIFEST_OUTPUT_PATH):
+        manifest = load_manifest()
+        index = load_manifest_index()
+        referenced = {PUBLIC_DIR / path for path in manifest_files(manifest, PUBLIC_DIR)}
+        removed = [
+            path
+            for directory in (SPRITES_OUTPUT_DIR, ATLAS_OUTPUT_DIR, TEXTURES_OUTPUT_DIR)
+            for path in remove_unreferenced(directory, referenced)
+        ]
+        if removed:
+            print(f"\n🧹 Removed {len(removed)} superseded file(s)")
+        
+        if not hash_names:
+            PRECACHE_OUTPUT_PATH.unlink(missing_ok=True)
+            return
+        
+        # The game loads the shards' animations files instead of animations.json
+        entry_points = [MANIFEST_OUTPUT_PATH.relative_to(PUBLIC_DIR).as_posix()] + (
+            index_files(index) if index else [ANIMATIONS_OUTPUT_PATH.relative_to(PUBLIC_DIR).as_posix()]
+        )
+        entries = precache_entries(entry_points + manifest_files(manifest, PUBLIC_DIR, runtime_only=True), PUBLIC_DIR)
+        total_bytes = sum((PUBLIC_DIR / entry["url"]).stat().st_size for entry in entries)
+        if write_precache(PRECACHE_OUTPUT_PATH, entries):
+            print(f"📄 Updated precache list at {PRECACHE_OUTPUT_PATH} ({len(entries)} files, {format_size(total_bytes)})")
+        else:
+            print(f"📄 Precache list unchanged at {PRECACHE_OUTPUT_PATH}")
 
 
 # =============================================================================
-# CLI
+# Animation Definitions
 # =============================================================================
 
-def parse_args() -> argparse.Namespace:
-    """Parse command-line arguments."""
-    parser = argparse.ArgumentParser(
-        description="Download and process PMD-style Pokémon sprites for Phaser.",
-        epilog="Examples:\n"
-               "  python download_assets.py              # Download default Pokémon\n"
-               "  python download_assets.py 1 4 7        # Download specific IDs\n"
-               "  python download_assets.py --ids 1,4,7  # Comma-separated IDs",
-        formatter_class=argparse.RawDescriptionHelpFormatter
-    )
-    
-    parser.add_argument(
-        "pokemon_ids",
-        nargs="*",
-        type=int,
-        help="Pokémon IDs to download (space-separated)"
-    )
-    
-    parser.add_argument(
-        "--ids",
-        type=str,
-        help="Comma-separated list of Pokémon IDs"
-    )
-    
-    return parser.parse_args()
+def ticks_to_ms(durations: tuple[int, ...]) -> tuple[int, ...]:
+    """AnimData.xml frame durations (game ticks) in milliseconds."""
+    return tuple(round(ticks * 1000 / ANIM_TICKS_PER_SECOND) for ticks in durations)
 
 
-def main() -> int:
-    """Main entry point."""
-    args = parse_args()
+def animation_config(
+    key: str,
+    frames: list[dict],
+    durations: list[int],
+    frame_rate: int = DEFAULT_ANIM_FRAME_RATE,
+) -> dict:
+    """
+    One Phaser animation config (the shape AnimationManager.fromJSON accepts).
     
-    # Determine which IDs to download
-    pokemon_ids: list[int] = []
+    Phaser shows each frame for 1000 / frameRate ms plus the frame's own
+    `duration`, so the frame rate is set from the shortest frame and the
+    longer ones carry the difference. Without durations the animation plays
+    at `frame_rate`.
+    """
+    if len(durations) != len(frames) or not durations or min(durations) <= 0:
+        return {"key": key, "frames": frames, "frameRate": frame_rate, "repeat": -1}
     
-    if args.ids:
-        # Parse comma-separated IDs
-        pokemon_ids = [int(x.strip()) for x in args.ids.split(",")]
-    elif args.pokemon_ids:
+    base = min(durations)
+    for frame, duration in zip(frames, durations):
+        if duration > base:
+            frame["duration"] = duration - base
+    return {"key": key, "frames": frames, "frameRate": round(1000 / base, 4), "repeat": -1}
+
+
+def build_animations(manifest: list[dict]) -> list[dict]:
+    """
+    Phaser animation configs for every manifest animation: one per direction
+    ({sprite}-{anim}-{direction}) plus a {sprite}-walk alias for the first
+    row. Frames reference the animation's spritesheet texture, or its named
+    frames in the multi-atlas when it was atlas-packed. Directions whose row
+    was dropped as a mirror play the mirrored row (see flipped_animations).
+    Baked textures are plain images and get none. Animations without
+    durations play at the Preloader's fallback rate (faster for enemies).
+    """
+    animations: list[dict] = []
+    for entry in manifest:
+        frame_rate = ENEMY_ANIM_FRAME_RATE if entry["name"] in ENEMY_SPRITE_NAMES else DEFAULT_ANIM_FRAME_RATE
+        for anim in entry["animations"]:
+            if "texture" in anim:
+                continue
+            texture_key = f"{entry['name']}-{anim['key']}"
+            frame_count = anim["frameCount"]
+            durations = anim.get("durations", [])
+            
+            def frames(direction: int) -> list[dict]:
+                row = anim["rows"][direction] if "rows" in anim else direction
+                indices = range(row * frame_count, (row + 1) * frame_count)
+                if "atlas" in anim:
+                    return [
+                        {"key": anim["atlas"], "frame": atlas_frame_name(entry["name"], anim["key"], index)}
+                        for index in indices
+                    ]
+                return [{"key": texture_key, "frame": index} for index in indices]
+            
+            for row in range(anim["directions"]):
+                direction = DIRECTION_NAMES[row] if row < len(DIRECTION_NAMES) else f"dir{row}"
+                animations.append(animation_config(f"{texture_key}-{direction}", frames(row), durations, frame_rate))
+            
+            # Default walk animation alias
+            if anim["key"] == "walk":
+                animations.append(animation_config(texture_key, frames(0), durations, frame_rate))
+    return animations
+
+
+def flipped_animations(manifest: list[dict]) -> list[str]:
+    """Keys of the direction animations the game must draw with flipX (--flip-directions)."""
+    return [
+        f"{entry['name']}-{anim['key']}-{DIRECTION_NAMES[direction]}"
+        for entry in manifest
+        for anim in entry["animations"]
+        for direction in anim.get("flipX", [])
+    ]
+
+
+def animations_content(manifest: list[dict]) -> str:
+    """
+    animations.json content for manifest entries: {"anims": [...]} in
+    AnimationManager.fromJSON format, plus "flipX" with the flipped_animations.
+    """
+    content: dict = {"anims": build_animations(manifest)}
+    if flipped := flipped_animations(manifest):
+        content["flipX"] = flipped
+    return json.dumps(content, separators=(",", ":"))
+
+
+def write_animations(manifest: list[dict]) -> None:
+    """Write animations.json for the manifest, leaving the file untouched if nothing changed."""
+    if write_if_changed(ANIMATIONS_OUTPUT_PATH, animations_content(manifest)):
+        print(f"🎞️  Wrote {len(build_animations(manifest))} animations to {ANIMATIONS_OUTPUT_PATH}")
+
+
+# =============================================================================
+# Texture Atlas
+# =============================================================================
+
+def atlas_frame_name(sprite_name: str, anim_key: str, frame_index: int) -> str:
+    """
+    Atlas frame name for a spritesheet frame.
+    
+    frame_index follows Phaser's spritesheet numbering (row-major: direction
+    row * frameCount + column), so atlas and spritesheet animations line up.
+    """
+    return f"{sprite_name}-{anim_key}/{frame_index}"
+
+
+def collect_atlas_frames(manifest: list[dict]) -> tuple[list[AtlasFrame], list[dict]]:
+    """
+    Slice every manifest animation sheet into its frames.
+    
+    Baked textures are left out: the game looks them up by their own
+    texture key (tilemaps need the whole tileset image), and an atlas frame
+    can only become a texture of its own by uploading its page again.
+    Sheets with a palette table (from an earlier --palettes run) are left
+    out too, so they can still be recolored.
+    
+    Returns: (frames, animations whose sheets were packed)
+    """
+    frames: list[AtlasFrame] = []
+    packed: list[dict] = []
+    
+    for entry in manifest:
+        for anim in entry["animations"]:
+            if "texture" in anim:
+                continue
+            # PaletteSwapper recolors whole sheet textures, which atlas-packed animations lack
+            if "palette" in anim:
+                print(f"  ⚠️  Leaving {anim['path']} out of the atlas: it has a palette table (--palettes)")
+                continue
+            sheet_path = PUBLIC_DIR / anim["path"]
+            try:
+                sheet = Image.open(sheet_path).convert("RGBA")
+            except OSError as e:
+                print(f"  ⚠️  Skipping {anim['path']} in atlas: {e}")
+                continue
+            
+            fw, fh = anim["frameWidth"], anim["frameHeight"]
+            columns = min(anim["frameCount"], sheet.width // fw)
+            # Sheets without their mirrored rows (--flip-directions) are shorter
+            sheet_rows = max(anim["rows"]) + 1 if "rows" in anim else anim["directions"]
+            rows = min(sheet_rows, sheet.height // fh)
+            for row in range(rows):
+                for col in range(columns):
+                    frames.append(AtlasFrame(
+                        name=atlas_frame_name(entry["name"], anim["key"], row * anim["frameCount"] + col),
+                        image=sheet.crop((col * fw, row * fh, (col + 1) * fw, (row + 1) * fh)),
+                    ))
+            packed.append(anim)
+    
+    return frames, packed
+
+
+def report_duplicate_savings(aliases: dict[str, list[AtlasFrame]]) -> None:
+    """Print the decoded bytes saved by deduplication, per Pokémon."""
+    saved: dict[str, int] = {}
+    for duplicates in aliases.values():
+        for frame in duplicates:
+            sprite_name = frame.name.split("/")[0].rsplit("-", 1)[0]
+            saved[sprite_name] = saved.get(sprite_name, 0) + frame.image.width * frame.image.height * 4
+    
+    total_duplicates = sum(len(duplicates) for duplicates in aliases.values())
+    print(f"  ✓ Deduplicated {total_duplicates} frames "
+          f"({format_size(sum(saved.values()))} decoded saved)")
+    for sprite_name, num_bytes in sorted(saved.items(), key=lambda item: -item[1]):
+        print(f"    {sprite_name:<16} {format_size(num_bytes):>10}")
+
+
+def publish_atlas(atlas_json: Path, hashed: bool) -> Path:
+    """
+    Rename the atlas pages and JSON like publish_animation, rewriting the
+    page names inside the JSON. Returns the JSON's new path.
+    """
+    atlas = json.loads(atlas_json.read_text())
+    renamed = False
+    for page in atlas["textures"]:
+        name = publish_files([atlas_json.parent / page["image"]], hashed)[0].name
+        renamed |= name != page["image"]
+        page["image"] = name
+    
+    if renamed:
+        # New page names change the JSON itself, so it is fingerprinted again
+        plain_json = atlas_json.with_name(strip_fingerprint(atlas_json.name))
+        plain_json.write_text(json.dumps(atlas, indent=2))
+        if atlas_json != plain_json:
+            atlas_json.unlink()
+        atlas_json = plain_json
+    return publish_files([atlas_json], hashed)[0]
+
+
+def build_sprite_atlas(
+    max_size: int,
+    padding: int,
+    extrude: int,
+    trim: bool = False,
+    dedupe: bool = False,
+    engine: str = "pil",
+    optimize: bool = False,
+    hash_names: bool = False,
+) -> list[tuple[str, EncodeResult]]:
+    """
+    Pack every frame listed in manifest.json into multi-atlas pages.
+    
+    Animations that were packed get an "atlas" field pointing at the atlas
+    JSON, and the Preloader loads those frames from the atlas instead of
+    queueing one spritesheet per animation. The per-animation sheets stay on
+    disk as the packing input.
+    
+    With trim=True each frame is cropped to its alpha bounding box before
+    packing; the atlas JSON keeps the original cell size and offset. With
+    dedupe=True frames with identical pixels are packed once and every copy's
+    name points at the shared rect, so animations need no changes. With
+    engine="numpy" the trim bounds are computed on stacked frame arrays.
+    With optimize=True pages are written as the smallest lossless PNG, and
+    with hash_names the pages and JSON get content-hashed names.
+    
+    Returns: (page file name, EncodeResult) for pages written with optimize.
+    """
+    # Packing reads the manifest and writes the atlas fields back into it
+    with manifest_lock(MANIFEST_OUTPUT_PATH):
+        manifest = load_manifest()
+        if not manifest:
+            print("  ⚠️  Manifest is empty, no atlas to build")
+            return []
+    
+        print(f"\n🧩 Packing texture atlas (max {max_size}px, padding {padding}, "
+              f"extrude {extrude}{', trimmed' if trim else ''}{', deduplicated' if dedupe else ''})...")
+        frames, packed = collect_atlas_frames(manifest)
+    
+        if trim:
+            cell_area = sum(frame.image.width * frame.image.height for frame in frames)
+            frames = trim_frames(frames, engine)
+            trimmed_area = sum(frame.image.width * frame.image.height for frame in frames)
+            if cell_area:
+                print(f"  ✓ Trimmed frames to {trimmed_area / cell_area:.0%} of their cell area "
+                      f"({(cell_area - trimmed_area) * 4 / (1024 * 1024):.1f} MB of transparent pixels dropped)")
+    
+        aliases: dict[str, list[AtlasFrame]] = {}
+        if dedupe:
+            frames, aliases = dedupe_frames(frames)
+            report_duplicate_savings(aliases)
+    
+        # Skip packing when neither the frames nor the options changed
+        digest = hashlib.sha256(json.dumps([max_size, padding, extrude, trim, dedupe, optimize]).encode())
+        for frame in frames:
+            digest.update(frame.name.encode())
+            digest.update(json.dumps([frame.image.size, frame.source_size, frame.offset]).encode())
+            digest.update(frame.image.tobytes())
+        for name, duplicates in sorted(aliases.items()):
+            digest.update(json.dumps([name, [(d.name, d.source_size, d.offset) for d in duplicates]]).encode())
+        input_hash = digest.hexdigest()
+    
+        # After --hash-names the previous atlas JSON has a content-hashed name
+        atlas_json = ATLAS_OUTPUT_DIR / f"{ATLAS_BASENAME}.json"
+        if not atlas_json.exists():
+            atlas_json = next(
+                (path for path in ATLAS_OUTPUT_DIR.glob(f"{ATLAS_BASENAME}.*.json") if is_fingerprinted(path.name)),
+                atlas_json,
+            )
+        previous_hash = None
+        try:
+            previous = json.loads(atlas_json.read_text())
+            pages_present = all((ATLAS_OUTPUT_DIR / t["image"]).exists() for t in previous["textures"])
+            previous_hash = previous["meta"].get("inputHash") if pages_present else None
+        except (OSError, json.JSONDecodeError, KeyError):
+            pass
+    
+        page_results: list[tuple[str, EncodeResult]] = []
+    
+        def save_optimized(image: Image.Image, path: Path) -> None:
+            page_results.append((path.name, write_sheet(image, path, EncodeOptions(optimize=True))))
+    
+        if previous_hash == input_hash:
+            print(f"  ✓ Atlas is up to date: {atlas_json.relative_to(PUBLIC_DIR).as_posix()}")
+        else:
+            pages = pack_frames(frames, max_size, padding, extrude)
+            atlas_json = write_multiatlas(
+                pages,
+                ATLAS_OUTPUT_DIR,
+                ATLAS_BASENAME,
+                extrude,
+                meta={"inputHash": input_hash},
+                aliases=aliases,
+                save_page=save_optimized if optimize else None,
+            )
+            total_area = sum(page.width * page.height for page in pages)
+            print(f"  ✓ Packed {len(frames)} unique frames into {len(pages)} page(s) "
+                  f"({total_area * 4 / (1024 * 1024):.1f} MB decoded)")
+    
+        atlas_path = publish_atlas(atlas_json, hash_names).relative_to(PUBLIC_DIR).as_posix()
+        for anim in packed:
+            anim["atlas"] = atlas_path
+        write_manifest(manifest)
+        return page_results
+
+
+# =============================================================================
+# Baked Textures
+# =============================================================================
+
+def write_baked_textures(encode_options: EncodeOptions) -> SpriteInfo:
+    """
+    Render the textures the Preloader would otherwise draw at startup (see
+    baked_textures) into TEXTURES_OUTPUT_DIR, as one manifest entry. Each
+    animation carries the texture key the game looks it up by; frames are
+    the spark variants and the autotiles.
+    """
+    print("🎨 Baking procedural textures...")
+    TEXTURES_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    
+    animations = []
+    for texture in bake_textures(AUTOTILE_SOURCE_PATH):
+        output_path = TEXTURES_OUTPUT_DIR / f"{texture.key}.png"
+        result = write_sheet(texture.image, output_path, encode_options)
+        animations.append(SpriteAnimation(
+            key=texture.key,
+            path=output_path.relative_to(PUBLIC_DIR).as_posix(),
+            frame_width=texture.frame_width,
+            frame_height=texture.frame_height,
+            frame_count=texture.columns,
+            directions=texture.rows,
+            formats=result.formats,
+            encoded=((output_path.name, result),),
+            texture=texture.key,
+        ))
+        print(f"  ✓ {texture.key}: {texture.image.width}x{texture.image.height}, "
+              f"{texture.columns * texture.rows} frame(s)")
+    print()
+    
+    return SpriteInfo(id=BAKED_TEXTURES_ID, name=BAKED_TEXTURES_ID, animations=animations)
+
+
+# =============================================================================
+# Parallel Processing
+# =============================================================================
+
+def _run_captured(func, *args):
+    """Run func(*args) in a worker process and return (result, printed output, spans).
+
+    Workers print the same progress lines as the serial path; capturing them
+    lets the parent replay each Pokémon's log as one block, in input order.
+    Stage timings recorded by the worker (--profile) travel back the same way.
+    """
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        result = func(*args)
+    return result, buffer.getvalue(), drain_spans()
+
+
+def _process_profiled(
+    pokemon_id: int,
+    zip_path: Path | MirrorMember,
+    build_lock: dict[str, SpriteAnimation] | None,
+    options: BuildOptions,
+) -> SpriteInfo | None:
+    """Process step of download_and_process_pokemon, timed as its "process" stage."""
+    with profile_stage("process", profile_label(pokemon_id)):
+        return process_sprite_zip(pokemon_id, zip_path, build_lock, options)
+
+
+class _ThreadOutput(io.TextIOBase):
+    """sys.stdout stand-in that gives each capturing thread its own buffer.
+
+    contextlib.redirect_stdout swaps a process-wide global, so it cannot tell
+    concurrent fetch threads apart; this routes writes per thread instead.
+    """
+    
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, text: str) -> int:
+        return getattr(self._local, "buffer", self._fallback).write(text)
+    
+    def flush(self) -> None:
+        self._fallback.flush()
+    
+    def run_captured(self, func, *args):
+        """Thread-pool counterpart of _run_captured."""
+        self._local.buffer = io.StringIO()
+        try:
+            result = func(*args)
+            return result, self._local.buffer.getvalue()
+        finally:
+            del self._local.buffer
+
+
+def _fetch_announced(pokemon_id: int, refresh: bool) -> Path | MirrorMember | None:
+    """Fetch step of download_and_process_pokemon, including its header line."""
+    name = POKEMON_NAMES.get(pokemon_id, f"pokemon_{pokemon_id}")
+    print(f"📥 Processing #{pokemon_id} ({name})...")
+    with profile_stage("fetch", profile_label(pokemon_id)):
+        return fetch_sprite_zip(pokemon_id, refresh)
+
+
+def process_pokemon_parallel(
+    pokemon_ids: list[int],
+    jobs: int,
+    refresh: bool = False,
+    build_lock: dict[str, SpriteAnimation] | None = None,
+    options: BuildOptions = BuildOptions(),
+) -> list[SpriteInfo | None]:
+    """
+    Download and process Pokémon concurrently.
+    
+    Fetches run on a pool of `jobs` threads (they are network bound), and each
+    cached zip's path is handed to a process pool as soon as it arrives so the
+    decode/crop/encode work runs across CPU cores. Results and logs come back in the order
+    of `pokemon_ids`, so the manifest matches the serial path exactly.
+    
+    Repeated IDs are processed once (two workers would write the same cache
+    entry and sheets), and a fetch that raises counts as a failed Pokémon
+    instead of ending the run.
+    """
+    pokemon_ids = list(dict.fromkeys(pokemon_ids))
+    results: list[SpriteInfo | None] = [None] * len(pokemon_ids)
+    logs: list[list[str]] = [[] for _ in pokemon_ids]
+    done = [False] * len(pokemon_ids)
+    next_to_print = 0
+    
+    def flush_ready() -> None:
+        nonlocal next_to_print
+        while next_to_print < len(pokemon_ids) and done[next_to_print]:
+            print("".join(logs[next_to_print]))
+            next_to_print += 1
+    
+    cpu_workers = max(1, min(jobs, os.cpu_count() or 1))
+    output = _ThreadOutput(sys.stdout)
+    
+    with contextlib.redirect_stdout(output), \
+            ThreadPoolExecutor(max_workers=jobs) as fetch_pool, \
+            ProcessPoolExecutor(
+                max_workers=cpu_workers,
+                initializer=pipeline_profiler.init_worker if pipeline_profiler.is_enabled() else None,
+            ) as process_pool:
+        fetches = {
+            fetch_pool.submit(output.run_captured, _fetch_announced, pokemon_id, refresh): i
+            for i, pokemon_id in enumerate(pokemon_ids)
+        }
+        pending: dict[Future, int] = {}
+        
+        for future in as_completed(fetches):
+            i = fetches[future]
+            try:
+                zip_path, log = future.result()
+            except Exception as e:
+                name = POKEMON_NAMES.get(pokemon_ids[i], f"pokemon_{pokemon_ids[i]}")
+                zip_path, log = None, f"📥 Processing #{pokemon_ids[i]} ({name})...\n  ❌ Fetch failed: {e}\n"
+            logs[i].append(log)
+            if zip_path is None:
+                done[i] = True
+                continue
+            future = process_pool.submit(
+                _run_captured, _process_profiled, pokemon_ids[i], zip_path, build_lock, options,
+            )
+            pending[future] = i
+        
+        for future in as_completed(pending):
+            i = pending[future]
+            try:
+                result, log, spans = future.result()
+                results[i] = result
+                logs[i].append(log)
+                add_spans(spans)
+            except Exception as e:
+                logs[i].append(f"  ❌ Worker failed for #{pokemon_ids[i]}: {e}\n")
+            release_sprite_zip(pokemon_ids[i])
+            done[i] = True
+            flush_ready()
+    
+    flush_ready()
+    return results
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def run_cache_command(argv: list[str]) -> int:
+    """`cache stats|prune|verify`: inspect and maintain the download cache."""
+    parser = argparse.ArgumentParser(
+        prog="download_assets.py cache",
+        description="Inspect and maintain the sprites.zip download cache."
+    )
+    parser.add_argument(
+        "action",
+        choices=["stats", "prune", "verify"],
+        help="stats: show usage; prune: evict LRU entries to the budget; verify: re-hash every entry"
+    )
+    parser.add_argument(
+        "--max-size",
+        type=parse_size,
+        help="Byte budget for prune (e.g. 200M); defaults to the cache budget"
+    )
+    args = parser.parse_args(argv)
+    
+    cache = get_cache()
+    
+    if args.action == "stats":
+        stats = cache.stats()
+        print(f"📦 Cache: {CACHE_DIR}")
+        print(f"  Entries: {stats.entries} ({stats.blobs} unique blobs)")
+        print(f"  Size:    {format_size(stats.total_bytes)} / {format_size(stats.max_bytes)}")
+        for entry in cache.entries():
+            last_used = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.last_access))
+            print(f"    {entry.key}  {format_size(entry.size):>10}  {last_used}  {entry.sha256[:12]}")
+        return 0
+    
+    if args.action == "prune":
+        evicted, orphans = cache.prune(args.max_size)
+        for entry in evicted:
+            print(f"  - Evicted {entry.key} ({format_size(entry.size)})")
+        stats = cache.stats()
+        print(f"✅ Pruned {len(evicted)} entries and {orphans} stray files; "
+              f"cache is {format_size(stats.total_bytes)}")
+        return 0
+    
+    checked = cache.stats().entries
+    bad = cache.verify()
+    for key in bad:
+        print(f"  ❌ {key}: missing or corrupt, removed from cache")
+    print(f"{'⚠️ ' if bad else '✅'} Verified {checked} entries, {len(bad)} bad")
+    return 1 if bad else 0
+
+
+def parse_id_ranges(values: list[str]) -> list[int]:
+    """Expand IDs and ranges such as ["1-151", "249,250"] into sorted unique IDs."""
+    ids: set[int] = set()
+    for value in values:
+        for part in value.split(","):
+            start, _, end = part.strip().partition("-")
+            try:
+                ids.update(range(int(start), int(end or start) + 1))
+            except ValueError:
+                raise argparse.ArgumentTypeError(f"Invalid ID or range: {part!r} (expected e.g. 25 or 1-151)")
+    return sorted(ids)
+
+
+def _mirror_pokemon(mirror: SpriteMirror, pokemon_id: int) -> str:
+    """
+    Add one Pokémon's sprites.zip to the mirror, taken from the download
+    cache when it is there. Returns "cached", "downloaded" or "failed".
+    """
+    padded_id = str(pokemon_id).zfill(4)
+    cached = get_cache().get_path(padded_id)
+    if cached is not None:
+        entry = get_cache().get_entry(padded_id)
+        mirror.add_file(padded_id, cached, entry.etag, entry.last_modified, entry.url)
+        print(f"  ✓ {padded_id} from the download cache ({format_size(cached.stat().st_size)})")
+        return "cached"
+    
+    zip_url = f"{SPRITESERVER_URL}/{padded_id}/sprites.zip"
+    download_path = temp_path(mirror.root, f"download-{padded_id}")
+    try:
+        result = fetch_conditional(zip_url, dest=download_path)
+        if result is None or not zipfile.is_zipfile(download_path):
+            print(f"  ❌ {padded_id}: could not download a valid sprites.zip")
+            return "failed"
+        mirror.add_file(padded_id, download_path, result.etag, result.last_modified, zip_url)
+        print(f"  ✓ {padded_id} downloaded ({format_size(download_path.stat().st_size)})")
+        return "downloaded"
+    finally:
+        download_path.unlink(missing_ok=True)
+
+
+def run_mirror_command(argv: list[str]) -> int:
+    """`mirror`: prefetch sprites.zip files into the packed offline mirror; 1 if any failed."""
+    parser = argparse.ArgumentParser(
+        prog="download_assets.py mirror",
+        description="Prefetch sprites.zip files into one packed archive plus index, for offline "
+                    "builds with --mirror. Interrupted runs resume where they stopped."
+    )
+    parser.add_argument(
+        "ids",
+        nargs="*",
+        help="Pokémon IDs or ranges, e.g. 1-151 249 (default: every ID with a known name)"
+    )
+    parser.add_argument(
+        "--dir",
+        type=Path,
+        default=DEFAULT_MIRROR_DIR,
+        help=f"Mirror directory (default: {DEFAULT_MIRROR_DIR.relative_to(PROJECT_ROOT)})"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=4,
+        help="Concurrent downloads (default: 4)"
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Re-hash every mirrored zip instead of prefetching"
+    )
+    args = parser.parse_args(argv)
+    try:
+        pokemon_ids = parse_id_ranges(args.ids) if args.ids else sorted(POKEMON_NAMES)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    
+    mirror = get_mirror(args.dir)
+    
+    if args.verify:
+        bad = mirror.verify()
+        for key in bad:
+            print(f"  ❌ {key}: does not match its index entry")
+        print(f"{'⚠️ ' if bad else '✅'} Verified {len(mirror.entries())} mirrored zips, {len(bad)} bad")
+        return 1 if bad else 0
+    
+    missing = [pokemon_id for pokemon_id in pokemon_ids if str(pokemon_id).zfill(4) not in mirror]
+    print(f"📦 Mirroring {len(pokemon_ids)} Pokémon into {args.dir} "
+          f"({len(pokemon_ids) - len(missing)} already mirrored, {max(1, args.jobs)} concurrent downloads)")
+    
+    counts = {"cached": 0, "downloaded": 0, "failed": 0}
+    pool = ThreadPoolExecutor(max_workers=max(1, args.jobs))
+    try:
+        futures = [pool.submit(_mirror_pokemon, mirror, pokemon_id) for pokemon_id in missing]
+        for future in as_completed(futures):
+            counts[future.result()] += 1
+    except KeyboardInterrupt:
+        pool.shutdown(wait=False, cancel_futures=True)
+        print("\n⏸️  Interrupted; run the same command again to resume")
+        return 130
+    finally:
+        pool.shutdown()
+        mirror.flush()
+        flush_cache()
+    
+    print(f"{'⚠️ ' if counts['failed'] else '✅'} Mirror holds {len(mirror.entries())} zips "
+          f"({format_size(mirror.pack_size())}): {counts['downloaded']} downloaded, "
+          f"{counts['cached']} from the cache, {counts['failed']} failed")
+    return 1 if counts["failed"] else 0
+
+
+def run_budget_command(argv: list[str]) -> int:
+    """`budget`: report the decoded texture memory the manifest implies; 1 if over budget."""
+    parser = argparse.ArgumentParser(
+        prog="download_assets.py budget",
+        description="Report the GPU memory (decoded RGBA) of every texture manifest.json makes the "
+                    "Preloader load, per character and animation, and fail when a budget is exceeded."
+    )
+    parser.add_argument(
+        "--max-total",
+        type=parse_size,
+        help="Budget for all textures together (e.g. 256M)"
+    )
+    parser.add_argument(
+        "--max-character",
+        type=parse_size,
+        help="Budget for any single character's textures (e.g. 16M)"
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Texture tier to measure, as picked by the Preloader (e.g. 0.5 for --scales variants)"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        help="Only list the N most expensive characters (totals still cover all)"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the report as JSON instead of a table"
+    )
+    args = parser.parse_args(argv)
+    
+    manifest = load_manifest()
+    if not manifest:
+        print(f"❌ No manifest at {MANIFEST_OUTPUT_PATH}")
+        return 1
+    
+    report = measure_manifest(manifest, PUBLIC_DIR, args.scale)
+    over = [
+        name for name in report.characters
+        if args.max_character is not None and report.character_bytes(name) > args.max_character
+    ]
+    over_total = args.max_total is not None and report.total_bytes > args.max_total
+    
+    if args.json:
+        print(json.dumps({**report_json(report), "over_budget": over + (["total"] if over_total else [])}, indent=2))
+        return 1 if over or over_total or report.missing else 0
+    
+    print(f"📐 Texture memory for {MANIFEST_OUTPUT_PATH} (scale {args.scale:g}):")
+    print_budget_report(report, args.top)
+    
+    for path in report.missing:
+        print(f"  ⚠️  Missing or unreadable: {path}")
+    for name in over:
+        print(f"  ❌ {name}: {format_size(report.character_bytes(name))} "
+              f"exceeds the per-character budget of {format_size(args.max_character)}")
+    if over_total:
+        print(f"  ❌ Total {format_size(report.total_bytes)} exceeds the budget of {format_size(args.max_total)}")
+    if over or over_total or report.missing:
+        return 1
+    
+    if args.max_total is not None or args.max_character is not None:
+        print("✅ Within budget")
+    return 0
+
+
+# Subcommands dispatched from main() before the regular ID arguments are parsed
+SUBCOMMANDS = {
+    "cache": run_cache_command,
+    "budget": run_budget_command,
+    "mirror": run_mirror_command,
+}
+
+
+def parse_scales(text: str) -> tuple[float, ...]:
+    """Parse --scales: comma-separated factors below 1, e.g. '0.5,0.25' (largest first)."""
+    try:
+        scales = {float(part) for part in text.split(",") if part.strip()}
+    except ValueError:
+        raise ValueError(f"Invalid scales: {text!r} (expected e.g. 0.5,0.25)") from None
+    if not scales or any(not 0 < scale < 1 for scale in scales):
+        raise ValueError(f"Invalid scales: {text!r} (each must be between 0 and 1)")
+    return tuple(sorted(scales, reverse=True))
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Download and process PMD-style Pokémon sprites for Phaser.",
+        epilog="Examples:\n"
+               "  python download_assets.py              # Download default Pokémon\n"
+               "  python download_assets.py 1 4 7        # Download specific IDs\n"
+               "  python download_assets.py --ids 1,4,7  # Comma-separated IDs",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    
+    parser.add_argument(
+        "pokemon_ids",
+        nargs="*",
+        type=int,
+        help="Pokémon IDs to download (space-separated)"
+    )
+    
+    parser.add_argument(
+        "--ids",
+        type=str,
+        help="Comma-separated list of Pokémon IDs"
+    )
+    
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Number of concurrent downloads/processing workers (default: 1, serial)"
+    )
+    
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Revalidate cached zips with SpriteServer (ETag/Last-Modified) instead of trusting them"
+    )
+    
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild every output, ignoring the build lockfile"
+    )
+    
+    parser.add_argument(
+        "--atlas",
+        action="store_true",
+        help="Pack every manifest frame into Phaser multi-atlas pages"
+    )
+    
+    parser.add_argument(
+        "--atlas-max-size",
+        type=int,
+        default=DEFAULT_MAX_SIZE,
+        help=f"Maximum atlas page width/height in pixels (default: {DEFAULT_MAX_SIZE})"
+    )
+    
+    parser.add_argument(
+        "--atlas-padding",
+        type=int,
+        default=DEFAULT_PADDING,
+        help=f"Transparent pixels between atlas frames (default: {DEFAULT_PADDING})"
+    )
+    
+    parser.add_argument(
+        "--atlas-extrude",
+        type=int,
+        default=DEFAULT_EXTRUDE,
+        help=f"Pixels of edge extrusion around each atlas frame (default: {DEFAULT_EXTRUDE})"
+    )
+    
+    parser.add_argument(
+        "--trim",
+        action="store_true",
+        help="Trim each atlas frame to its non-transparent pixels (keeps source offsets)"
+    )
+    
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Pack pixel-identical atlas frames once and alias the duplicates"
+    )
+    
+    parser.add_argument(
+        "--mirror",
+        action="store_true",
+        help="Read sprites.zip files from a packed mirror written by the `mirror` command instead of "
+             "SpriteServer (see --mirror-dir); nothing is downloaded"
+    )
+    
+    parser.add_argument(
+        "--mirror-dir",
+        type=Path,
+        default=DEFAULT_MIRROR_DIR,
+        metavar="DIR",
+        help=f"Mirror directory --mirror reads (default: {DEFAULT_MIRROR_DIR.relative_to(PROJECT_ROOT)})"
+    )
+    
+    parser.add_argument(
+        "--cache-size",
+        type=parse_size,
+        help="Byte budget for the download cache (e.g. 200M, 1G; default 512M)"
+    )
+    
+    parser.add_argument(
+        "--optimize-png",
+        action="store_true",
+        help="Write each sheet as the smallest lossless PNG (max compression, or indexed palette when ≤256 colors)"
+    )
+    
+    parser.add_argument(
+        "--webp",
+        action="store_true",
+        help="Also write a lossless .webp next to each sheet and list it in the manifest"
+    )
+    
+    parser.add_argument(
+        "--scales",
+        type=parse_scales,
+        default=(),
+        metavar="0.5[,0.25]",
+        help="Also write nearest-neighbor downscaled sheets at these scales, listed per animation "
+             "under \"variants\" in the manifest so low-end devices can load a smaller tier"
+    )
+    
+    parser.add_argument(
+        "--hitboxes",
+        action="store_true",
+        help="Write a {sheet}.hitbox.json sidecar with each frame's tight alpha bounds"
+    )
+    
+    parser.add_argument(
+        "--hitbox-mask",
+        type=int,
+        default=0,
+        metavar="BLOCK",
+        help="Also store a bit-packed collision mask per frame, one bit per BLOCK×BLOCK pixels "
+             "(implies --hitboxes)"
+    )
+    
+    parser.add_argument(
+        "--palettes",
+        action="store_true",
+        help="Also write each sheet as indexed pixels plus a palette table with the "
+             f"{', '.join(PALETTE_VARIANTS)} recolors"
+    )
+    
+    parser.add_argument(
+        "--flip-directions",
+        action="store_true",
+        help="Drop left-facing direction rows that are exact horizontal mirrors of the right-facing ones; "
+             "the manifest marks them to be drawn flipped (sheets with a real asymmetry keep every row)"
+    )
+    
+    parser.add_argument(
+        "--hash-names",
+        action="store_true",
+        help="Name every output after its content (25-walk.3f9a1c2b.png) so it can be cached as immutable, "
+             "remove superseded files and write a precache list for a service worker"
+    )
+    
+    parser.add_argument(
+        "--shards",
+        action="store_true",
+        help="Write manifest.json as an index of per-group shards (baked textures, starters, enemy waves, "
+             "evolutions, extra) so the game can start on the preload shards and load the rest in the background"
+    )
+    
+    parser.add_argument(
+        "--bake-textures",
+        action="store_true",
+        help="Render the procedural effect textures (projectile, electric-field, jagged-rock, seeded "
+             "electric-spark variants) and the cave autotiles into assets/textures and list them in the "
+             "manifest, so the game loads them instead of drawing them at startup"
+    )
+    
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="pil",
+        help="Frame engine: pil (default) or numpy (array-backed; also drops empty trailing rows/columns)"
+    )
+    
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time every pipeline stage per Pokémon, write a Chrome trace (see --profile-output) "
+             "and print the slowest stages/items"
+    )
+    
+    parser.add_argument(
+        "--profile-output",
+        type=Path,
+        default=PROFILE_OUTPUT_PATH,
+        metavar="TRACE_JSON",
+        help=f"Where --profile writes its trace (default: {PROFILE_OUTPUT_PATH.relative_to(PROJECT_ROOT)})"
+    )
+    
+    parser.add_argument(
+        "--cprofile",
+        type=Path,
+        metavar="STATS_FILE",
+        help="Also run the pipeline under cProfile and dump the stats (main process only)"
+    )
+    
+    return parser.parse_args()
+
+
+def main() -> int:
+    """Main entry point."""
+    global CACHE_MAX_BYTES, MIRROR_DIR
+    
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        return SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+    
+    args = parse_args()
+    
+    if args.cache_size is not None:
+        CACHE_MAX_BYTES = args.cache_size
+    
+    if args.mirror:
+        if not (args.mirror_dir / "sprites.pack").exists():
+            print(f"❌ No sprite mirror in {args.mirror_dir}; create it with: python download_assets.py mirror")
+            return 1
+        MIRROR_DIR = args.mirror_dir
+    
+    if args.engine == "numpy" and not numpy_available():
+        print("❌ --engine numpy needs NumPy: pip install numpy")
+        return 1
+    
+    if args.webp and not webp_available():
+        print("❌ --webp needs Pillow built with WebP support")
+        return 1
+    
+    if args.hitbox_mask < 0:
+        print("❌ --hitbox-mask must be a positive block size")
+        return 1
+    if args.atlas and args.palettes:
+        print("❌ --palettes cannot be combined with --atlas: recolors need each sheet as its own texture")
+        return 1
+    
+    options = BuildOptions(
+        engine=args.engine,
+        encode_options=EncodeOptions(optimize=args.optimize_png, webp=args.webp),
+        scales=args.scales,
+        hitbox_options=HitboxOptions(enabled=args.hitboxes or args.hitbox_mask > 0, mask_block=args.hitbox_mask),
+        palettes=tuple(PALETTE_VARIANTS) if args.palettes else (),
+        flip_directions=args.flip_directions,
+    )
+    
+    if args.profile:
+        pipeline_profiler.enable()
+    profiler = cProfile.Profile() if args.cprofile else None
+    if profiler is not None:
+        profiler.enable()
+    
+    # Determine which IDs to download
+    pokemon_ids: list[int] = []
+    
+    if args.ids:
+        # Parse comma-separated IDs
+        pokemon_ids = [int(x.strip()) for x in args.ids.split(",")]
+    elif args.pokemon_ids:
         pokemon_ids = args.pokemon_ids
     else:
         pokemon_ids = DEFAULT_POKEMON_IDS
     
+    # Each Pokémon once, in first-seen order
+    pokemon_ids = list(dict.fromkeys(pokemon_ids))
+    
     print("=" * 60)
     print("🎮 Poke-Survivor Asset Pipeline")
     print("=" * 60)
@@ -501,22 +2491,92 @@ def main() -> int:
     print(f"Output directory: {SPRITES_OUTPUT_DIR}")
     print()
     
+    # Outputs whose inputs match the lockfile are skipped; --force only skips
+    # that check, so the other Pokémon's lockfile records are kept
+    build_lock = load_build_lock()
+    reusable = {} if args.force else build_lock
+    
     # Process each Pokémon
     successful_sprites: list[SpriteInfo] = []
     
-    for pokemon_id in pokemon_ids:
-        sprite_info = download_and_process_pokemon(pokemon_id)
-        if sprite_info:
-            successful_sprites.append(sprite_info)
+    if args.jobs > 1:
+        print(f"Using {args.jobs} workers")
         print()
+        for sprite_info in process_pokemon_parallel(pokemon_ids, args.jobs, args.refresh, reusable, options):
+            if sprite_info:
+                successful_sprites.append(sprite_info)
+    else:
+        for pokemon_id in pokemon_ids:
+            sprite_info = download_and_process_pokemon(pokemon_id, args.refresh, reusable, options)
+            if sprite_info:
+                successful_sprites.append(sprite_info)
+            print()
+    
+    flush_cache()
+    
+    # Textures the Preloader would otherwise draw on every boot
+    baked_sprites: list[SpriteInfo] = []
+    if args.bake_textures:
+        with profile_stage("bake"):
+            baked_sprites = [write_baked_textures(options.encode_options)]
     
     # Generate manifest
-    if successful_sprites:
-        generate_manifest(successful_sprites)
+    if successful_sprites or baked_sprites:
+        with profile_stage("manifest"):
+            published = generate_manifest(successful_sprites + baked_sprites, args.hash_names, args.shards)
+        successful_sprites, baked_sprites = published[:len(successful_sprites)], published[len(successful_sprites):]
+        with profile_stage("lockfile"):
+            save_build_lock(build_lock, successful_sprites)
+    
+    # Size report for every file encoded in this run (--optimize-png / --webp)
+    encoded = [
+        file
+        for sprite in successful_sprites + baked_sprites
+        for anim in sprite.animations
+        for file in anim.encoded
+    ]
+    
+    if args.atlas:
+        with profile_stage("atlas"):
+            encoded += build_sprite_atlas(
+                args.atlas_max_size,
+                args.atlas_padding,
+                args.atlas_extrude,
+                trim=args.trim,
+                dedupe=args.dedupe,
+                engine=args.engine,
+                optimize=args.optimize_png,
+                hash_names=args.hash_names,
+            )
+    
+    # Drop superseded fingerprinted files; precache list for --hash-names
+    with profile_stage("publish"):
+        publish_outputs(args.hash_names)
+    
+    if args.optimize_png or args.webp:
+        print_size_report(encoded)
+    
+    if profiler is not None:
+        profiler.disable()
+        args.cprofile.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(args.cprofile)
+        print(f"\n📄 cProfile stats written to {args.cprofile} (python -m pstats {args.cprofile})")
+        if args.jobs > 1:
+            print("   Note: worker processes are not included; use --jobs 1 to profile processing")
+    
+    if args.profile:
+        spans = drain_spans()
+        print_summary(spans)
+        write_trace(args.profile_output, spans)
+        print(f"\n📄 Trace written to {args.profile_output} (open in chrome://tracing or ui.perfetto.dev)")
     
     # Summary
+    outputs = [anim for sprite in successful_sprites for anim in sprite.animations]
+    up_to_date = sum(1 for anim in outputs if anim.up_to_date)
+    
     print("=" * 60)
     print(f"✅ Successfully processed {len(successful_sprites)}/{len(pokemon_ids)} Pokémon")
+    print(f"   {up_to_date} up to date, {len(outputs) - up_to_date} rebuilt")
     
     if len(successful_sprites) < len(pokemon_ids):
         failed = len(pokemon_ids) - len(successful_sprites)
@@ -1,9 +1,15 @@
 import argparse
+import contextlib
+import glob
+import io
 import sys
 import os
 import json
 import math
-from typing import List, Optional
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 try:
     from PIL import Image
@@ -11,6 +17,20 @@ except ImportError:
     print("Error: Pillow library is not installed. Please install it using 'pip install Pillow'")
     sys.exit(1)
 
+import sprite_arrays
+from sprite_encoder import EncodeOptions, webp_available, write_sheet
+
+# download_assets (and with it requests and the rest of the asset pipeline) is
+# only imported by --batch and --watch, which write the manifest; converting a
+# single GIF or frame folder needs nothing but Pillow.
+
+VALID_FRAME_EXTS = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff'}
+
+# Watch mode: how often sources are checked, and how long they must stay
+# unchanged before a rebuild (editors and exporters write in bursts)
+WATCH_POLL_SECONDS = 0.1
+DEFAULT_DEBOUNCE_MS = 200
+
 def get_frames_from_gif(path: str) -> List[Image.Image]:
     """Extracts frames from a GIF file."""
     try:
@@ -29,17 +49,76 @@ def get_frames_from_gif(path: str) -> List[Image.Image]:
         print(f"Error reading GIF: {e}")
         sys.exit(1)
 
-def get_frames_from_dir(path: str) -> List[Image.Image]:
-    """Loads all images from a directory, sorted alphanumerically."""
-    valid_exts = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff'}
+def stream_frames_from_gif(path: str) -> Tuple[int, Tuple[int, int], Iterator[Image.Image]]:
+    """
+    Streams frames from a GIF file one at a time.
+
+    Returns (frame_count, first_frame_size, frames). Only the frame being
+    yielded is decoded, so memory stays at one frame regardless of length.
+    """
+    try:
+        gif = Image.open(path)
+        frame_count = getattr(gif, 'n_frames', 1)
+    except Exception as e:
+        print(f"Error reading GIF: {e}")
+        sys.exit(1)
+
+    def frames() -> Iterator[Image.Image]:
+        with gif:
+            for index in range(frame_count):
+                gif.seek(index)
+                yield gif.convert('RGBA')
+
+    return frame_count, gif.size, frames()
+
+def list_image_files(path: str) -> List[str]:
+    """Image files in a directory, sorted alphanumerically."""
     files = sorted([
         os.path.join(path, f) for f in os.listdir(path)
-        if os.path.splitext(f.lower())[1] in valid_exts
+        if os.path.splitext(f.lower())[1] in VALID_FRAME_EXTS
     ])
     
     if not files:
         print(f"No image files found in {path}")
         sys.exit(1)
+    return files
+
+def stream_frames_from_dir(path: str) -> Tuple[int, Tuple[int, int], Iterator[Optional[Image.Image]]]:
+    """
+    Streams images from a directory one at a time, sorted alphanumerically.
+
+    Returns (frame_count, first_frame_size, frames); the size comes from the
+    first readable file's header. An unreadable file yields None so the
+    remaining frames keep their cells.
+    """
+    files = list_image_files(path)
+
+    first_size = None
+    for f in files:
+        try:
+            with Image.open(f) as img:
+                first_size = img.size
+            break
+        except Exception as e:
+            print(f"Warning: Could not open {f}: {e}")
+    if first_size is None:
+        print(f"No readable image files found in {path}")
+        sys.exit(1)
+
+    def frames() -> Iterator[Optional[Image.Image]]:
+        for f in files:
+            try:
+                with Image.open(f) as img:
+                    yield img.convert('RGBA')
+            except Exception as e:
+                print(f"Warning: Could not open {f}: {e}")
+                yield None
+
+    return len(files), first_size, frames()
+
+def get_frames_from_dir(path: str) -> List[Image.Image]:
+    """Loads all images from a directory, sorted alphanumerically."""
+    files = list_image_files(path)
         
     images = []
     for f in files:
@@ -51,16 +130,46 @@ def get_frames_from_dir(path: str) -> List[Image.Image]:
             
     return images
 
-def create_spritesheet(frames: List[Image.Image], output_path: str, rows: int):
-    if not frames:
+def create_spritesheet(
+    frames: Iterable[Optional[Image.Image]],
+    output_path: str,
+    rows: int,
+    frame_count: Optional[int] = None,
+    frame_size: Optional[Tuple[int, int]] = None,
+    engine: str = "pil",
+    encode_options: EncodeOptions = EncodeOptions(),
+    anim_key: str = "idle",
+):
+    """
+    Pastes frames into a rows x cols sheet, saves it and returns its
+    manifest animation fields (with `anim_key` as the animation key).
+
+    `frames` may be a list, or a generator when `frame_count` and
+    `frame_size` (the first frame's size) are given; each frame is then
+    pasted as it arrives and dropped, so only the canvas and one frame are
+    held in memory. A None frame leaves its cell empty.
+
+    With engine="numpy" the sheet is a NumPy array written cell by cell, and
+    trailing rows/columns that end up fully transparent are cropped off so
+    frameCount and directions describe what is actually on the sheet.
+    `encode_options` selects PNG optimization and an extra WebP output.
+    """
+    if frame_count is None or frame_size is None:
+        frames = list(frames)
+        if not frames:
+            print("No frames identified.")
+            sys.exit(1)
+        frame_count = len(frames)
+        frame_size = frames[0].size
+    elif frame_count == 0:
         print("No frames identified.")
         sys.exit(1)
 
     # Assume all frames should be the size of the first one
-    frame_width, frame_height = frames[0].size
+    frame_width, frame_height = frame_size
     
     # Calculate columns based on rows
-    total_frames = len(frames)
+    total_frames = frame_count
     cols = math.ceil(total_frames / rows)
     
     if total_frames % rows != 0:
@@ -69,49 +178,392 @@ def create_spritesheet(frames: List[Image.Image], output_path: str, rows: int):
     # Create canvas
     sheet_width = cols * frame_width
     sheet_height = rows * frame_height
-    spritesheet = Image.new('RGBA', (sheet_width, sheet_height), (0, 0, 0, 0))
+    if engine == "numpy":
+        sheet = sprite_arrays.blank_sheet(sheet_width, sheet_height)
+        cells = sprite_arrays.cell_grid(sheet, frame_width, frame_height)
+    else:
+        spritesheet = Image.new('RGBA', (sheet_width, sheet_height), (0, 0, 0, 0))
 
     # Paste frames
     for i, frame in enumerate(frames):
+        if i >= total_frames:
+            print(f"Warning: More than {total_frames} frames received. Ignoring the rest.")
+            break
+        if frame is None:
+            continue
         # Resize if necessary (optional, but good for robustness)
         if frame.size != (frame_width, frame_height):
-            print(f"Warning: Frame {i} size {frame.size} differs from base {frames[0].size}. Resizing.")
+            print(f"Warning: Frame {i} size {frame.size} differs from base {frame_size}. Resizing.")
             frame = frame.resize((frame_width, frame_height))
             
         row = i // cols
         col = i % cols
         
+        if engine == "numpy":
+            cells[row, col] = sprite_arrays.image_to_array(frame)
+            continue
+
         x = col * frame_width
         y = row * frame_height
         
         spritesheet.paste(frame, (x, y))
 
+    if engine == "numpy":
+        used_rows, used_cols = sprite_arrays.used_grid(sprite_arrays.empty_cells(cells))
+        if used_rows and (used_rows, used_cols) != (rows, cols):
+            print(f"Note: Dropped empty cells: {rows} -> {used_rows} rows, {cols} -> {used_cols} frames per row.")
+            rows, cols = used_rows, used_cols
+            sheet = sheet[:rows * frame_height, :cols * frame_width]
+        spritesheet = sprite_arrays.array_to_image(sheet)
+
     # Save
-    spritesheet.save(output_path)
+    if output_path.lower().endswith('.png'):
+        encoded = write_sheet(spritesheet, Path(output_path), encode_options)
+        if encoded.plain_bytes != encoded.png_bytes:
+            print(f"PNG optimized: {encoded.plain_bytes:,} -> {encoded.png_bytes:,} bytes ({encoded.method})")
+        if encoded.webp_bytes is not None:
+            print(f"WebP written: {encoded.webp_bytes:,} bytes")
+        formats = encoded.formats
+    else:
+        spritesheet.save(output_path)
+        formats = ("png",)
     print(f"Spritesheet saved to {output_path}")
     
     # Generate Manifest info
     manifest_snippet = {
-        "key": "TODO_KEY_NAME",
+        "key": anim_key,
         "path": f"assets/sprites/{os.path.basename(output_path)}",
         "frameWidth": frame_width,
         "frameHeight": frame_height,
         "frameCount": cols,
         "directions": rows
     }
-    
-    print("\nManifest JSON Snippet:")
+    if formats != ("png",):
+        manifest_snippet["formats"] = list(formats)
+    return manifest_snippet
+
+def build_spritesheet(
+    input_path: str,
+    output_path: str,
+    rows: int,
+    engine: str = "pil",
+    encode_options: EncodeOptions = EncodeOptions(),
+    anim_key: str = "idle",
+) -> dict:
+    """Streams a GIF or frame folder into a spritesheet (one batch item)."""
+    if os.path.isdir(input_path):
+        frame_count, frame_size, frames = stream_frames_from_dir(input_path)
+    else:
+        frame_count, frame_size, frames = stream_frames_from_gif(input_path)
+    return create_spritesheet(frames, output_path, rows, frame_count=frame_count, frame_size=frame_size,
+                              engine=engine, encode_options=encode_options, anim_key=anim_key)
+
+def _build_captured(
+    input_path: str,
+    output_path: str,
+    rows: int,
+    engine: str,
+    encode_options: EncodeOptions,
+) -> Tuple[Optional[dict], str]:
+    """Runs build_spritesheet in a worker process, returning (snippet, printed output)."""
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        try:
+            snippet = build_spritesheet(input_path, output_path, rows, engine, encode_options)
+        except (Exception, SystemExit) as e:
+            # The frame loaders sys.exit() on unreadable input; fail only this item
+            if not isinstance(e, SystemExit):
+                print(f"Error: {e}")
+            snippet = None
+    return snippet, buffer.getvalue()
+
+def is_frame_dir(path: str) -> bool:
+    """True if a directory directly contains frame images."""
+    return any(os.path.splitext(f.lower())[1] in VALID_FRAME_EXTS for f in os.listdir(path))
+
+def find_batch_inputs(pattern: str) -> List[str]:
+    """
+    GIFs and frame folders for batch mode, sorted.
+
+    `pattern` is either a directory, searched recursively for GIF files and
+    folders of frame images, or a glob (``**`` supported) of those.
+    """
+    if os.path.isdir(pattern):
+        inputs = []
+        for root, dirs, files in os.walk(pattern):
+            dirs.sort()
+            inputs.extend(os.path.join(root, f) for f in sorted(files) if f.lower().endswith('.gif'))
+            if root != pattern and is_frame_dir(root):
+                inputs.append(root)
+        return sorted(inputs)
+
+    return sorted(
+        path for path in glob.glob(pattern, recursive=True)
+        if (os.path.isfile(path) and path.lower().endswith('.gif'))
+        or (os.path.isdir(path) and is_frame_dir(path))
+    )
+
+def plan_batch_jobs(args, inputs: List[str], warn: bool = True) -> List[Tuple[str, str, str]]:
+    """(input, name, output path) per batch input; the output name is the GIF/folder name."""
+    jobs: List[Tuple[str, str, str]] = []
+    seen = {}
+    for input_path in inputs:
+        stem = os.path.splitext(os.path.basename(os.path.normpath(input_path)))[0]
+        if stem in seen:
+            if warn:
+                print(f"Warning: {input_path} has the same name as {seen[stem]}. Skipping.")
+            continue
+        seen[stem] = input_path
+        jobs.append((input_path, stem, os.path.join(args.output_dir, f"{stem}.png")))
+    return jobs
+
+def build_batch(
+    args,
+    jobs: List[Tuple[str, str, str]],
+    pool: Optional[ProcessPoolExecutor],
+) -> List["download_assets.SpriteInfo"]:
+    """
+    Builds batch jobs (across `pool`, or in this process when there is no
+    pool or only one job) and returns their manifest entries; the manifest
+    ID is the output name plus --id-prefix.
+    """
+    from download_assets import PUBLIC_DIR, SpriteAnimation, SpriteInfo
+
+    options = encode_options(args)
+    if pool is None or len(jobs) == 1:
+        results = [_build_captured(input_path, output_path, args.rows, args.engine, options)
+                   for input_path, _, output_path in jobs]
+    else:
+        futures = [pool.submit(_build_captured, input_path, output_path, args.rows, args.engine, options)
+                   for input_path, _, output_path in jobs]
+        results = [future.result() for future in futures]
+
+    sprites: List[SpriteInfo] = []
+    for (input_path, stem, output_path), (snippet, log) in zip(jobs, results):
+        print(f"[{stem}] {input_path}")
+        for line in log.splitlines():
+            print(f"  {line}")
+        if snippet is None:
+            continue
+        sprite_id = f"{args.id_prefix}{stem}"
+        path = os.path.relpath(os.path.abspath(output_path), PUBLIC_DIR).replace(os.sep, '/')
+        sprites.append(SpriteInfo(
+            id=sprite_id,
+            name=sprite_id,
+            animations=[SpriteAnimation(
+                key=args.anim_key,
+                path=path,
+                frame_width=snippet["frameWidth"],
+                frame_height=snippet["frameHeight"],
+                frame_count=snippet["frameCount"],
+                directions=snippet["directions"],
+                formats=tuple(snippet.get("formats", ["png"])),
+            )],
+        ))
+    return sprites
+
+def run_batch(args) -> int:
+    """Builds every GIF/frame folder across a process pool and merges them into the manifest."""
+    from download_assets import generate_manifest
+
+    inputs = find_batch_inputs(args.input)
+    if not inputs:
+        print(f"No GIFs or frame folders found for {args.input}")
+        return 1
+
+    jobs = plan_batch_jobs(args, inputs)
+    os.makedirs(args.output_dir, exist_ok=True)
+    print(f"Building {len(jobs)} spritesheets with {args.jobs} workers...")
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        sprites = build_batch(args, jobs, pool)
+
+    if sprites and not args.no_manifest:
+        generate_manifest(sprites)
+
+    print(f"Built {len(sprites)}/{len(jobs)} spritesheets.")
+    return 0 if len(sprites) == len(jobs) else 1
+
+def source_signature(path: str) -> Tuple:
+    """Size and mtime of a GIF, or of every frame image in a folder (empty if unreadable)."""
+    try:
+        if os.path.isdir(path):
+            return tuple(sorted(
+                (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+                for entry in os.scandir(path)
+                if os.path.splitext(entry.name.lower())[1] in VALID_FRAME_EXTS
+            ))
+        stat = os.stat(path)
+        return ((stat.st_size, stat.st_mtime_ns),)
+    except OSError:
+        return ()
+
+def cached_zip_hashes() -> Dict[str, str]:
+    """Cache key (padded Pokémon ID) -> zip SHA-256, from the download cache's index."""
+    import download_assets
+
+    try:
+        with open(download_assets.CACHE_DIR / "index.json") as f:
+            return {key: entry["sha256"] for key, entry in json.load(f).get("entries", {}).items()}
+    except (OSError, ValueError, KeyError, AttributeError):
+        return {}
+
+def watch(args) -> int:
+    """
+    Rebuilds spritesheets whenever their sources change, until Ctrl+C.
+
+    Watches the input GIF/frame folder (with --batch: every input under the
+    directory or glob, including new ones) and the download cache. Changes
+    are rebuilt once the sources have been quiet for --debounce ms, and only
+    the affected sheets and manifest entries are rewritten. The process
+    stays up between rebuilds, so no rebuild pays for interpreter or Pillow
+    startup; with --batch, bursts of several sheets go to a warm worker pool.
+    Zips that change in the download cache are reprocessed for the Pokémon
+    the build lockfile knows, with the options they were built with.
+    """
+    import download_assets
+    from download_assets import generate_manifest
+
+    debounce = args.debounce / 1000
+
+    def current_jobs() -> Dict[str, Tuple[str, str, str]]:
+        if args.batch:
+            jobs = plan_batch_jobs(args, find_batch_inputs(args.input), warn=False)
+        else:
+            jobs = [(args.input, os.path.splitext(os.path.basename(args.output))[0], args.output)]
+        return {job[0]: job for job in jobs}
+
+    pool = ProcessPoolExecutor(max_workers=args.jobs) if args.batch and args.jobs > 1 else None
+
+    def rebuild(jobs: List[Tuple[str, str, str]], pokemon_ids: Set[int]):
+        started = time.perf_counter()
+        rebuilt = 0
+        if jobs:
+            sprites = build_batch(args, jobs, pool)
+            rebuilt += len(sprites)
+            if args.batch and sprites and not args.no_manifest:
+                generate_manifest(sprites)
+        if pokemon_ids:
+            rebuilt += len(download_assets.rebuild_cached(sorted(pokemon_ids)))
+        print(f"Rebuilt {rebuilt} spritesheet(s) in {time.perf_counter() - started:.2f}s")
+
+    if args.batch:
+        os.makedirs(args.output_dir, exist_ok=True)
+    cache_index = str(download_assets.CACHE_DIR / "index.json")
+    jobs = current_jobs()
+    sources = {path: source_signature(path) for path in jobs}
+    cache_signature = source_signature(cache_index)
+    zips = cached_zip_hashes()
+
+    try:
+        rebuild(list(jobs.values()), set())
+        print(f"Watching {len(jobs)} source(s) and the download cache for changes (Ctrl+C to stop)...")
+
+        pending: Set[str] = set()
+        pending_ids: Set[int] = set()
+        last_change = 0.0
+        while True:
+            time.sleep(WATCH_POLL_SECONDS)
+
+            jobs = current_jobs()
+            for path in jobs:
+                signature = source_signature(path)
+                if signature != sources.get(path):
+                    sources[path] = signature
+                    pending.add(path)
+                    last_change = time.monotonic()
+            for path in set(sources) - set(jobs):
+                del sources[path]
+                pending.discard(path)
+                print(f"Note: {path} was removed; its spritesheet and manifest entry are kept.")
+
+            signature = source_signature(cache_index)
+            if signature != cache_signature:
+                cache_signature = signature
+                current_zips = cached_zip_hashes()
+                changed = {int(key) for key, sha256 in current_zips.items() if key.isdigit() and zips.get(key) != sha256}
+                zips = current_zips
+                if changed:
+                    pending_ids |= changed
+                    last_change = time.monotonic()
+
+            if (pending or pending_ids) and time.monotonic() - last_change >= debounce:
+                rebuild([jobs[path] for path in sorted(pending)], pending_ids)
+                pending.clear()
+                pending_ids.clear()
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+        return 0
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+def encode_options(args) -> EncodeOptions:
+    return EncodeOptions(optimize=args.optimize_png, webp=args.webp)
+
+def manifest_entry(args, animation: dict) -> dict:
+    """Manifest entry for a single-input sheet; the ID is the output file name plus --id-prefix."""
+    sprite_id = f"{args.id_prefix}{os.path.splitext(os.path.basename(args.output))[0]}"
+    return {"id": sprite_id, "name": sprite_id, "animations": [animation]}
+
+def print_manifest_snippet(manifest_snippet: dict):
+    print("\nManifest JSON Snippet (add it to the list in public/assets/manifest.json):")
     print(json.dumps(manifest_snippet, indent=2))
 
 def main():
     parser = argparse.ArgumentParser(description="Generate a spritesheet from images or a GIF.")
-    parser.add_argument('input', help="Path to a GIF file or a directory of images")
+    parser.add_argument('input', help="Path to a GIF file or a directory of images (with --batch: a directory tree or glob)")
     parser.add_argument('--output', '-o', default='output_sprite.png', help="Output path for the spritesheet")
     parser.add_argument('--rows', '-r', type=int, default=8, help="Number of rows (directions). Default 8.")
+    parser.add_argument('--stream', action='store_true',
+                        help="Decode and paste one frame at a time (bounded memory for long GIFs / large folders)")
+    parser.add_argument('--engine', choices=sprite_arrays.ENGINES, default='pil',
+                        help="Sheet engine: pil (default) or numpy (also crops fully transparent trailing rows/columns)")
+    parser.add_argument('--optimize-png', action='store_true',
+                        help="Write the smallest lossless PNG (max compression, or indexed palette when <=256 colors)")
+    parser.add_argument('--webp', action='store_true', help="Also write a lossless .webp next to the PNG")
+    parser.add_argument('--batch', action='store_true',
+                        help="Build every GIF/frame folder under the input directory or glob and merge them into the manifest")
+    parser.add_argument('--output-dir',
+                        help="Batch mode: directory for the spritesheets. Default public/assets/sprites.")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help="Batch mode: number of worker processes. Default: CPU count.")
+    parser.add_argument('--id-prefix', default='',
+                        help="Prefix for manifest IDs, e.g. 'projectile-' (ID = prefix + output name; "
+                             "in batch mode the file/folder name)")
+    parser.add_argument('--anim-key', default='idle', help="Animation key in the manifest. Default 'idle'.")
+    parser.add_argument('--no-manifest', action='store_true', help="Batch mode: only build the spritesheets")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running and rebuild only the sheets whose GIF/frame folder (or cached zip) changed")
+    parser.add_argument('--debounce', type=int, default=DEFAULT_DEBOUNCE_MS, metavar='MS',
+                        help=f"Watch mode: wait for MS quiet milliseconds before rebuilding. Default {DEFAULT_DEBOUNCE_MS}.")
 
     args = parser.parse_args()
     
+    if args.engine == 'numpy' and not sprite_arrays.numpy_available():
+        print("Error: --engine numpy requires NumPy. Please install it using 'pip install numpy'")
+        sys.exit(1)
+
+    if args.webp and not webp_available():
+        print("Error: --webp requires Pillow built with WebP support.")
+        sys.exit(1)
+
+    if args.batch and args.output_dir is None:
+        from download_assets import SPRITES_OUTPUT_DIR
+        args.output_dir = str(SPRITES_OUTPUT_DIR)
+
+    if args.watch:
+        sys.exit(watch(args))
+
+    if args.batch:
+        sys.exit(run_batch(args))
+
     input_path = args.input
+    if args.stream and (os.path.isdir(input_path) or input_path.lower().endswith('.gif')):
+        print_manifest_snippet(manifest_entry(args, build_spritesheet(
+            input_path, args.output, args.rows, args.engine, encode_options(args), args.anim_key)))
+        return
+
     if os.path.isfile(input_path):
         # Assume GIF if single file (or try to load as image)
         # Check extension?
@@ -131,7 +583,8 @@ def main():
         print(f"Error: Input {input_path} not found.")
         sys.exit(1)
 
-    create_spritesheet(frames, args.output, args.rows)
+    print_manifest_snippet(manifest_entry(args, create_spritesheet(
+        frames, args.output, args.rows, engine=args.engine, encode_options=encode_options(args), anim_key=args.anim_key)))
 
 if __name__ == "__main__":
     main()
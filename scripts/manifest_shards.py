@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Sharded Manifest for the Poke-Survivor Asset Pipeline
+
+With `download_assets.py --shards` manifest.json becomes a small index and
+the sprite entries are split into per-group shards next to it
+(assets/manifest/<group>.json), each with its own animations file. The
+Preloader starts the game as soon as the preload shards (the starters with
+their projectiles, the first enemy wave) are in and loads the others in the
+background, so time-to-first-frame does not grow with the roster.
+
+Index format:
+
+    {"version": 1, "shards": [{"group", "preload", "path", "animations", "sprites"}]}
+
+Sprites are grouped by name or name prefix (see MANIFEST_GROUPS); anything
+not listed goes to the "extra" shard, which loads last. The Preloader loads
+each shard's animations file instead of the global animations.json.
+
+Whether sharded or not, manifest files are written atomically (temp file +
+rename) while holding manifest_lock(), so two pipeline runs at once (e.g.
+download_assets.py and generate_sprite.py --watch) cannot corrupt the
+manifest or lose each other's entries. The download cache index and the
+precache list are guarded the same way (see sprite_cache and
+asset_fingerprint).
+"""
+
+import contextlib
+import os
+import threading
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+from sprite_cache import file_lock, write_atomic
+
+# Bump if the index layout changes
+MANIFEST_INDEX_VERSION = 1
+
+
+# =============================================================================
+# Groups
+# =============================================================================
+
+class ManifestGroup(NamedTuple):
+    """One manifest shard: the sprite names it holds and whether the game waits for it"""
+    name: str
+    preload: bool
+    members: frozenset[str]
+    prefixes: tuple[str, ...] = ()  # sprite names starting with one of these belong here too
+
+
+# In load order; mirrors PLAYABLE_DEX, EnemySpawner's WAVE_CONFIG and the evolution lines.
+# Baked textures (download_assets.py --bake-textures) and the starters' projectiles and
+# effects (e.g. Charmander's Ember fireball) are needed from the first frame.
+MANIFEST_GROUPS = (
+    ManifestGroup("textures", True, frozenset({"textures"})),
+    ManifestGroup("effects", True, frozenset(), ("projectile-", "effect-")),
+    ManifestGroup("starters", True, frozenset({"pikachu", "charmander", "squirtle", "gastly", "riolu", "snorlax"})),
+    ManifestGroup("wave-1", True, frozenset({"rattata"})),
+    ManifestGroup("wave-2", False, frozenset({"zubat"})),
+    ManifestGroup("wave-3", False, frozenset({"geodude"})),
+    ManifestGroup("evolutions", False, frozenset({
+        "raichu", "charmeleon", "charizard", "wartortle", "blastoise",
+        "haunter", "gengar", "lucario", "pokemon_448",
+    })),
+)
+
+# Shard for sprites no group lists
+DEFAULT_GROUP = ManifestGroup("extra", False, frozenset())
+
+
+def group_of(entry: dict) -> ManifestGroup:
+    """The group a manifest entry is sharded into."""
+    for group in MANIFEST_GROUPS:
+        if entry["name"] in group.members or entry["name"].startswith(group.prefixes):
+            return group
+    return DEFAULT_GROUP
+
+
+def split_manifest(manifest: list[dict]) -> list[tuple[ManifestGroup, list[dict]]]:
+    """Non-empty shards in load order, entries keeping their manifest order."""
+    shards: dict[ManifestGroup, list[dict]] = {group: [] for group in (*MANIFEST_GROUPS, DEFAULT_GROUP)}
+    for entry in manifest:
+        shards[group_of(entry)].append(entry)
+    return [(group, entries) for group, entries in shards.items() if entries]
+
+
+# =============================================================================
+# Index
+# =============================================================================
+
+def is_index(data) -> bool:
+    """Whether a parsed manifest.json is a shard index rather than a flat entry list."""
+    return isinstance(data, dict) and "shards" in data
+
+
+def shard_paths(shard_dir: Path, group: str) -> tuple[Path, Path]:
+    """Entries and animations files of a group's shard."""
+    return shard_dir / f"{group}.json", shard_dir / f"{group}.animations.json"
+
+
+def build_index(shards: list[tuple[ManifestGroup, list[dict]]], shard_dir: Path, public_dir: Path) -> dict:
+    """Index for `shards` (as split_manifest returns them), with paths relative to the public dir."""
+    index_shards = []
+    for group, entries in shards:
+        path, animations_path = shard_paths(shard_dir, group.name)
+        index_shards.append({
+            "group": group.name,
+            "preload": group.preload,
+            "path": path.relative_to(public_dir).as_posix(),
+            "animations": animations_path.relative_to(public_dir).as_posix(),
+            "sprites": [entry["name"] for entry in entries],
+        })
+    return {"version": MANIFEST_INDEX_VERSION, "shards": index_shards}
+
+
+def index_files(index: dict) -> list[str]:
+    """Every shard and shard animations file an index references, relative to the public dir."""
+    return [path for shard in index["shards"] for path in (shard["path"], shard["animations"])]
+
+
+# =============================================================================
+# Writing
+# =============================================================================
+
+# Threads of one process serialize here; processes serialize on the lock file
+_process_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def manifest_lock(manifest_path: Path) -> Iterator[None]:
+    """
+    Hold the manifest's lock file (.manifest.json.lock) for a read-modify-write
+    of the manifest. Blocks while another run holds it. Not reentrant.
+    """
+    with _process_lock, file_lock(manifest_path.with_name(f".{manifest_path.name}.lock")):
+        yield
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """Atomically replace `path` with `content`; returns False (and writes nothing) if it already matches."""
+    if path.exists() and path.read_text() == content:
+        return False
+    write_atomic(path, content.encode())
+    # Temp files are created owner-only; the web server must be able to read these
+    os.chmod(path, 0o644)
+    return True
+
+
+def remove_stale_shards(shard_dir: Path, keep: set[Path]) -> list[Path]:
+    """Delete shard files in `shard_dir` that are not in `keep`."""
+    removed = []
+    if not shard_dir.is_dir():
+        return removed
+    for path in sorted(shard_dir.glob("*.json")):
+        if path not in keep:
+            path.unlink()
+            removed.append(path)
+    if not keep:
+        with contextlib.suppress(OSError):
+            shard_dir.rmdir()
+    return removed
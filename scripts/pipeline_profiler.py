@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Stage Timing for the Poke-Survivor Asset Pipeline
+
+Records how long each pipeline stage (network, zip, decode, crop, encode, ...)
+takes for each Pokémon, writes the spans as a Chrome trace (open it in
+chrome://tracing or https://ui.perfetto.dev) and prints the slowest stages
+and items.
+
+Profiling is off until enable() is called; until then profile_stage() returns
+a no-op context manager, so instrumented code costs nothing in normal runs.
+Spans recorded in worker processes are handed back with drain_spans() and
+merged into the parent with add_spans().
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+# =============================================================================
+# Data Structures
+# =============================================================================
+
+class Span(NamedTuple):
+    """One timed stage. Nested stages have depth > 0."""
+    stage: str
+    item: str | None  # e.g. "#25 pikachu"; None for whole-run stages
+    start: float  # time.perf_counter() seconds
+    duration: float  # seconds
+    depth: int
+    pid: int
+    tid: int
+    args: dict
+
+
+class StageTotal(NamedTuple):
+    """Aggregate timing of one stage across all items."""
+    stage: str
+    count: int
+    total: float
+    max: float
+
+
+# =============================================================================
+# Recording
+# =============================================================================
+
+_enabled = False
+_origin = 0.0
+_spans: list[Span] = []
+_spans_lock = threading.Lock()
+_local = threading.local()
+
+
+def enable() -> None:
+    """Start recording spans (also called in worker processes)."""
+    global _enabled, _origin
+    if not _enabled:
+        _enabled = True
+        _origin = time.perf_counter()
+
+
+def init_worker() -> None:
+    """ProcessPoolExecutor initializer: record spans, minus any inherited through fork."""
+    enable()
+    drain_spans()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+@contextlib.contextmanager
+def _record(stage: str, item: str | None, args: dict):
+    stack = _local.__dict__.setdefault("stack", [])
+    # Nested stages belong to the item of the stage they run in
+    if item is None and stack:
+        item = stack[-1]
+    stack.append(item)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        stack.pop()
+        span = Span(stage, item, start, duration, len(stack), os.getpid(), threading.get_native_id(), args)
+        with _spans_lock:
+            _spans.append(span)
+
+
+def profile_stage(stage: str, item: str | None = None, **args):
+    """
+    Context manager timing one stage of the pipeline.
+
+    `item` names what is being processed; nested stages inherit it from the
+    enclosing stage. Extra keyword arguments are stored with the span and
+    shown in the trace viewer.
+    """
+    if not _enabled:
+        return contextlib.nullcontext()
+    return _record(stage, item, args)
+
+
+def drain_spans() -> list[Span]:
+    """Return and forget the spans recorded so far in this process."""
+    with _spans_lock:
+        spans = _spans[:]
+        _spans.clear()
+    return spans
+
+
+def add_spans(spans: list[Span]) -> None:
+    """Merge spans recorded in another process."""
+    with _spans_lock:
+        _spans.extend(spans)
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def stage_totals(spans: list[Span]) -> list[StageTotal]:
+    """Per-stage count/total/max, slowest total first."""
+    totals: dict[str, StageTotal] = {}
+    for span in spans:
+        count, total, longest = totals.get(span.stage, StageTotal(span.stage, 0, 0.0, 0.0))[1:]
+        totals[span.stage] = StageTotal(span.stage, count + 1, total + span.duration, max(longest, span.duration))
+    return sorted(totals.values(), key=lambda t: t.total, reverse=True)
+
+
+def item_totals(spans: list[Span]) -> dict[str, dict[str, float]]:
+    """Per-item time, total and per stage. Only top-level stages count towards the total."""
+    items: dict[str, dict[str, float]] = {}
+    for span in spans:
+        if span.item is None:
+            continue
+        stages = items.setdefault(span.item, {"total": 0.0})
+        stages[span.stage] = stages.get(span.stage, 0.0) + span.duration
+        if span.depth == 0:
+            stages["total"] += span.duration
+    return dict(sorted(items.items(), key=lambda kv: kv[1]["total"], reverse=True))
+
+
+def write_trace(path: Path, spans: list[Span]) -> None:
+    """
+    Write spans in the Chrome trace event format.
+
+    The file is also the machine-readable report: besides "traceEvents" it
+    holds "stages" and "items" aggregates, which trace viewers ignore.
+    """
+    main_pid = os.getpid()
+    events = [
+        {
+            "name": "process_name",
+            "ph": "M",
+            "pid": pid,
+            "args": {"name": "main" if pid == main_pid else f"worker {pid}"},
+        }
+        for pid in sorted({span.pid for span in spans})
+    ]
+    for span in sorted(spans, key=lambda s: s.start):
+        events.append({
+            "name": span.stage,
+            "cat": "pipeline",
+            "ph": "X",
+            # perf_counter is a system-wide monotonic clock, so worker spans line up
+            "ts": round((span.start - _origin) * 1e6, 1),
+            "dur": round(span.duration * 1e6, 1),
+            "pid": span.pid,
+            "tid": span.tid,
+            "args": {"item": span.item, **span.args} if span.item else span.args,
+        })
+
+    report = {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "stages": {t.stage: t._asdict() for t in stage_totals(spans)},
+        "items": item_totals(spans),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=1))
+
+
+def print_summary(spans: list[Span], top: int = 10) -> None:
+    """Print the slowest stages and the slowest items."""
+    if not spans:
+        print("  ⚠️  No stages were recorded")
+        return
+
+    print("\n⏱️  Time per stage (nested stages are included in their parent):")
+    print(f"    {'stage':<12} {'count':>6} {'total':>9} {'mean':>9} {'max':>9}")
+    for t in stage_totals(spans):
+        print(f"    {t.stage:<12} {t.count:>6} {t.total * 1000:>7.1f}ms "
+              f"{t.total / t.count * 1000:>7.1f}ms {t.max * 1000:>7.1f}ms")
+
+    items = item_totals(spans)
+    if items:
+        print(f"\n🐢 Slowest {min(top, len(items))} of {len(items)} items:")
+        for item, stages in list(items.items())[:top]:
+            breakdown = ", ".join(
+                f"{stage} {seconds * 1000:.1f}ms"
+                for stage, seconds in sorted(stages.items(), key=lambda kv: kv[1], reverse=True)
+                if stage != "total"
+            )
+            print(f"    {item:<20} {stages['total'] * 1000:>7.1f}ms  ({breakdown})")
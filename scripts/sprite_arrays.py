@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+NumPy Frame Engine for the Poke-Survivor Asset Pipeline
+
+Optional array-backed implementation of the sheet operations used by
+download_assets.py and generate_sprite.py (--engine numpy). Frames live in
+contiguous uint8 arrays: a stack of frames × height × width × 4 (RGBA), or a
+sheet viewed as rows × cols × height × width × 4 cells. Assembling a sheet,
+finding empty (fully transparent) cells and computing per-frame alpha bounds
+are then a handful of array operations instead of one PIL call per frame;
+PIL is only used to decode and encode.
+
+NumPy is not a hard dependency of the pipeline; check numpy_available()
+before selecting this engine.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # optional: only needed for --engine numpy
+    np = None
+
+from PIL import Image
+
+# Engine names accepted by the --engine flags
+ENGINES = ("pil", "numpy")
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+# =============================================================================
+# Conversion
+# =============================================================================
+
+def image_to_array(image: Image.Image) -> "np.ndarray":
+    """Decode an image into an H × W × 4 uint8 RGBA array."""
+    return np.asarray(image.convert("RGBA"), dtype=np.uint8)
+
+
+def array_to_image(array: "np.ndarray") -> Image.Image:
+    """Wrap an H × W × 4 uint8 array as an RGBA image for encoding."""
+    return Image.fromarray(np.ascontiguousarray(array), "RGBA")
+
+
+def stack_frames(frames: list[Image.Image], frame_size: tuple[int, int]) -> "np.ndarray":
+    """
+    Stack frames into one N × H × W × 4 array.
+
+    Frames of a different size are resized to `frame_size` first, matching
+    create_spritesheet; that is the only per-frame PIL work besides decoding.
+    """
+    width, height = frame_size
+    stack = np.zeros((len(frames), height, width, 4), dtype=np.uint8)
+    for index, frame in enumerate(frames):
+        if frame.size != frame_size:
+            frame = frame.resize(frame_size)
+        stack[index] = image_to_array(frame)
+    return stack
+
+
+# =============================================================================
+# Sheet Layout
+# =============================================================================
+
+def crop_array(array: "np.ndarray", width: int, height: int) -> "np.ndarray":
+    """Top-left width × height region, padded with transparency like Image.crop."""
+    if array.shape[0] >= height and array.shape[1] >= width:
+        return array[:height, :width]
+    padded = np.zeros((height, width, array.shape[2]), dtype=array.dtype)
+    region = array[:height, :width]
+    padded[: region.shape[0], : region.shape[1]] = region
+    return padded
+
+
+def blank_sheet(width: int, height: int) -> "np.ndarray":
+    """A fully transparent height × width × 4 sheet."""
+    return np.zeros((height, width, 4), dtype=np.uint8)
+
+
+def cell_grid(sheet: "np.ndarray", frame_width: int, frame_height: int) -> "np.ndarray":
+    """
+    View a sheet as rows × cols × H × W × 4 cells (no copy, so assigning a
+    cell writes into the sheet). Partial cells at the right/bottom edge are ignored.
+    """
+    rows = sheet.shape[0] // frame_height
+    cols = sheet.shape[1] // frame_width
+    cropped = sheet[: rows * frame_height, : cols * frame_width]
+    return cropped.reshape(rows, frame_height, cols, frame_width, sheet.shape[2]).swapaxes(1, 2)
+
+
+# =============================================================================
+# Frame Analysis
+# =============================================================================
+
+def empty_cells(cells: "np.ndarray") -> "np.ndarray":
+    """Boolean mask over the leading axes: True where a cell is fully transparent."""
+    return cells[..., 3].max(axis=(-2, -1)) == 0
+
+
+def alpha_bounds(cells: "np.ndarray") -> "np.ndarray":
+    """
+    Bounding box (left, top, right, bottom) of each cell's non-transparent
+    pixels, as an int array over the leading axes. Right/bottom are exclusive,
+    like PIL's getbbox(); empty cells get (0, 0, 0, 0).
+    """
+    opaque = cells[..., 3] > 0
+    columns = opaque.any(axis=-2)  # ... × W
+    lines = opaque.any(axis=-1)  # ... × H
+    width, height = columns.shape[-1], lines.shape[-1]
+
+    left = columns.argmax(axis=-1)
+    right = width - columns[..., ::-1].argmax(axis=-1)
+    top = lines.argmax(axis=-1)
+    bottom = height - lines[..., ::-1].argmax(axis=-1)
+
+    bounds = np.stack([left, top, right, bottom], axis=-1)
+    bounds[~columns.any(axis=-1)] = 0
+    return bounds
+
+
+def block_masks(cells: "np.ndarray", block: int) -> "np.ndarray":
+    """
+    Bit-packed block occupancy of N × H × W × 4 cells: one bit per
+    block × block region with any non-transparent pixel, row-major and most
+    significant bit first, padded to whole bytes per cell (N × bytes).
+    Cells are padded with transparency up to whole blocks.
+    """
+    count, height, width = cells.shape[:3]
+    rows, cols = -(-height // block), -(-width // block)
+    opaque = np.zeros((count, rows * block, cols * block), dtype=bool)
+    opaque[:, :height, :width] = cells[..., 3] > 0
+    occupied = opaque.reshape(count, rows, block, cols, block).any(axis=(2, 4))
+    return np.packbits(occupied.reshape(count, rows * cols), axis=1)
+
+
+def used_grid(empty: "np.ndarray") -> tuple[int, int]:
+    """
+    (rows, cols) actually in use on a rows × cols grid of empty-cell flags:
+    trailing rows and columns that are empty everywhere are dropped.
+    Returns (0, 0) when every cell is empty.
+    """
+    occupied = ~empty
+    used_rows = np.flatnonzero(occupied.any(axis=1))
+    used_cols = np.flatnonzero(occupied.any(axis=0))
+    if used_rows.size == 0:
+        return 0, 0
+    return int(used_rows[-1]) + 1, int(used_cols[-1]) + 1
+
+
+def rows_mirrored(cells: "np.ndarray", row: int, mirror_row: int) -> bool:
+    """True if every cell in `row` is the exact horizontal mirror of the same cell in `mirror_row`."""
+    return bool(np.array_equal(cells[row], cells[mirror_row][:, :, ::-1]))
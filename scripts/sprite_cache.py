@@ -0,0 +1,489 @@
+"""
+Download Cache for the Poke-Survivor Asset Pipeline
+
+Stores downloaded sprites.zip files content-addressed by SHA-256 under
+`objects/`, with an `index.json` that maps each cache key (the padded Pokémon
+ID) to its blob, HTTP validators and last access time.
+
+- Every read re-hashes the blob, so a truncated or corrupted download is
+  dropped and re-fetched instead of crashing a later run with BadZipFile.
+  Hashing happens outside the cache lock, so concurrent fetches do not
+  wait on each other's reads.
+- The cache has a byte budget; least-recently-used entries are evicted once
+  it is exceeded. Entries pinned by an in-flight build are never evicted.
+- Blobs are handled as files (hashed in chunks, moved into place), so a
+  download never has to be held in memory.
+- Access times and refreshed validators are only written to the index by
+  the next store/evict or by flush(), so reading N entries does not
+  rewrite the whole index N times.
+- Index changes are a read-modify-write under a lock file (.index.lock):
+  each one merges the index on disk first, so runs sharing the cache (e.g.
+  download_assets.py and generate_sprite.py --watch) keep each other's
+  entries.
+
+Used by download_assets.py (`python download_assets.py cache stats|prune|verify`).
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Bump if the index layout changes; older indexes are discarded
+INDEX_VERSION = 1
+
+# Default byte budget (override with SPRITE_CACHE_MAX_BYTES or --cache-size)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Read size for hashing files without loading them whole
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Names of temp_path() files; prune() removes abandoned ones (and nothing else)
+TEMP_FILE_PREFIX = ".tmp-"
+TEMP_FILE_SUFFIX = ".part"
+
+# Suffixes accepted by parse_size()
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+# =============================================================================
+# Data Structures
+# =============================================================================
+
+class CacheEntry(NamedTuple):
+    """Index record for one cache key"""
+    key: str
+    sha256: str
+    size: int
+    last_access: float
+    etag: str | None = None
+    last_modified: str | None = None
+    url: str | None = None
+
+
+class CacheStats(NamedTuple):
+    """Summary of cache usage"""
+    entries: int
+    blobs: int
+    total_bytes: int
+    max_bytes: int
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def parse_size(text: str) -> int:
+    """Parse a byte size such as '512M', '2G' or '1048576'."""
+    text = text.strip().upper().removesuffix("B").removesuffix("I")
+    unit = text[-1:] if text[-1:] in SIZE_UNITS else ""
+    number = text[:-1] if unit else text
+    try:
+        return int(float(number) * SIZE_UNITS[unit])
+    except ValueError:
+        raise ValueError(f"Invalid size: {text!r} (expected e.g. 512M, 2G)") from None
+
+
+def format_size(num_bytes: int) -> str:
+    """Format a byte count for humans."""
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} GB"
+
+
+def sha256_bytes(data: bytes) -> str:
+    """Hex SHA-256 of a byte string."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path: Path) -> str:
+    """Hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def temp_path(directory: Path, prefix: str) -> Path:
+    """Create an empty temp file (cleaned up by prune if abandoned) and return its path."""
+    directory.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        dir=directory, prefix=f"{TEMP_FILE_PREFIX}{prefix}.", suffix=TEMP_FILE_SUFFIX, delete=False,
+    ) as tmp:
+        return Path(tmp.name)
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write via a temp file + rename so an interrupted run never leaves a truncated file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", delete=False) as tmp:
+        tmp.write(data)
+    os.replace(tmp.name, path)
+
+
+@contextlib.contextmanager
+def file_lock(lock_path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive lock on `lock_path` (created if missing) across
+    processes. Blocks while another process holds it. Threads must
+    serialize among themselves first; the lock is not reentrant.
+    """
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+b") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+class SpriteCache:
+    """Content-addressed, size-capped cache of downloaded archives."""
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.objects_dir = root / "objects"
+        self.index_path = root / "index.json"
+        self.index_lock_path = root / ".index.lock"
+        # Fetch threads share one cache instance
+        self._lock = threading.RLock()
+        self._entries: dict[str, CacheEntry] = {}
+        # key -> pin count; pinned entries are in use and never evicted
+        self._pins: dict[str, int] = {}
+        # Keys whose access time / validators changed since the last index write
+        self._accessed: set[str] = set()
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._entries = self._read_index() or {}
+        self._migrate_legacy_files()
+
+    # -- Index persistence -----------------------------------------------------
+
+    def _read_index(self) -> dict[str, CacheEntry] | None:
+        """Entries of index.json; {} if there is none (or an old version), None if it is unreadable."""
+        if not self.index_path.exists():
+            return {}
+        try:
+            data = json.loads(self.index_path.read_text())
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"  ⚠️  Cache index unreadable, starting fresh: {e}")
+            return None
+        if data.get("version") != INDEX_VERSION:
+            return {}
+        return {key: CacheEntry(key=key, **record) for key, record in data.get("entries", {}).items()}
+
+    @contextlib.contextmanager
+    def _index_update(self) -> Iterator[None]:
+        """
+        Read-modify-write of the index: take the lock file, merge in what other
+        processes wrote since, let the caller change the entries, then save.
+        Call with self._lock held.
+        """
+        with file_lock(self.index_lock_path):
+            on_disk = self._read_index()
+            if on_disk is not None:
+                # The disk has every stored/evicted entry; keep only our newer access records
+                for key in self._accessed:
+                    mine, theirs = self._entries.get(key), on_disk.get(key)
+                    if mine and theirs and mine.sha256 == theirs.sha256:
+                        on_disk[key] = mine._replace(last_access=max(mine.last_access, theirs.last_access))
+                self._entries = on_disk
+            yield
+            self._save_index()
+
+    def _save_index(self) -> None:
+        entries = {
+            key: {field: value for field, value in entry._asdict().items() if field != "key"}
+            for key, entry in sorted(self._entries.items())
+        }
+        payload = {"version": INDEX_VERSION, "entries": entries}
+        write_atomic(self.index_path, json.dumps(payload, indent=2).encode())
+        self._accessed.clear()
+
+    def _migrate_legacy_files(self) -> None:
+        """Import `<id>_sprites.zip` files written before the cache was content-addressed."""
+        legacy = sorted(self.root.glob("*_sprites.zip"))
+        if not legacy:
+            return
+        for zip_path in legacy:
+            key = zip_path.name.removesuffix("_sprites.zip")
+            meta_path = zip_path.with_suffix(".json")
+            validators = {}
+            if meta_path.exists():
+                try:
+                    validators = json.loads(meta_path.read_text())
+                except (OSError, json.JSONDecodeError):
+                    pass
+            if key not in self._entries:
+                self.put_file(
+                    key,
+                    zip_path,
+                    etag=validators.get("etag"),
+                    last_modified=validators.get("last_modified"),
+                    url=validators.get("url"),
+                )
+            zip_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+        print(f"  ✓ Migrated {len(legacy)} legacy cached zip(s) into {self.root.name}/objects")
+
+    # -- Blob storage ----------------------------------------------------------
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self.objects_dir / sha256[:2] / f"{sha256}.zip"
+
+    def _remove_entry(self, key: str) -> CacheEntry | None:
+        """Drop an index entry and its blob, unless another entry shares the blob."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        if not any(other.sha256 == entry.sha256 for other in self._entries.values()):
+            self._blob_path(entry.sha256).unlink(missing_ok=True)
+        return entry
+
+    def _unique_blobs(self) -> dict[str, int]:
+        return {entry.sha256: entry.size for entry in self._entries.values()}
+
+    # -- Public API ------------------------------------------------------------
+
+    def get_entry(self, key: str) -> CacheEntry | None:
+        """Return the index record for a key without reading the blob."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def get_path(self, key: str, pin: bool = False) -> Path | None:
+        """
+        Return the path of the cached blob for a key, or None on a miss.
+
+        The blob is re-hashed on every read; a missing or corrupt blob is
+        evicted and reported as a miss so the caller re-downloads it. With
+        pin=True the entry is protected from eviction until unpin(key).
+        The access time is only written to the index by flush() or the next
+        store/eviction.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            # Pinned while it is hashed outside the lock, so it cannot be evicted meanwhile
+            self._pins[key] = self._pins.get(key, 0) + 1
+
+        path = self._blob_path(entry.sha256)
+        try:
+            intact = sha256_file(path) == entry.sha256
+        except OSError:
+            intact = False
+
+        with self._lock:
+            current = self._entries.get(key)
+            replaced = current is not None and current.sha256 != entry.sha256
+            if intact and not replaced and current is not None:
+                self._entries[key] = current._replace(last_access=time.time())
+                self._accessed.add(key)
+                if not pin:
+                    self._drop_pin(key)
+                return path
+            self._drop_pin(key)
+            if current is not None and not replaced:
+                print(f"  ⚠️  Cached blob for {key} is missing or corrupt, discarding it")
+                with self._index_update():
+                    if (self._entries.get(key) or current).sha256 == current.sha256:
+                        self._remove_entry(key)
+        # Replaced by another thread while it was hashed: read the new blob
+        return self.get_path(key, pin) if replaced else None
+
+    def get(self, key: str) -> bytes | None:
+        """Return the cached bytes for a key (verified like get_path), or None on a miss."""
+        path = self.get_path(key)
+        return path.read_bytes() if path else None
+
+    def _drop_pin(self, key: str) -> bool:
+        """Release one pin on a key; True once it has none left."""
+        count = self._pins.get(key, 0) - 1
+        if count > 0:
+            self._pins[key] = count
+            return False
+        self._pins.pop(key, None)
+        return True
+
+    def unpin(self, key: str) -> None:
+        """Release a pin taken by get_path(pin=True) or put_file(pin=True)."""
+        with self._lock:
+            if not self._drop_pin(key):
+                return
+            # Pinned entries may have pushed the cache over budget meanwhile
+            if sum(self._unique_blobs().values()) > self.max_bytes:
+                with self._index_update():
+                    self._evict_to(self.max_bytes)
+
+    def touch(self, key: str, etag: str | None = None, last_modified: str | None = None) -> None:
+        """Mark an entry as used (e.g. after a 304), refreshing its validators."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            self._entries[key] = entry._replace(
+                last_access=time.time(),
+                etag=etag or entry.etag,
+                last_modified=last_modified or entry.last_modified,
+            )
+            self._accessed.add(key)
+
+    def flush(self) -> None:
+        """Write access times and validators recorded since the last index write."""
+        with self._lock:
+            if self._accessed:
+                with self._index_update():
+                    pass
+
+    def put_file(
+        self,
+        key: str,
+        source: Path,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        url: str | None = None,
+        pin: bool = False,
+    ) -> CacheEntry:
+        """
+        Move a file into the cache under a key, then evict LRU entries to stay
+        within budget. `source` is consumed (renamed into objects/ or deleted
+        if an identical blob already exists).
+        """
+        sha256 = sha256_file(source)
+        size = source.stat().st_size
+        with self._lock, self._index_update():
+            blob_path = self._blob_path(sha256)
+            if blob_path.exists():
+                source.unlink()
+            else:
+                blob_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(source, blob_path)
+            previous = self._entries.get(key)
+            entry = CacheEntry(
+                key=key,
+                sha256=sha256,
+                size=size,
+                last_access=time.time(),
+                etag=etag,
+                last_modified=last_modified,
+                url=url,
+            )
+            self._entries[key] = entry
+            if previous and previous.sha256 != sha256 and \
+                    not any(other.sha256 == previous.sha256 for other in self._entries.values()):
+                self._blob_path(previous.sha256).unlink(missing_ok=True)
+            if pin:
+                self._pins[key] = self._pins.get(key, 0) + 1
+            self._evict_to(self.max_bytes, keep=key)
+            return entry
+
+    def put(
+        self,
+        key: str,
+        data: bytes,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        url: str | None = None,
+    ) -> CacheEntry:
+        """Store bytes under a key (see put_file)."""
+        staging = temp_path(self.root, "put")
+        staging.write_bytes(data)
+        return self.put_file(key, staging, etag=etag, last_modified=last_modified, url=url)
+
+    def _evict_to(self, max_bytes: int, keep: str | None = None) -> list[CacheEntry]:
+        """Evict least-recently-used, unpinned entries until unique blob bytes fit max_bytes."""
+        evicted: list[CacheEntry] = []
+        by_age = sorted(self._entries.values(), key=lambda e: e.last_access)
+        for entry in by_age:
+            if sum(self._unique_blobs().values()) <= max_bytes:
+                break
+            if entry.key == keep or entry.key in self._pins:
+                continue
+            self._remove_entry(entry.key)
+            evicted.append(entry)
+        return evicted
+
+    def prune(self, max_bytes: int | None = None) -> tuple[list[CacheEntry], int]:
+        """
+        Evict LRU entries down to max_bytes (default: the cache budget) and
+        delete orphaned blobs and stale temp files.
+
+        Returns: (evicted_entries, orphan_files_removed)
+        """
+        with self._lock, self._index_update():
+            evicted = self._evict_to(self.max_bytes if max_bytes is None else max_bytes)
+            referenced = set(self._unique_blobs())
+            orphans = 0
+            if self.objects_dir.exists():
+                for path in self.objects_dir.rglob("*"):
+                    if path.is_file() and path.stem not in referenced:
+                        path.unlink()
+                        orphans += 1
+            # Only this module's own temp files: abandoned downloads and index writes
+            stale = [
+                *self.root.glob(f"{TEMP_FILE_PREFIX}*{TEMP_FILE_SUFFIX}"),
+                *self.root.glob(f".{self.index_path.name}.*"),
+            ]
+            for path in stale:
+                if path.is_file():
+                    path.unlink()
+                    orphans += 1
+            return evicted, orphans
+
+    def verify(self) -> list[str]:
+        """Re-hash every blob, dropping entries that are missing or corrupt. Returns bad keys."""
+        with self._lock:
+            bad: list[str] = []
+            for key, entry in sorted(self._entries.items()):
+                path = self._blob_path(entry.sha256)
+                if not path.exists() or sha256_file(path) != entry.sha256:
+                    bad.append(key)
+            if bad:
+                with self._index_update():
+                    for key in bad:
+                        self._remove_entry(key)
+            return bad
+
+    def stats(self) -> CacheStats:
+        """Current entry count, unique blob count and bytes on disk."""
+        with self._lock:
+            blobs = self._unique_blobs()
+            return CacheStats(
+                entries=len(self._entries),
+                blobs=len(blobs),
+                total_bytes=sum(blobs.values()),
+                max_bytes=self.max_bytes,
+            )
+
+    def entries(self) -> list[CacheEntry]:
+        """All index records, most recently used first."""
+        with self._lock:
+            return sorted(self._entries.values(), key=lambda e: e.last_access, reverse=True)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Output Encoder for the Poke-Survivor Asset Pipeline
+
+Writes sprite sheets as small as possible without changing a single pixel.
+Several lossless PNG encodings are tried and the smallest one is kept:
+
+- plain: what the pipeline always wrote (Image.save(..., "PNG"))
+- rgba: the same pixels with optimize=True (maximum zlib compression)
+- palette: an indexed PNG with a tRNS chunk, when the sheet has at most 256
+  distinct RGBA colors (PMD sprites usually have a few dozen)
+
+Optionally a lossless WebP is written next to the PNG for clients that can
+decode it. Every candidate is decoded again and compared with the source
+pixels before it is accepted.
+"""
+
+import io
+from pathlib import Path
+from typing import NamedTuple
+
+from PIL import Image, features
+
+# =============================================================================
+# Data Structures
+# =============================================================================
+
+class EncodeOptions(NamedTuple):
+    """How output sheets are encoded (--optimize-png / --webp)."""
+    optimize: bool = False
+    webp: bool = False
+
+    @property
+    def name(self) -> str:
+        """Short label stored in the build lockfile, e.g. "png-optimized+webp"."""
+        return ("png-optimized" if self.optimize else "png") + ("+webp" if self.webp else "")
+
+    @classmethod
+    def from_name(cls, name: str) -> "EncodeOptions":
+        """Inverse of .name, for rebuilding an output the way the lockfile says it was built."""
+        return cls(optimize=name.startswith("png-optimized"), webp=name.endswith("+webp"))
+
+
+class EncodeResult(NamedTuple):
+    """Outcome of encoding one sheet, for the size report."""
+    formats: tuple[str, ...]  # file extensions written, PNG first
+    plain_bytes: int  # size of a plain Image.save(..., "PNG")
+    png_bytes: int  # size of the PNG actually written
+    webp_bytes: int | None
+    method: str  # winning PNG candidate: "plain", "rgba" or "palette"
+
+
+# =============================================================================
+# Encoding
+# =============================================================================
+
+def webp_available() -> bool:
+    return features.check("webp")
+
+
+def palette_image(image: Image.Image) -> Image.Image | None:
+    """
+    Exact indexed copy of an RGBA image, or None if it has over 256 colors.
+
+    Each distinct RGBA value gets its own palette entry, with its alpha in the
+    transparency table, so the conversion is lossless.
+    """
+    colors = image.getcolors(256)
+    if colors is None:
+        return None
+    palette = [color for _, color in colors]
+    index = {color: i for i, color in enumerate(palette)}
+
+    indexed = Image.new("P", image.size)
+    indexed.putdata([index[pixel] for pixel in image.getdata()])
+    indexed.putpalette([channel for color in palette for channel in color[:3]])
+    alphas = bytes(color[3] for color in palette)
+    if any(alpha != 255 for alpha in alphas):
+        indexed.info["transparency"] = alphas
+    return indexed
+
+
+def _png_bytes(image: Image.Image, **params) -> bytes:
+    buffer = io.BytesIO()
+    if "transparency" in image.info:
+        params["transparency"] = image.info["transparency"]
+    image.save(buffer, "PNG", **params)
+    return buffer.getvalue()
+
+
+def _decodes_to(data: bytes, rgba: bytes) -> bool:
+    with Image.open(io.BytesIO(data)) as decoded:
+        return decoded.convert("RGBA").tobytes() == rgba
+
+
+def encode_png(image: Image.Image, optimize: bool) -> tuple[bytes, str, int]:
+    """
+    Smallest lossless PNG for `image`.
+
+    Returns (data, method, plain size). Without `optimize` this is just the
+    plain encoding.
+    """
+    rgba = image.convert("RGBA")
+    plain = _png_bytes(rgba)
+    if not optimize:
+        return plain, "plain", len(plain)
+
+    candidates = [(plain, "plain"), (_png_bytes(rgba, optimize=True), "rgba")]
+    indexed = palette_image(rgba)
+    if indexed is not None:
+        candidates.append((_png_bytes(indexed, optimize=True), "palette"))
+
+    pixels = rgba.tobytes()
+    data, method = min(
+        (candidate for candidate in candidates if candidate[1] == "plain" or _decodes_to(candidate[0], pixels)),
+        key=lambda candidate: len(candidate[0]),
+    )
+    return data, method, len(plain)
+
+
+def encode_webp(image: Image.Image) -> bytes:
+    """Lossless WebP, keeping the RGB of transparent pixels (exact=True)."""
+    buffer = io.BytesIO()
+    image.convert("RGBA").save(buffer, "WEBP", lossless=True, quality=100, method=6, exact=True)
+    return buffer.getvalue()
+
+
+def write_sheet(image: Image.Image, output_path: Path, options: EncodeOptions) -> EncodeResult:
+    """
+    Encode `image` to `output_path` (PNG) and, with options.webp, to the
+    same path with a .webp suffix. A stale .webp from an earlier run is
+    removed when WebP output is off.
+    """
+    data, method, plain_bytes = encode_png(image, options.optimize)
+    output_path.write_bytes(data)
+
+    webp_path = output_path.with_suffix(".webp")
+    webp_bytes = None
+    if options.webp and webp_available():
+        webp = encode_webp(image)
+        webp_path.write_bytes(webp)
+        webp_bytes = len(webp)
+    else:
+        webp_path.unlink(missing_ok=True)
+
+    return EncodeResult(
+        formats=("png", "webp") if webp_bytes is not None else ("png",),
+        plain_bytes=plain_bytes,
+        png_bytes=len(data),
+        webp_bytes=webp_bytes,
+        method=method,
+    )
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def print_size_report(results: list[tuple[str, EncodeResult]]) -> None:
+    """Print before/after bytes per file and the totals."""
+    if not results:
+        return
+
+    print(f"\n📦 Encoded sizes ({len(results)} files):")
+    print(f"    {'file':<28} {'before':>9} {'png':>9} {'webp':>9}  method")
+    for name, result in results:
+        webp = f"{result.webp_bytes:>9,}" if result.webp_bytes is not None else f"{'-':>9}"
+        print(f"    {name:<28} {result.plain_bytes:>9,} {result.png_bytes:>9,} {webp}  {result.method}")
+
+    before = sum(result.plain_bytes for _, result in results)
+    png = sum(result.png_bytes for _, result in results)
+    print(f"    {'total':<28} {before:>9,} {png:>9,}", end="")
+    webps = [result.webp_bytes for _, result in results if result.webp_bytes is not None]
+    if webps:
+        print(f" {sum(webps):>9,}", end="")
+    print()
+    if before:
+        print(f"  ✓ PNG: {png / before:.0%} of the plain encoding ({before - png:,} bytes saved)")
+    if webps:
+        webp_before = sum(result.plain_bytes for _, result in results if result.webp_bytes is not None)
+        print(f"  ✓ WebP: {sum(webps) / webp_before:.0%} of the plain encoding for the {len(webps)} files with a .webp")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Hitbox Sidecars for the Poke-Survivor Asset Pipeline
+
+Computes per-frame collision data from a processed sprite sheet so the game
+never has to scan pixels at runtime (download_assets.py --hitboxes):
+
+- bounds: the tight box around each frame's non-transparent pixels
+- union: the box around every frame, for a physics body that does not
+  change size while the animation plays
+- masks (optional, --hitbox-mask BLOCK): a coarse occupancy grid per frame,
+  one bit per BLOCK×BLOCK pixel block that has any non-transparent pixel
+
+The data is written next to the sheet as {sheet}.hitbox.json:
+
+    {
+      "frameWidth": 32, "frameHeight": 48, "frameCount": 3, "directions": 8,
+      "union": [x, y, w, h],
+      "bounds": [x, y, w, h, x, y, w, h, ...],  # 4 ints per frame
+      "maskBlock": 4, "maskColumns": 8, "maskRows": 12,
+      "masks": "<base64>"                        # ceil(columns*rows/8) bytes per frame
+    }
+
+Frames follow Phaser's spritesheet numbering (direction row * frameCount +
+column). Empty frames get bounds (0, 0, 0, 0). Mask bits are row-major,
+most significant bit first. All coordinates are full-size frame pixels.
+"""
+
+import base64
+import json
+import math
+from pathlib import Path
+from typing import NamedTuple
+
+from PIL import Image
+
+import sprite_arrays
+
+# =============================================================================
+# Data Structures
+# =============================================================================
+
+class HitboxOptions(NamedTuple):
+    """Which collision data is written (--hitboxes / --hitbox-mask)."""
+    enabled: bool = False
+    mask_block: int = 0  # mask block size in pixels; 0 = bounds only
+
+    @property
+    def name(self) -> str:
+        """Short label stored in the build lockfile, e.g. "bounds+mask4"."""
+        if not self.enabled:
+            return ""
+        return "bounds" + (f"+mask{self.mask_block}" if self.mask_block else "")
+
+    @classmethod
+    def from_name(cls, name: str) -> "HitboxOptions":
+        """Inverse of .name ("" = disabled)."""
+        return cls(enabled=bool(name), mask_block=int(name.partition("+mask")[2] or 0))
+
+
+def hitbox_path(sheet_path: Path) -> Path:
+    """Sidecar path of a sheet: 25-walk.png -> 25-walk.hitbox.json."""
+    return sheet_path.with_suffix(".hitbox.json")
+
+
+# =============================================================================
+# Computation
+# =============================================================================
+
+def _frame_cells(sheet: Image.Image, frame_width: int, frame_height: int, frame_count: int, directions: int):
+    """Yield each frame's alpha channel in spritesheet order."""
+    alpha = sheet.getchannel("A")
+    for row in range(directions):
+        for col in range(frame_count):
+            left, top = col * frame_width, row * frame_height
+            yield alpha.crop((left, top, left + frame_width, top + frame_height))
+
+
+def _pack_bits(bits: list[bool]) -> bytes:
+    packed = bytearray(math.ceil(len(bits) / 8))
+    for index, bit in enumerate(bits):
+        if bit:
+            packed[index // 8] |= 0x80 >> (index % 8)
+    return bytes(packed)
+
+
+def _mask_pil(alpha: Image.Image, block: int, columns: int, rows: int) -> bytes:
+    """Block occupancy of one frame: pad to whole blocks, then box-reduce."""
+    opaque = alpha.point(lambda a: 255 if a else 0).crop((0, 0, columns * block, rows * block))
+    reduced = opaque.reduce(block)
+    return _pack_bits([value > 0 for value in reduced.getdata()])
+
+
+def compute_hitboxes(
+    sheet: Image.Image,
+    frame_width: int,
+    frame_height: int,
+    frame_count: int,
+    directions: int,
+    options: HitboxOptions,
+    engine: str = "pil",
+) -> dict:
+    """
+    Collision data for every frame of a sheet (the sidecar's JSON object).
+
+    With engine="numpy" the sheet is viewed as a grid of cells and all bounds
+    and masks are computed in a few array operations.
+    """
+    block = options.mask_block
+    mask_columns = math.ceil(frame_width / block) if block else 0
+    mask_rows = math.ceil(frame_height / block) if block else 0
+
+    if engine == "numpy":
+        grid = sprite_arrays.crop_array(
+            sprite_arrays.image_to_array(sheet), frame_count * frame_width, directions * frame_height
+        )
+        cells = sprite_arrays.cell_grid(grid, frame_width, frame_height).reshape(
+            directions * frame_count, frame_height, frame_width, 4
+        )
+        boxes = [tuple(box) for box in sprite_arrays.alpha_bounds(cells).tolist()]
+        masks = sprite_arrays.block_masks(cells, block).tobytes() if block else b""
+    else:
+        boxes, packed = [], []
+        for alpha in _frame_cells(sheet, frame_width, frame_height, frame_count, directions):
+            boxes.append(alpha.getbbox() or (0, 0, 0, 0))
+            if block:
+                packed.append(_mask_pil(alpha, block, mask_columns, mask_rows))
+        masks = b"".join(packed)
+
+    bounds: list[int] = []
+    for left, top, right, bottom in boxes:
+        bounds += [left, top, right - left, bottom - top]
+
+    used = [box for box in boxes if box[2] > box[0]]
+    union = (0, 0, 0, 0)
+    if used:
+        left, top = min(box[0] for box in used), min(box[1] for box in used)
+        right, bottom = max(box[2] for box in used), max(box[3] for box in used)
+        union = (left, top, right - left, bottom - top)
+
+    data = {
+        "frameWidth": frame_width,
+        "frameHeight": frame_height,
+        "frameCount": frame_count,
+        "directions": directions,
+        "union": list(union),
+        "bounds": bounds,
+    }
+    if block:
+        data.update({
+            "maskBlock": block,
+            "maskColumns": mask_columns,
+            "maskRows": mask_rows,
+            "masks": base64.b64encode(masks).decode("ascii"),
+        })
+    return data
+
+
+def write_hitboxes(path: Path, data: dict) -> None:
+    path.write_text(json.dumps(data, separators=(",", ":")))
@@ -0,0 +1,273 @@
+"""
+Packed Sprite Mirror for the Poke-Survivor Asset Pipeline
+
+An offline copy of SpriteServer's sprites.zip files, so a build needs no
+network (`python download_assets.py mirror` fills it, `--mirror` reads it).
+The mirror is a directory with two files:
+
+- sprites.pack: a header, then one record per zip appended back to back:
+  a fixed-size record header (tag, SHA-256, size, key length), the key
+  (the padded Pokémon ID) and the zip bytes
+- index.json: key -> offset/size/SHA-256 of each zip plus the HTTP
+  validators it was fetched with
+
+Records are only ever appended, and the index is rewritten now and then
+rather than after every zip. When a mirror is opened, records past the
+indexed end of the pack are recovered by scanning them, and a record cut
+short by an interrupted prefetch is truncated away. A prefetch can
+therefore be stopped at any point and resumed.
+
+Reads never copy the pack: each zip is opened as a read-only file object
+over a memory-mapped window of the pack, so zipfile only touches the pages
+of the members it actually reads.
+"""
+
+import hashlib
+import io
+import json
+import mmap
+import struct
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+from sprite_cache import HASH_CHUNK_SIZE, sha256_file, write_atomic
+
+# Bump if the pack or index layout changes; older mirrors must be rebuilt
+MIRROR_VERSION = 1
+
+PACK_MAGIC = b"PSMIRROR"
+PACK_HEADER = struct.Struct("<8sI")  # magic, version
+
+# tag, raw SHA-256 of the zip, zip size, key length; followed by the key and the zip
+RECORD_TAG = b"SZIP"
+RECORD_HEADER = struct.Struct("<4s32sQH")
+
+# Appended records between index rewrites (the rest are recovered by scanning)
+INDEX_FLUSH_INTERVAL = 32
+
+
+# =============================================================================
+# Data Structures
+# =============================================================================
+
+class MirrorEntry(NamedTuple):
+    """Index record for one mirrored zip"""
+    key: str
+    offset: int  # of the zip bytes in the pack
+    size: int
+    sha256: str
+    etag: str | None = None
+    last_modified: str | None = None
+    url: str | None = None
+
+
+class MirrorMember(NamedTuple):
+    """Where one zip lives in a pack; small and picklable, for worker processes"""
+    pack_path: Path
+    offset: int
+    size: int
+
+
+# =============================================================================
+# Reading
+# =============================================================================
+
+class MemberReader(io.RawIOBase):
+    """Read-only, seekable file object over one zip in a memory-mapped pack."""
+
+    def __init__(self, member: MirrorMember):
+        with open(member.pack_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)[member.offset:member.offset + member.size]
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._position:self._position + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def close(self) -> None:
+        if not self.closed:
+            # The view must go before the map can be closed
+            self._view.release()
+            self._map.close()
+        super().close()
+
+
+def open_member(member: MirrorMember) -> MemberReader:
+    """Open a mirrored zip for reading (e.g. with zipfile.ZipFile)."""
+    return MemberReader(member)
+
+
+# =============================================================================
+# Mirror
+# =============================================================================
+
+class SpriteMirror:
+    """Append-only pack of sprites.zip files with a JSON index."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.pack_path = root / "sprites.pack"
+        self.index_path = root / "index.json"
+        # Prefetch threads share one mirror instance
+        self._lock = threading.Lock()
+        self._entries: dict[str, MirrorEntry] = {}
+        self._unsaved = 0
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+        self._recover()
+
+    # -- Index persistence -----------------------------------------------------
+
+    def _load_index(self) -> None:
+        if not self.index_path.exists():
+            return
+        try:
+            data = json.loads(self.index_path.read_text())
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"  ⚠️  Mirror index unreadable, rebuilding it from the pack: {e}")
+            return
+        if data.get("version") != MIRROR_VERSION:
+            return
+        for key, record in data.get("entries", {}).items():
+            self._entries[key] = MirrorEntry(key=key, **record)
+
+    def _save_index(self) -> None:
+        entries = {
+            key: {field: value for field, value in entry._asdict().items() if field != "key"}
+            for key, entry in sorted(self._entries.items())
+        }
+        payload = {"version": MIRROR_VERSION, "entries": entries}
+        write_atomic(self.index_path, json.dumps(payload, indent=2).encode())
+        self._unsaved = 0
+
+    def _recover(self) -> None:
+        """Index records appended after the last index write; cut off a partial last record."""
+        if not self.pack_path.exists() or self.pack_path.stat().st_size < PACK_HEADER.size:
+            self._entries.clear()
+            with open(self.pack_path, "wb") as f:
+                f.write(PACK_HEADER.pack(PACK_MAGIC, MIRROR_VERSION))
+            self._save_index()
+            return
+
+        with open(self.pack_path, "r+b") as f:
+            magic, version = PACK_HEADER.unpack(f.read(PACK_HEADER.size))
+            if magic != PACK_MAGIC or version != MIRROR_VERSION:
+                raise ValueError(f"{self.pack_path} is not a version {MIRROR_VERSION} sprite mirror")
+
+            # An index saved before the pack was cut short may point past its end
+            pack_size = f.seek(0, io.SEEK_END)
+            lost = [key for key, entry in self._entries.items() if entry.offset + entry.size > pack_size]
+            for key in lost:
+                del self._entries[key]
+
+            end = max((entry.offset + entry.size for entry in self._entries.values()), default=PACK_HEADER.size)
+            recovered = 0
+            f.seek(end)
+            while header := f.read(RECORD_HEADER.size):
+                if len(header) < RECORD_HEADER.size:
+                    break
+                tag, digest, size, key_length = RECORD_HEADER.unpack(header)
+                key = f.read(key_length).decode("utf-8", errors="replace")
+                offset = f.tell()
+                data = f.read(size)
+                if tag != RECORD_TAG or len(data) < size or hashlib.sha256(data).digest() != digest:
+                    break
+                self._entries[key] = MirrorEntry(key=key, offset=offset, size=size, sha256=digest.hex())
+                end = offset + size
+                recovered += 1
+
+            if pack_size > end:
+                print(f"  ⚠️  Dropping an incomplete record at the end of {self.pack_path.name}")
+                f.truncate(end)
+            if recovered:
+                print(f"  ✓ Recovered {recovered} mirrored zip(s) written after the last index save")
+            if recovered or lost:
+                self._save_index()
+
+    # -- Public API ------------------------------------------------------------
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get_entry(self, key: str) -> MirrorEntry | None:
+        with self._lock:
+            return self._entries.get(key)
+
+    def member(self, key: str) -> MirrorMember | None:
+        """Location of a key's zip in the pack, or None if it is not mirrored."""
+        entry = self.get_entry(key)
+        return MirrorMember(self.pack_path, entry.offset, entry.size) if entry else None
+
+    def add_file(
+        self,
+        key: str,
+        source: Path,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        url: str | None = None,
+    ) -> MirrorEntry:
+        """Append a zip to the pack under `key` (a later copy of a key replaces the earlier one)."""
+        sha256 = sha256_file(source)
+        size = source.stat().st_size
+        encoded_key = key.encode("utf-8")
+        with self._lock, open(self.pack_path, "ab") as pack, open(source, "rb") as f:
+            pack.write(RECORD_HEADER.pack(RECORD_TAG, bytes.fromhex(sha256), size, len(encoded_key)))
+            pack.write(encoded_key)
+            offset = pack.tell()
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                pack.write(chunk)
+            entry = MirrorEntry(key, offset, size, sha256, etag, last_modified, url)
+            self._entries[key] = entry
+            self._unsaved += 1
+            if self._unsaved >= INDEX_FLUSH_INTERVAL:
+                self._save_index()
+            return entry
+
+    def flush(self) -> None:
+        """Write the index if records were added since it was last written."""
+        with self._lock:
+            if self._unsaved:
+                self._save_index()
+
+    def verify(self) -> list[str]:
+        """Re-hash every mirrored zip. Returns the keys whose bytes do not match the index."""
+        bad: list[str] = []
+        with self._lock:
+            entries = sorted(self._entries.values())
+        for entry in entries:
+            with open_member(MirrorMember(self.pack_path, entry.offset, entry.size)) as reader:
+                digest = hashlib.sha256()
+                while chunk := reader.read(HASH_CHUNK_SIZE):
+                    digest.update(chunk)
+                complete = reader.tell() == entry.size
+            if not complete or digest.hexdigest() != entry.sha256:
+                bad.append(entry.key)
+        return bad
+
+    def entries(self) -> list[MirrorEntry]:
+        """All index records, by key."""
+        with self._lock:
+            return sorted(self._entries.values())
+
+    def pack_size(self) -> int:
+        return self.pack_path.stat().st_size
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Palette Extraction for the Poke-Survivor Asset Pipeline
+
+PMD sprites use a few dozen colors, so a recolor (shiny, elite, ...) does not
+need its own RGBA sheet: the same pixels with a different palette will do.
+For a processed sheet this module writes (download_assets.py --palettes):
+
+- {sheet}.index.png: 8-bit grayscale, each pixel's palette index
+  (index 0 is always fully transparent)
+- {sheet}.palette.png: the palette table, one color per column; row 0 is
+  the sheet's own palette, row N the Nth recolor in PALETTE_VARIANTS order
+
+The game recolors a sheet by looking colors up in the table.
+"""
+
+import colorsys
+from pathlib import Path
+from typing import Callable
+
+from PIL import Image
+
+RGB = tuple[int, int, int]
+RGBA = tuple[int, int, int, int]
+
+# Indexed pixels are 8-bit and index 0 is reserved for transparency
+MAX_PALETTE_COLORS = 255
+
+# =============================================================================
+# Recolors
+# =============================================================================
+
+def hue_shift(degrees: float) -> Callable[[RGB], RGB]:
+    """Rotate the hue, keeping lightness and saturation (shiny-style swap)."""
+    def recolor(rgb: RGB) -> RGB:
+        hue, lightness, saturation = colorsys.rgb_to_hls(*(channel / 255 for channel in rgb))
+        shifted = colorsys.hls_to_rgb((hue + degrees / 360) % 1.0, lightness, saturation)
+        return tuple(round(channel * 255) for channel in shifted)
+    return recolor
+
+
+def tint(color: RGB, amount: float) -> Callable[[RGB], RGB]:
+    """Blend every color `amount` of the way towards `color`."""
+    def recolor(rgb: RGB) -> RGB:
+        return tuple(round(channel + (target - channel) * amount) for channel, target in zip(rgb, color))
+    return recolor
+
+
+# Alternate palettes written to rows 1.. of every palette table
+PALETTE_VARIANTS: dict[str, Callable[[RGB], RGB]] = {
+    "shiny": hue_shift(150),
+    "elite": tint((255, 72, 48), 0.4),
+    "shadow": tint((72, 32, 112), 0.55),
+}
+
+
+# =============================================================================
+# Palette Extraction
+# =============================================================================
+
+def extract_palette(image: Image.Image) -> tuple[list[RGBA], Image.Image] | None:
+    """
+    Split a sheet into (palette, index image).
+
+    Every fully transparent pixel maps to index 0; the other distinct RGBA
+    values follow in sorted order so the output is deterministic. Returns
+    None when the sheet has more than MAX_PALETTE_COLORS visible colors.
+    """
+    rgba = image.convert("RGBA")
+    colors = rgba.getcolors(rgba.width * rgba.height) or []
+    visible = sorted({color for _, color in colors if color[3] > 0})
+    if len(visible) > MAX_PALETTE_COLORS:
+        return None
+
+    palette = [(0, 0, 0, 0), *visible]
+    index = {color: i for i, color in enumerate(palette)}
+    indexed = Image.new("L", rgba.size)
+    indexed.putdata([index[pixel] if pixel[3] > 0 else 0 for pixel in rgba.getdata()])
+    return palette, indexed
+
+
+def palette_table(palette: list[RGBA], variants: list[str]) -> Image.Image:
+    """len(palette) × (1 + len(variants)) table: the base palette, then each recolor."""
+    table = Image.new("RGBA", (len(palette), 1 + len(variants)))
+    rows = [palette] + [
+        [(*PALETTE_VARIANTS[name](color[:3]), color[3]) if color[3] else color for color in palette]
+        for name in variants
+    ]
+    table.putdata([color for row in rows for color in row])
+    return table
+
+
+def palette_paths(sheet_path: Path) -> tuple[Path, Path]:
+    """(index image, palette table) paths of a sheet: 25-walk.index.png, 25-walk.palette.png."""
+    return sheet_path.with_suffix(".index.png"), sheet_path.with_suffix(".palette.png")
+
+
+def write_palette(sheet: Image.Image, sheet_path: Path, variants: list[str]) -> int | None:
+    """
+    Write the index image and palette table next to `sheet_path`.
+
+    Returns the palette size, or None (and removes stale files) when the
+    sheet has too many colors to index.
+    """
+    index_path, table_path = palette_paths(sheet_path)
+    extracted = extract_palette(sheet)
+    if extracted is None:
+        index_path.unlink(missing_ok=True)
+        table_path.unlink(missing_ok=True)
+        return None
+
+    palette, indexed = extracted
+    indexed.save(index_path, "PNG", optimize=True)
+    palette_table(palette, variants).save(table_path, "PNG")
+    return len(palette)
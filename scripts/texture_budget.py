@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Texture Memory Budget for the Poke-Survivor Asset Pipeline
+
+Works out how much GPU memory a manifest.json implies: every texture the
+Preloader loads for it is decoded to RGBA, so it costs width × height × 4
+bytes no matter how small the PNG/WebP file is. Fully transparent pixels
+are reported separately as wasted area.
+
+Used by `download_assets.py budget`, which exits nonzero when a budget is
+exceeded so CI can catch a character that adds tens of MB of VRAM.
+"""
+
+import json
+from pathlib import Path
+from typing import NamedTuple
+
+from PIL import Image
+
+from sprite_cache import format_size
+
+# =============================================================================
+# Data Structures
+# =============================================================================
+
+class TextureUsage(NamedTuple):
+    """Decoded size of one texture"""
+    path: str  # relative to the public dir, as in the manifest
+    width: int
+    height: int
+    transparent: int  # fully transparent pixels
+
+    @property
+    def bytes(self) -> int:
+        return self.width * self.height * 4
+
+    @property
+    def wasted_bytes(self) -> int:
+        return self.transparent * 4
+
+
+class BudgetReport(NamedTuple):
+    """Every texture a manifest loads, grouped the way the Preloader loads them"""
+    characters: dict[str, dict[str, TextureUsage]]  # sprite name -> {texture label: usage}
+    atlas_pages: list[TextureUsage]  # shared by every atlas-packed animation
+    missing: list[str]  # referenced files that could not be read
+
+    def character_bytes(self, name: str) -> int:
+        return sum(usage.bytes for usage in self.characters[name].values())
+
+    @property
+    def textures(self) -> list[TextureUsage]:
+        return [usage for textures in self.characters.values() for usage in textures.values()] + self.atlas_pages
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(usage.bytes for usage in self.textures)
+
+    @property
+    def wasted_bytes(self) -> int:
+        return sum(usage.wasted_bytes for usage in self.textures)
+
+
+# =============================================================================
+# Measuring
+# =============================================================================
+
+def measure_texture(public_dir: Path, path: str) -> TextureUsage | None:
+    """Decoded dimensions and transparent pixel count of an image, or None if unreadable."""
+    try:
+        with Image.open(public_dir / path) as image:
+            alpha = image.convert("RGBA").getchannel("A")
+            return TextureUsage(path, image.width, image.height, alpha.histogram()[0])
+    except OSError:
+        return None
+
+
+def select_sheet(anim: dict, scale: float) -> dict:
+    """
+    The sheet the Preloader loads at texture tier `scale`: the smallest
+    variant whose scale is still at least `scale`, else the full-size sheet.
+    """
+    best_scale, sheet = 1.0, anim
+    for key, variant in anim.get("variants", {}).items():
+        if scale <= float(key) < best_scale:
+            best_scale, sheet = float(key), variant
+    return sheet
+
+
+def measure_manifest(manifest: list[dict], public_dir: Path, scale: float = 1.0) -> BudgetReport:
+    """Measure every spritesheet, palette table and atlas page a manifest loads."""
+    characters: dict[str, dict[str, TextureUsage]] = {}
+    atlas_paths: list[str] = []
+    missing: list[str] = []
+
+    def measure(path: str) -> TextureUsage | None:
+        usage = measure_texture(public_dir, path)
+        if usage is None:
+            missing.append(path)
+        return usage
+
+    for entry in manifest:
+        textures = characters.setdefault(entry["name"], {})
+        for anim in entry["animations"]:
+            if "atlas" in anim:
+                if anim["atlas"] not in atlas_paths:
+                    atlas_paths.append(anim["atlas"])
+            elif usage := measure(select_sheet(anim, scale)["path"]):
+                textures[anim["key"]] = usage
+            if "palette" in anim and (usage := measure(anim["palette"]["table"])):
+                textures[f"{anim['key']} palette"] = usage
+
+    atlas_pages: list[TextureUsage] = []
+    for atlas_path in atlas_paths:
+        try:
+            atlas = json.loads((public_dir / atlas_path).read_text())
+        except (OSError, json.JSONDecodeError):
+            missing.append(atlas_path)
+            continue
+        atlas_dir = Path(atlas_path).parent
+        for page in atlas.get("textures", []):
+            if usage := measure((atlas_dir / page["image"]).as_posix()):
+                atlas_pages.append(usage)
+
+    return BudgetReport(characters, atlas_pages, missing)
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def _wasted(usage_bytes: int, wasted_bytes: int) -> str:
+    share = wasted_bytes / usage_bytes if usage_bytes else 0
+    return f"{format_size(wasted_bytes):>10} ({share:>4.0%})"
+
+
+def print_budget_report(report: BudgetReport, top: int | None = None) -> None:
+    """Per-character and per-texture decoded memory, largest first, then the totals."""
+    names = sorted(report.characters, key=report.character_bytes, reverse=True)
+    shown = names if top is None else names[:top]
+
+    print(f"    {'texture':<34} {'size':>11} {'memory':>10} {'transparent':>17}")
+    for name in shown:
+        textures = report.characters[name]
+        wasted = sum(usage.wasted_bytes for usage in textures.values())
+        print(f"  {name:<36} {'':>11} {format_size(report.character_bytes(name)):>10} "
+              f"{_wasted(report.character_bytes(name), wasted)}")
+        for label, usage in sorted(textures.items(), key=lambda item: item[1].bytes, reverse=True):
+            print(f"    {label:<34} {f'{usage.width}×{usage.height}':>11} {format_size(usage.bytes):>10} "
+                  f"{_wasted(usage.bytes, usage.wasted_bytes)}")
+    if len(shown) < len(names):
+        print(f"  ... {len(names) - len(shown)} more characters")
+
+    for usage in report.atlas_pages:
+        print(f"  {usage.path:<36} {f'{usage.width}×{usage.height}':>11} {format_size(usage.bytes):>10} "
+              f"{_wasted(usage.bytes, usage.wasted_bytes)}")
+
+    print(f"  {'total':<36} {f'{len(report.textures)} tex':>11} {format_size(report.total_bytes):>10} "
+          f"{_wasted(report.total_bytes, report.wasted_bytes)}")
+
+
+def report_json(report: BudgetReport) -> dict:
+    """The report as plain data (for --json)."""
+    def usage_json(usage: TextureUsage) -> dict:
+        return {**usage._asdict(), "bytes": usage.bytes, "wasted_bytes": usage.wasted_bytes}
+
+    return {
+        "characters": {
+            name: {
+                "bytes": report.character_bytes(name),
+                "textures": {label: usage_json(usage) for label, usage in textures.items()},
+            }
+            for name, textures in report.characters.items()
+        },
+        "atlas_pages": [usage_json(usage) for usage in report.atlas_pages],
+        "missing": report.missing,
+        "total_bytes": report.total_bytes,
+        "wasted_bytes": report.wasted_bytes,
+    }
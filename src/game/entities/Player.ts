@@ -2,6 +2,7 @@ import type { Item } from '@/game/entities/items/Item';
 import { FloatingHpBar } from '@/game/ui/FloatingHpBar';
 import { PlayerInventory } from './components/PlayerInventory';
 import { getCharacter } from '@/game/entities/characters/registry';
+import { getTextureScale, playDirectional } from '@/game/scenes/Preloader';
 import type { CharacterConfig } from '@/game/entities/characters/types';
 import { ExperienceManager } from '@/game/systems/ExperienceManager';
 
@@ -92,8 +93,10 @@ export class Player extends Phaser.Physics.Arcade.Sprite {
     this.setCollideWorldBounds(true);
     this.setDepth(10);
     // Make hitbox smaller than visual for more precise movement and better "depth" feel
-    this.setBodySize(16, 16);
-    this.setOffset(8, 16);
+    // (sizes are in frame pixels, so they shrink with a downscaled texture tier)
+    const textureScale = getTextureScale(scene, `${this.characterConfig.spriteKey}-idle`);
+    this.setBodySize(16 * textureScale, 16 * textureScale);
+    this.setOffset(8 * textureScale, 16 * textureScale);
 
     // Initialize collection zone (Magnet)
     // We use a Zone so it can have its own physics body separate from the player's hitbox
@@ -340,7 +343,7 @@ export class Player extends Phaser.Physics.Arcade.Sprite {
       
       // Update Visuals
       this.setTexture(newConfig.spriteKey); 
-      this.play(`${newConfig.spriteKey}-idle-down`);
+      playDirectional(this, `${newConfig.spriteKey}-idle-down`);
       
       // Update Stats
       this.maxHP = newConfig.stats.maxHP;
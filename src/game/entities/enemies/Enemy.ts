@@ -1,5 +1,7 @@
 import Phaser from 'phaser';
 import { type EnemyStats, type EnemyType, EnemyTier } from '@/game/entities/enemies/EnemyConfig';
+import { getBodyBounds, getTextureScale, playDirectional } from '@/game/scenes/Preloader';
+import { PaletteSwapper } from '@/game/utils/PaletteSwapper';
 import { DexManager } from '@/systems/DexManager';
 import { EnemyMovement } from './components/EnemyMovement';
 import { EnemyVisuals } from './components/EnemyVisuals';
@@ -43,6 +45,9 @@ export class Enemy extends Phaser.Physics.Arcade.Sprite {
   /** Timestamp of last attack on player (per-enemy cooldown) */
   public lastAttackTime: number = 0;
 
+  /** Animation key prefix (e.g. 'rattata-walk'); directional anims are `${animKey}-${direction}` */
+  public animKey: string = '';
+
   // Components
   public movement: EnemyMovement;
   public visuals: EnemyVisuals;
@@ -62,9 +67,14 @@ export class Enemy extends Phaser.Physics.Arcade.Sprite {
     this.setDrag(500); // Add drag so knockback decays
     this.setDepth(5); // Ensure enemies render above background but below player (10)
     
-    // Scale up enemies for better presence
-    this.setScale(1.5);
+    // Scale up enemies for better presence (compensating for downscaled texture tiers)
+    this.setScale(1.5 / getTextureScale(scene, texture));
+
+    this.fitDefaultBody();
+  }
 
+  /** Size the body from the current frame (atlas-packed sprites only have one once an animation plays) */
+  private fitDefaultBody(): void {
     // Reduce hitbox size to 70% of visual to be more forgiving/fair
     const width = this.width;
     const height = this.height;
@@ -87,13 +97,30 @@ export class Enemy extends Phaser.Physics.Arcade.Sprite {
     this.isDying = false;
     this.lastAttackTime = 0; // Reset attack timer for recycled enemies
 
-    // Check if main texture exists, otherwise use fallback
-    if (this.scene.textures.exists(stats.textureKey)) {
-      this.setTexture(stats.textureKey);
+    // Recolored variants reuse the base sheet with another palette (falls back to the base colors)
+    const textureKey = (stats.paletteVariant
+      && PaletteSwapper.getVariant(this.scene, stats.textureKey, stats.paletteVariant)) || stats.textureKey;
+    this.animKey = textureKey;
+
+    // Check if main texture exists, otherwise use fallback.
+    // Atlas-packed sprites have no per-animation texture; their animations carry the atlas frames.
+    if (this.scene.textures.exists(textureKey)) {
+      this.setTexture(textureKey);
+    } else if (this.scene.anims.exists(`${textureKey}-down`)) {
+      playDirectional(this, `${textureKey}-down`);
     } else {
       this.setTexture('fallback-' + stats.textureKey);
     }
 
+    // Fit the body to the sprite's real pixel bounds when the pipeline wrote them
+    const bounds = getBodyBounds(this.scene, stats.textureKey);
+    if (bounds) {
+      this.setBodySize(bounds.width, bounds.height, false);
+      this.setOffset(bounds.x, bounds.y);
+    } else {
+      this.fitDefaultBody();
+    }
+
     // Reset visual state and physics
     this.setActive(true);
     this.setVisible(true);
@@ -47,6 +47,8 @@ export interface EnemyStats {
   placeholderColor: number;
   /** Loot tier for this enemy */
   tier: EnemyTier;
+  /** Palette recolor of the sprite sheet, e.g. 'shiny' (needs `download_assets.py --palettes`) */
+  paletteVariant?: string;
 }
 
 /**
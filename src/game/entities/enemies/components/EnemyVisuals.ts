@@ -1,6 +1,7 @@
 import Phaser from 'phaser';
 import { type Enemy } from '../Enemy';
-import { getDirectionFromVelocity, type DirectionName } from '@/game/scenes/Preloader';
+import { getDirectionFromVelocity, playDirectional, type DirectionName } from '@/game/scenes/Preloader';
+import { isFlippedAnimation } from '@/game/utils/SpriteRegistry';
 
 export class EnemyVisuals {
   private enemy: Enemy;
@@ -32,17 +33,18 @@ export class EnemyVisuals {
     if (isMoving) {
       // Try 8-way animation
       const newDirection = getDirectionFromVelocity(velocity.x, velocity.y);
-      const animKey = `${this.enemy.texture.key}-${newDirection}`;
+      const animKey = `${this.enemy.animKey}-${newDirection}`;
 
       if (this.scene.anims.exists(animKey)) {
         // Only update if direction changed or not playing
         if (newDirection !== this.currentDirection || !this.enemy.anims.isPlaying) {
           this.currentDirection = newDirection;
-          this.enemy.play(animKey, true);
+          playDirectional(this.enemy, animKey, true);
           // Also update data for potential debug usage
           this.enemy.setData('currentDirection', newDirection);
         }
-        this.enemy.setFlipX(false); // Ensure no legacy flip
+        // Mirrored direction rows draw flipped; no legacy flip otherwise
+        this.enemy.setFlipX(isFlippedAnimation(this.scene, animKey));
         return;
       }
     }
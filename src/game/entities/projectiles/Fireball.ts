@@ -1,4 +1,4 @@
-
+import { getTextureScale } from '@/game/scenes/Preloader';
 
 export class Fireball extends Phaser.Physics.Arcade.Sprite {
   private damageAmount = 10;
@@ -14,13 +14,14 @@ export class Fireball extends Phaser.Physics.Arcade.Sprite {
     scene.physics.add.existing(this);
 
     // Visuals
-    this.setScale(0.25); // Adjusted scale (~55px)
+    const textureScale = getTextureScale(scene, 'projectile-fireball-idle');
+    this.setScale(0.25 / textureScale); // Adjusted scale (~55px)
     this.setDepth(100);
     this.play('projectile-fireball-idle-down'); 
 
     // Physics
-    this.setBodySize(64, 64); 
-    this.setCircle(32); 
+    this.setBodySize(64 * textureScale, 64 * textureScale); 
+    this.setCircle(32 * textureScale); 
     
     // Origin is default 0.5
   }
@@ -63,11 +63,12 @@ export const seismicToss: UltimateConfig = {
     player.setAlpha(0.5);
     
     // Fly up animation (move player up and scale down)
+    const baseScale = player.scaleX; // 2 at full texture size, larger on downscaled tiers
     scene.tweens.add({
       targets: player,
       y: player.y - 100,
-      scaleX: 0.5,
-      scaleY: 0.5,
+      scaleX: baseScale / 4,
+      scaleY: baseScale / 4,
       duration: 500,
     });
     
@@ -91,8 +92,8 @@ export const seismicToss: UltimateConfig = {
       scene.tweens.add({
         targets: player,
         y: scene.scale.height / 2,
-        scaleX: 2,
-        scaleY: 2,
+        scaleX: baseScale,
+        scaleY: baseScale,
         duration: 300,
         onComplete: () => {
           // Screen nuke damage
@@ -100,7 +101,7 @@ export const seismicToss: UltimateConfig = {
           scene.events.emit('spawn-aoe-damage', player.x, player.y, 500, ctx.stats.baseDamage * 5);
           
           // Reset player
-          player.setScale(2); // Original sprite scale
+          player.setScale(baseScale); // Original sprite scale
           player.setAlpha(1);
           player.setData('invincible', false);
         },
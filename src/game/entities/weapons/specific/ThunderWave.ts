@@ -42,6 +42,11 @@ export class ThunderWaveNode extends Phaser.Physics.Arcade.Sprite {
         if (isSatellite) {
             // Satellite Node (Tip) - Blue Electric Spark
             this.setScale(1.0); // Reset scale (texture is 64x64)
+            // The baked spark sheet holds several seeded variants; pick one per node
+            const sparkFrames = this.texture.getFrameNames();
+            if (sparkFrames.length > 0) {
+                this.setFrame(Phaser.Utils.Array.GetRandom(sparkFrames));
+            }
             this.setTint(0x00FFFF); // Cyan tint on top
             this.setAlpha(0.9);
             
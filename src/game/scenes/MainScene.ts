@@ -1,6 +1,6 @@
 import Phaser from 'phaser';
 import type { GameCallbacks } from '@/game/config';
-import { getDirectionFromVelocity, type DirectionName } from '@/game/scenes/Preloader';
+import { getDirectionFromVelocity, getTextureScale, playDirectional, type DirectionName } from '@/game/scenes/Preloader';
 import { getCharacter } from '@/game/entities/characters/registry';
 import {
   type CharacterConfig,
@@ -178,8 +178,8 @@ export class MainScene extends Phaser.Scene {
     playerBody.setCollideWorldBounds(true);
 
     if (!this.session.usePlaceholderGraphics) {
-      this.player.play(`${this.characterConfig.spriteKey}-idle-down`);
-      this.player.setScale(2);
+      playDirectional(this.player, `${this.characterConfig.spriteKey}-idle-down`);
+      this.player.setScale(2 / getTextureScale(this, this.player.texture.key));
     }
   }
 
@@ -539,7 +539,7 @@ export class MainScene extends Phaser.Scene {
       }
     }
 
-    this.player.play(`${this.player.characterConfig.spriteKey}-${animState}-${this.session.currentDirection}`, true);
+    playDirectional(this.player, `${this.player.characterConfig.spriteKey}-${animState}-${this.session.currentDirection}`, true);
   }
 
   private updateEntities(_delta: number): void {
@@ -569,7 +569,7 @@ export class MainScene extends Phaser.Scene {
         const dir = getDirectionFromVelocity(vx, vy);
         if (dir !== enemy.getData('currentDirection')) {
           enemy.setData('currentDirection', dir);
-          enemy.play(`${spriteName}-walk-${dir}`);
+          playDirectional(enemy, `${spriteName}-walk-${dir}`);
         }
       }
     }
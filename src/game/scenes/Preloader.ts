@@ -1,5 +1,19 @@
 import Phaser from 'phaser';
 import { AutoTileGenerator } from '@/game/utils/AutoTileGenerator';
+import {
+  PALETTE_VARIANTS_KEY,
+  isFlippedAnimation,
+  markFlippedAnimation,
+  paletteTableKey,
+} from '@/game/utils/SpriteRegistry';
+
+/** A downscaled copy of an animation's sheet (written by `download_assets.py --scales`) */
+interface SpriteVariant {
+  path: string;
+  frameWidth: number;
+  frameHeight: number;
+  formats?: string[];
+}
 
 interface SpriteAnimation {
   key: string;
@@ -8,6 +22,47 @@ interface SpriteAnimation {
   frameHeight: number;
   frameCount: number;
   directions: number;
+  /** Multi-atlas JSON holding this animation's frames (written by `download_assets.py --atlas`) */
+  atlas?: string;
+  /** Encodings available next to `path`, e.g. ['png', 'webp'] (written by `--webp`); PNG only when absent */
+  formats?: string[];
+  /** Downscaled texture tiers keyed by scale, e.g. { "0.5": {...} }; ignored for atlas-packed animations */
+  variants?: Record<string, SpriteVariant>;
+  /** Per-frame display time in ms, from AnimData.xml */
+  durations?: number[];
+  /** Collision sidecar (written by `--hitboxes`), loaded into the JSON cache as `hitbox:{sprite}-{anim}` */
+  hitbox?: string;
+  /** Indexed sheet + palette table (written by `--palettes`); table row N recolors to variants[N - 1] */
+  palette?: { index: string; table: string; variants: string[] };
+  /** Sheet row of each direction when mirrored rows were dropped (written by `--flip-directions`) */
+  rows?: number[];
+  /** Directions drawn from another direction's row with flipX */
+  flipX?: number[];
+  /** Texture key of a baked texture (written by `--bake-textures`), loaded instead of `{sprite}-{anim}` and not animated */
+  texture?: string;
+}
+
+/** animations.json: Phaser animation definitions plus the keys to draw with flipX */
+type PipelineAnimations = Phaser.Types.Animations.JSONAnimations & { flipX?: string[] };
+
+/**
+ * Per-frame collision data from the asset pipeline, in full-size frame pixels.
+ * Boxes are [x, y, width, height]; `bounds` holds 4 numbers per frame in
+ * spritesheet order, for all `directions` even when mirrored rows were dropped
+ * from the sheet. Masks (optional) are base64, ceil(maskColumns * maskRows / 8)
+ * bytes per frame, one bit per maskBlock² pixel block, row-major, MSB first.
+ */
+export interface SpriteHitboxes {
+  frameWidth: number;
+  frameHeight: number;
+  frameCount: number;
+  directions: number;
+  union: [number, number, number, number];
+  bounds: number[];
+  maskBlock?: number;
+  maskColumns?: number;
+  maskRows?: number;
+  masks?: string;
 }
 
 interface SpriteManifestEntry {
@@ -16,6 +71,22 @@ interface SpriteManifestEntry {
   animations: SpriteAnimation[];
 }
 
+/** One group of manifest entries with its own animation definitions (written by `download_assets.py --shards`) */
+interface ManifestShard {
+  group: string;
+  /** Loaded before the first scene starts; the other shards load in the background */
+  preload: boolean;
+  path: string;
+  animations: string;
+  sprites: string[];
+}
+
+/** What manifest.json holds instead of the entry list when the manifest is sharded */
+interface ManifestIndex {
+  version: number;
+  shards: ManifestShard[];
+}
+
 // Direction name mapping (matches sprite sheet row order)
 // Standard PMD order: Down, DownRight, Right, UpRight, Up, UpLeft, Left, DownLeft
 const DIRECTION_NAMES = [
@@ -31,8 +102,13 @@ const DIRECTION_NAMES = [
 
 export type DirectionName = (typeof DIRECTION_NAMES)[number];
 
+/** Registry key of { texture key: scale } for sheets that were loaded from a downscaled variant */
+const TEXTURE_SCALES_KEY = 'spriteTextureScales';
+
 export class Preloader extends Phaser.Scene {
   private manifest: SpriteManifestEntry[] = [];
+  /** Multi-atlases already queued (shards can share one) */
+  private queuedAtlases = new Set<string>();
 
   constructor() {
     super({ key: 'Preloader' });
@@ -116,14 +192,17 @@ export class Preloader extends Phaser.Scene {
   }
 
   create(): void {
-    // Generate AutoTiles
-    AutoTileGenerator.generate(this, 'cave_raw', 'cave_auto');
-
     // Get manifest data
-    this.manifest = this.cache.json.get('manifest') as SpriteManifestEntry[];
+    const manifest = this.cache.json.get('manifest') as SpriteManifestEntry[] | ManifestIndex | undefined;
+    if (manifest && !Array.isArray(manifest)) {
+      this.loadShards(manifest.shards);
+      return;
+    }
+    this.manifest = manifest ?? [];
 
-    if (!this.manifest || this.manifest.length === 0) {
+    if (this.manifest.length === 0) {
       console.warn('No sprites in manifest, starting scene without sprites');
+      this.generateFallbackTextures();
       this.startAppropriateScene();
       return;
     }
@@ -132,14 +211,20 @@ export class Preloader extends Phaser.Scene {
     // Store manifest in registry for other scenes to access
     this.registry.set('spriteManifest', this.manifest);
 
-    // Generate fallback textures (programmatic assets)
-    this.generateFallbackTextures();
-
     // Start loading sprites
     this.loadSprites();
   }
 
+  /**
+   * Draw the programmatic textures the manifest did not provide. The asset
+   * pipeline bakes them (`download_assets.py --bake-textures`), so this only
+   * runs once the manifest's textures are loaded, for the ones still missing.
+   */
   private generateFallbackTextures(): void {
+    if (!this.textures.exists('cave_auto')) {
+      AutoTileGenerator.generate(this, 'cave_raw', 'cave_auto');
+    }
+
     if (!this.textures.exists('projectile')) {
       const graphics = this.make.graphics({ x: 0, y: 0 });
       graphics.fillStyle(0xffffff);
@@ -230,65 +315,207 @@ export class Preloader extends Phaser.Scene {
     }
   }
 
+  /** Sheet URL, preferring the smaller WebP when the browser can decode it */
+  private getSpritePath(sheet: { path: string; formats?: string[] }): string {
+    if (sheet.formats?.includes('webp') && this.sys.game.device.features.webp) {
+      return sheet.path.replace(/\.png$/, '.webp');
+    }
+    return sheet.path;
+  }
+
+  /**
+   * Texture tier for this device: full size on desktop, 0.5x on phones and
+   * tablets, 0.25x when the browser reports 2 GB of memory or less.
+   * `?textureScale=0.5` in the URL overrides the choice.
+   */
+  private getPreferredTextureScale(): number {
+    const override = Number(new URLSearchParams(window.location.search).get('textureScale'));
+    if (override > 0) return override;
+
+    const memory = (navigator as Navigator & { deviceMemory?: number }).deviceMemory;
+    if (memory !== undefined && memory <= 2) return 0.25;
+    return this.sys.game.device.os.desktop ? 1 : 0.5;
+  }
+
+  /** The smallest sheet of an animation that is still at least `preferred` scale (full size is scale 1) */
+  private selectSheet(anim: SpriteAnimation, preferred: number): { scale: number; sheet: SpriteVariant } {
+    let best: { scale: number; sheet: SpriteVariant } = { scale: 1, sheet: anim };
+    for (const [key, variant] of Object.entries(anim.variants ?? {})) {
+      const scale = Number(key);
+      if (scale >= preferred && scale < best.scale) {
+        best = { scale, sheet: variant };
+      }
+    }
+    return best;
+  }
+
   private loadSprites(): void {
+    // Prebuilt animation definitions for the manifest (written by download_assets.py and
+    // committed next to manifest.json, so a fresh checkout has them too). A sharded
+    // manifest has them per shard instead, so this is only loaded for a flat one.
+    this.load.json('animations', 'assets/animations.json');
+
     this.load.on('complete', () => {
-      this.createAnimations();
+      this.generateFallbackTextures();
+      const animations = this.cache.json.get('animations') as PipelineAnimations | undefined;
+      this.createAnimations(this.manifest, animations);
       this.startAppropriateScene();
     });
 
-    // Queue all spritesheets
-    // Queue all spritesheets
-    for (const sprite of this.manifest) {
+    this.queueSprites(this.manifest);
+
+    // Start loading
+    this.load.start();
+  }
+
+  /**
+   * Sharded manifest: start the game once the preload shards (starters, their
+   * projectiles and effects, first enemy wave) and their textures are in, then
+   * load the remaining shards one by one while it runs. The Preloader stays
+   * active until the last one is done. Each shard brings its own animation
+   * definitions, so the global animations.json is not loaded.
+   */
+  private loadShards(shards: ManifestShard[]): void {
+    // Without preload shards there is nothing to start on; wait for all of them
+    const boot = shards.some((shard) => shard.preload) ? shards.filter((shard) => shard.preload) : shards;
+    const background = shards.filter((shard) => !boot.includes(shard));
+
+    // Grows as shards arrive; other scenes read it from the registry
+    this.registry.set('spriteManifest', this.manifest);
+
+    const loadNext = (index: number): void => {
+      if (index >= background.length) {
+        this.scene.stop();
+        return;
+      }
+      this.loadShardGroup([background[index]], () => loadNext(index + 1));
+    };
+
+    this.loadShardGroup(boot, () => {
+      // Baked textures come with the preload shards
+      this.generateFallbackTextures();
+      if (background.length === 0) {
+        this.startAppropriateScene();
+        return;
+      }
+      this.startAppropriateScene(true);
+      loadNext(0);
+    });
+  }
+
+  /** Load shards' entries and animation definitions, then their textures, then create their animations */
+  private loadShardGroup(shards: ManifestShard[], onLoaded: () => void): void {
+    for (const shard of shards) {
+      this.load.json(`manifest:${shard.group}`, shard.path);
+      this.load.json(`animations:${shard.group}`, shard.animations);
+    }
+    this.load.once('complete', () => {
+      const entries = shards.flatMap(
+        (shard) => (this.cache.json.get(`manifest:${shard.group}`) as SpriteManifestEntry[] | undefined) ?? []
+      );
+      this.manifest.push(...entries);
+      this.queueSprites(entries);
+
+      this.load.once('complete', () => {
+        for (const shard of shards) {
+          const shardEntries = entries.filter((entry) => shard.sprites.includes(entry.name));
+          const animations = this.cache.json.get(`animations:${shard.group}`) as PipelineAnimations | undefined;
+          this.createAnimations(shardEntries, animations);
+        }
+        onLoaded();
+      });
+      this.load.start();
+    });
+    this.load.start();
+  }
+
+  /** Queue the textures of manifest entries; atlas-packed animations share one multi-atlas load */
+  private queueSprites(sprites: SpriteManifestEntry[]): void {
+    const preferredScale = this.getPreferredTextureScale();
+    const textureScales: Record<string, number> = this.registry.get(TEXTURE_SCALES_KEY) ?? {};
+    const paletteVariants: Record<string, string[]> = this.registry.get(PALETTE_VARIANTS_KEY) ?? {};
+    for (const sprite of sprites) {
       for (const anim of sprite.animations) {
-        this.load.spritesheet(`${sprite.name}-${anim.key}`, anim.path, {
-          frameWidth: anim.frameWidth,
-          frameHeight: anim.frameHeight,
+        const textureKey = anim.texture ?? `${sprite.name}-${anim.key}`;
+        if (anim.hitbox) {
+          this.load.json(`hitbox:${textureKey}`, anim.hitbox);
+        }
+        if (anim.atlas) {
+          if (!this.queuedAtlases.has(anim.atlas)) {
+            this.queuedAtlases.add(anim.atlas);
+            // Atlas page images are named relative to the atlas JSON
+            const atlasDir = anim.atlas.substring(0, anim.atlas.lastIndexOf('/') + 1);
+            this.load.multiatlas(anim.atlas, anim.atlas, atlasDir);
+          }
+          continue;
+        }
+        const { scale, sheet } = this.selectSheet(anim, preferredScale);
+        this.load.spritesheet(textureKey, this.getSpritePath(sheet), {
+          frameWidth: sheet.frameWidth,
+          frameHeight: sheet.frameHeight,
         });
+        if (scale !== 1) {
+          textureScales[textureKey] = scale;
+        }
+        // Palette tables are tiny; recolored textures are built on first use (see PaletteSwapper)
+        if (anim.palette) {
+          this.load.image(paletteTableKey(textureKey), anim.palette.table);
+          paletteVariants[textureKey] = anim.palette.variants;
+        }
       }
     }
-
-    // Start loading
-    this.load.start();
+    this.registry.set(TEXTURE_SCALES_KEY, textureScales);
+    this.registry.set(PALETTE_VARIANTS_KEY, paletteVariants);
   }
 
-  private createAnimations(): void {
-    // Define enemy names for faster animation
+  private createAnimations(sprites: SpriteManifestEntry[], animations: PipelineAnimations | undefined): void {
+    // Bulk-load the pipeline's definitions: every direction, with the real per-frame durations
+    if (animations?.anims?.length) {
+      this.anims.fromJSON(animations);
+      for (const key of animations.flipX ?? []) {
+        markFlippedAnimation(this, key);
+      }
+    }
+
+    // Build the rest here at a fixed frame rate: entries animations.json does not
+    // cover yet (e.g. added to manifest.json by hand or by generate_sprite.py)
+    // Define enemy names for faster animation (ENEMY_SPRITE_NAMES in download_assets.py matches)
     const enemyNames = ['rattata', 'geodude', 'zubat'];
 
-    for (const sprite of this.manifest) {
+    for (const sprite of sprites) {
       const isEnemy = enemyNames.includes(sprite.name);
       const frameRate = isEnemy ? 12 : 8;
 
       for (const anim of sprite.animations) {
-        const textureKey = `${sprite.name}-${anim.key}`;
+        // Baked textures are plain images
+        if (anim.texture) continue;
 
         // Create animation for each direction
         for (let dir = 0; dir < anim.directions; dir++) {
           const dirName = DIRECTION_NAMES[dir] || `dir${dir}`;
-          const startFrame = dir * anim.frameCount;
+          const startFrame = (anim.rows?.[dir] ?? dir) * anim.frameCount;
           const endFrame = startFrame + anim.frameCount - 1;
 
+          const key = `${sprite.name}-${anim.key}-${dirName}`;
+          if (this.anims.exists(key)) continue;
           this.anims.create({
-            key: `${sprite.name}-${anim.key}-${dirName}`,
-            frames: this.anims.generateFrameNumbers(textureKey, {
-              start: startFrame,
-              end: endFrame,
-            }),
+            key,
+            frames: this.getAnimationFrames(sprite.name, anim, startFrame, endFrame),
             frameRate: frameRate,
             repeat: -1,
           });
+          if (anim.flipX?.includes(dir)) {
+            markFlippedAnimation(this, key);
+          }
         }
       }
 
       // Default walk animation alias (if walk exists)
       const walkAnim = sprite.animations.find(a => a.key === 'walk');
-      if (walkAnim) {
+      if (walkAnim && !this.anims.exists(`${sprite.name}-walk`)) {
          this.anims.create({
           key: `${sprite.name}-walk`,
-          frames: this.anims.generateFrameNumbers(`${sprite.name}-walk`, {
-            start: 0,
-            end: walkAnim.frameCount - 1,
-          }),
+          frames: this.getAnimationFrames(sprite.name, walkAnim, 0, walkAnim.frameCount - 1),
           frameRate: frameRate,
           repeat: -1,
         });
@@ -296,16 +523,77 @@ export class Preloader extends Phaser.Scene {
     }
   }
 
-  private startAppropriateScene(): void {
+  /**
+   * Frames start..end (spritesheet numbering) of an animation, from its own
+   * spritesheet texture or, when atlas-packed, from named atlas frames.
+   */
+  private getAnimationFrames(
+    spriteName: string,
+    anim: SpriteAnimation,
+    start: number,
+    end: number
+  ): Phaser.Types.Animations.AnimationFrame[] {
+    const textureKey = `${spriteName}-${anim.key}`;
+    if (anim.atlas) {
+      return this.anims.generateFrameNames(anim.atlas, {
+        prefix: `${textureKey}/`,
+        start,
+        end,
+      });
+    }
+    return this.anims.generateFrameNumbers(textureKey, { start, end });
+  }
+
+  /** Start the first scene; with keepLoading the Preloader keeps running (and loading) alongside it */
+  private startAppropriateScene(keepLoading = false): void {
     const startInLevelEditor = this.registry.get('startInLevelEditor') as boolean;
-    if (startInLevelEditor) {
-      this.scene.start('LevelEditorScene');
+    const key = startInLevelEditor ? 'LevelEditorScene' : 'MainScene';
+    if (keepLoading) {
+      this.scene.launch(key);
     } else {
-      this.scene.start('MainScene');
+      this.scene.start(key);
     }
   }
 }
 
+/**
+ * Scale a sprite sheet texture was loaded at (1 unless a downscaled variant was
+ * picked). Divide display scales and multiply frame-space sizes (e.g. physics
+ * bodies) by it so sprites look and collide the same on every tier.
+ */
+export function getTextureScale(scene: Phaser.Scene, textureKey: string): number {
+  const scales = scene.registry.get(TEXTURE_SCALES_KEY) as Record<string, number> | undefined;
+  return scales?.[textureKey] ?? 1;
+}
+
+/**
+ * Box around every frame of an animation's sheet, in the loaded texture's
+ * pixels, for sizing a physics body. Undefined without a hitbox sidecar.
+ */
+export function getBodyBounds(
+  scene: Phaser.Scene,
+  textureKey: string
+): { x: number; y: number; width: number; height: number } | undefined {
+  const hitboxes = scene.cache.json.get(`hitbox:${textureKey}`) as SpriteHitboxes | undefined;
+  if (!hitboxes || hitboxes.union[2] === 0) return undefined;
+  const scale = getTextureScale(scene, textureKey);
+  const [x, y, width, height] = hitboxes.union;
+  return { x: x * scale, y: y * scale, width: width * scale, height: height * scale };
+}
+
+/**
+ * Play a direction animation, drawing it with flipX when the pipeline
+ * dropped its row as a mirror of the opposite direction (and unflipped otherwise).
+ */
+export function playDirectional(
+  sprite: Phaser.GameObjects.Sprite,
+  animKey: string,
+  ignoreIfPlaying = false
+): void {
+  sprite.play(animKey, ignoreIfPlaying);
+  sprite.setFlipX(isFlippedAnimation(sprite.scene, animKey));
+}
+
 // Helper to get direction from velocity
 export function getDirectionFromVelocity(vx: number, vy: number): DirectionName {
   if (vx === 0 && vy === 0) return 'down';
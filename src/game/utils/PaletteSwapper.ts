@@ -0,0 +1,106 @@
+import Phaser from 'phaser';
+import {
+    PALETTE_VARIANTS_KEY,
+    isFlippedAnimation,
+    markFlippedAnimation,
+    paletteTableKey,
+} from '@/game/utils/SpriteRegistry';
+
+/**
+ * Recolors spritesheets with the palette tables written by
+ * `download_assets.py --palettes`. Row 0 of a table holds the sheet's own
+ * colors and row N the Nth variant, so a recolor is a per-pixel column
+ * lookup: no extra sheet is downloaded for shiny/elite/shadow enemies, and a
+ * variant texture only exists once that variant is actually used.
+ */
+export class PaletteSwapper {
+    /**
+     * Texture key of `variant` of a spritesheet (`${textureKey}@${variant}`),
+     * creating the texture and its animations on first use. Returns undefined
+     * when the sheet has no palette table or no such variant.
+     */
+    static getVariant(scene: Phaser.Scene, textureKey: string, variant: string): string | undefined {
+        const variantKey = `${textureKey}@${variant}`;
+        if (scene.textures.exists(variantKey)) return variantKey;
+
+        const variants = (scene.registry.get(PALETTE_VARIANTS_KEY) as Record<string, string[]> | undefined)?.[textureKey];
+        const row = variants ? variants.indexOf(variant) + 1 : 0;
+        const tableKey = paletteTableKey(textureKey);
+        if (row === 0 || !scene.textures.exists(textureKey) || !scene.textures.exists(tableKey)) {
+            return undefined;
+        }
+
+        const table = this.readPixels(scene.textures.get(tableKey).getSourceImage() as HTMLImageElement);
+        const columns = new Map<number, number>();
+        for (let column = 0; column < table.width; column++) {
+            columns.set(this.packColor(table.data, column * 4), column);
+        }
+
+        const base = scene.textures.get(textureKey);
+        const canvas = this.createCanvas(base.getSourceImage() as HTMLImageElement);
+        const context = canvas.getContext('2d')!;
+        const pixels = context.getImageData(0, 0, canvas.width, canvas.height);
+        const data = pixels.data;
+        for (let i = 0; i < data.length; i += 4) {
+            if (data[i + 3] === 0) continue;
+            const column = columns.get(this.packColor(data, i));
+            if (column === undefined) continue;
+            const source = (row * table.width + column) * 4;
+            data[i] = table.data[source];
+            data[i + 1] = table.data[source + 1];
+            data[i + 2] = table.data[source + 2];
+            data[i + 3] = table.data[source + 3];
+        }
+        context.putImageData(pixels, 0, 0);
+
+        // Same frames as the base spritesheet
+        const texture = scene.textures.addCanvas(variantKey, canvas);
+        if (!texture) return undefined;
+        for (const name of base.getFrameNames()) {
+            const frame = base.get(name);
+            texture.add(name, 0, frame.cutX, frame.cutY, frame.cutWidth, frame.cutHeight);
+        }
+
+        this.cloneAnimations(scene, textureKey, variantKey);
+        return variantKey;
+    }
+
+    /** Copy every `${textureKey}-*` animation to `${variantKey}-*`, playing the variant's frames (and flips) */
+    private static cloneAnimations(scene: Phaser.Scene, textureKey: string, variantKey: string) {
+        const prefix = `${textureKey}-`;
+        for (const key of scene.anims.anims.keys()) {
+            if (!key.startsWith(prefix)) continue;
+            const animation = scene.anims.get(key);
+            const variantAnimKey = `${variantKey}-${key.substring(prefix.length)}`;
+            scene.anims.create({
+                key: variantAnimKey,
+                frames: animation.frames.map(frame => ({
+                    key: variantKey,
+                    frame: frame.textureFrame,
+                    duration: frame.duration,
+                })),
+                frameRate: animation.frameRate,
+                repeat: animation.repeat,
+            });
+            if (isFlippedAnimation(scene, key)) {
+                markFlippedAnimation(scene, variantAnimKey);
+            }
+        }
+    }
+
+    private static createCanvas(image: HTMLImageElement): HTMLCanvasElement {
+        const canvas = document.createElement('canvas');
+        canvas.width = image.width;
+        canvas.height = image.height;
+        canvas.getContext('2d')!.drawImage(image, 0, 0);
+        return canvas;
+    }
+
+    private static readPixels(image: HTMLImageElement): ImageData {
+        return this.createCanvas(image).getContext('2d')!.getImageData(0, 0, image.width, image.height);
+    }
+
+    private static packColor(data: Uint8ClampedArray, offset: number): number {
+        return ((data[offset] << 24) | (data[offset + 1] << 16) | (data[offset + 2] << 8) | data[offset + 3]) >>> 0;
+    }
+}
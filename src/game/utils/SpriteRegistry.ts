@@ -0,0 +1,31 @@
+import Phaser from 'phaser';
+
+/**
+ * Registry keys and helpers for per-sheet data the Preloader records while
+ * loading the manifest, shared by the scenes and PaletteSwapper.
+ */
+
+/** Registry key of { texture key: recolor names } for sheets with a palette table (set by the Preloader) */
+export const PALETTE_VARIANTS_KEY = 'spritePaletteVariants';
+
+/** Texture key the Preloader loads a sheet's palette table under */
+export const paletteTableKey = (textureKey: string) => `palette:${textureKey}`;
+
+/** Registry key of the Set of animation keys whose frames come from a mirrored direction row */
+const FLIPPED_ANIMATIONS_KEY = 'spriteFlippedAnimations';
+
+/** Record that an animation plays a mirrored direction row and must be drawn with flipX */
+export function markFlippedAnimation(scene: Phaser.Scene, animKey: string): void {
+  let flipped = scene.registry.get(FLIPPED_ANIMATIONS_KEY) as Set<string> | undefined;
+  if (!flipped) {
+    flipped = new Set<string>();
+    scene.registry.set(FLIPPED_ANIMATIONS_KEY, flipped);
+  }
+  flipped.add(animKey);
+}
+
+/** Whether an animation's frames are a mirrored direction row (`download_assets.py --flip-directions`) */
+export function isFlippedAnimation(scene: Phaser.Scene, animKey: string): boolean {
+  const flipped = scene.registry.get(FLIPPED_ANIMATIONS_KEY) as Set<string> | undefined;
+  return flipped?.has(animKey) ?? false;
+}